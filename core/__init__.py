@@ -1,12 +1,13 @@
-"""
-وحدة النواة (CORE)
-===============
-تتضمن المكونات الأساسية للنظام مثل AutoGPT وAgent وTask.
-"""
-
-from .autogpt import AutoGPT
-from .agent import Agent
-from .task import Task, TaskStatus
-from .memory import AgentMemory
-
-__all__ = ['AutoGPT', 'Agent', 'Task', 'TaskStatus', 'AgentMemory']
\ No newline at end of file
+"""
+وحدة النواة (CORE)
+===============
+تتضمن المكونات الأساسية للنظام مثل AutoGPT وAgent وTask.
+"""
+
+from .autogpt import AutoGPT
+from .agent import Agent
+from .async_agent import AsyncAgent
+from .task import Task, TaskStatus
+from .memory import AgentMemory
+
+__all__ = ['AutoGPT', 'Agent', 'AsyncAgent', 'Task', 'TaskStatus', 'AgentMemory']
\ No newline at end of file
@@ -1,606 +1,1652 @@
-"""
-وكيل ذكاء اصطناعي مستقل يمكنه تنفيذ المهام
-"""
-import uuid
-import time
-import json
-import logging
-import threading
-from typing import List, Dict, Any, Optional, Union
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-
-from core.task import Task, TaskStatus
-from core.memory import AgentMemory
-
-logger = logging.getLogger("autogpt")
-
-class Agent:
-    """وكيل ذكاء اصطناعي مستقل يمكنه تنفيذ المهام"""
-    
-    def __init__(
-        self, 
-        name: str, 
-        goal: str, 
-        llm_service: 'LLMService',
-        db_service: Optional['DatabaseService'] = None,
-        agent_id: Optional[str] = None,
-        description: Optional[str] = None,  # إضافة معلمة description
-        creator_id: Optional[str] = None,
-        tools: Optional[List['Tool']] = None,
-        learning_service: Optional['LearningService'] = None
-    ):
-        self.id = agent_id or str(uuid.uuid4())
-        self.name = name
-        self.goal = goal
-        self.description = description or f"وكيل لتنفيذ المهام المتعلقة بـ: {goal}"  # تعيين الوصف
-        self.creator_id = creator_id
-        self.created_at = datetime.now()
-        self.updated_at = self.created_at
-        self.llm_service = llm_service
-        self.db_service = db_service
-        self.tools = tools or []
-        self.learning_service = learning_service
-        self.tasks: List[Task] = []
-        self.history: List[Dict[str, Any]] = []
-        self.is_running = False
-        self.memory = AgentMemory()
-        self.thread_executor = ThreadPoolExecutor(max_workers=5)
-        self.status_lock = threading.Lock()
-        self.is_paused = False
-        
-    def add_task(self, name: str, description: str, priority: int = 5, tags: Optional[List[str]] = None) -> Task:
-        """إضافة مهمة جديدة إلى قائمة المهام"""
-        task = Task(
-            name=name, 
-            description=description, 
-            agent_id=self.id,
-            priority=priority,
-            tags=tags or []
-        )
-        
-        self.tasks.append(task)
-        
-        # حفظ المهمة في قاعدة البيانات إذا كانت متاحة
-        if self.db_service:
-            self.db_service.save_task(task)
-            
-        return task
-    
-    def start(self, async_mode: bool = False) -> Union[None, threading.Thread]:
-        """بدء تشغيل الوكيل لتنفيذ المهام"""
-        with self.status_lock:
-            self.is_running = True
-            self.is_paused = False
-            
-        logger.info(f"🤖 Agent '{self.name}' starting with goal: {self.goal}")
-        self._log_action("Agent Started", f"Starting with goal: {self.goal}")
-        
-        # إذا لم تكن هناك مهام، قم بإنشاء مهمة أولية استنادًا إلى الهدف
-        if not self.tasks:
-            main_task = self.add_task("Main Goal", self.goal, priority=10, tags=["main", "auto-generated"])
-            self._break_down_task(main_task)
-        
-        if async_mode:
-            thread = threading.Thread(target=self._run_tasks)
-            thread.daemon = True
-            thread.start()
-            return thread
-        else:
-            self._run_tasks()
-            return None
-    
-    def _run_tasks(self) -> None:
-        """تنفيذ المهام في حلقة"""
-        try:
-            # ترتيب المهام حسب الأولوية
-            sorted_tasks = sorted(
-                self.tasks, 
-                key=lambda task: (-task.priority, task.created_at)
-            )
-            
-            while self.is_running and any(task.status == TaskStatus.PENDING for task in sorted_tasks):
-                # التحقق مما إذا كان الوكيل متوقفًا مؤقتًا
-                if self.is_paused:
-                    time.sleep(1)  # انتظار قبل التحقق مرة أخرى
-                    continue
-                    
-                for task in sorted_tasks:
-                    if task.status == TaskStatus.PENDING:
-                        self._execute_task(task)
-                
-                # إعادة ترتيب المهام لمراعاة المهام الجديدة
-                sorted_tasks = sorted(
-                    self.tasks, 
-                    key=lambda task: (-task.priority, task.created_at)
-                )
-                
-            if self.is_running:  # لم يتم إيقافه من خلال stop()
-                logger.info(f"🏁 Agent '{self.name}' completed all tasks!")
-                self._log_action("All Tasks Completed", "Agent finished executing all tasks")
-                
-                # تعلم من التجربة إذا كانت خدمة التعلم متوفرة
-                if self.learning_service:
-                    self.learning_service.learn_from_execution(self)
-                    
-                with self.status_lock:
-                    self.is_running = False
-        except Exception as e:
-            logger.error(f"Error in agent execution: {str(e)}", exc_info=True)
-            self._log_action("Agent Error", f"Error during execution: {str(e)}")
-            with self.status_lock:
-                self.is_running = False
-    
-    def stop(self) -> None:
-        """إيقاف تشغيل الوكيل"""
-        with self.status_lock:
-            if self.is_running:
-                self.is_running = False
-                logger.info(f"🛑 Agent '{self.name}' stopped")
-                self._log_action("Agent Stopped", "Manual stop requested")
-    
-    def pause(self) -> None:
-        """إيقاف تشغيل الوكيل مؤقتًا"""
-        with self.status_lock:
-            if self.is_running:
-                self.is_paused = True
-                logger.info(f"⏸️ Agent '{self.name}' paused")
-                self._log_action("Agent Paused", "Execution paused")
-    
-    def resume(self) -> None:
-        """استئناف تشغيل الوكيل بعد الإيقاف المؤقت"""
-        with self.status_lock:
-            if self.is_running and self.is_paused:
-                self.is_paused = False
-                logger.info(f"▶️ Agent '{self.name}' resumed")
-                self._log_action("Agent Resumed", "Execution resumed")
-    
-    def get_status(self) -> Dict[str, Any]:
-        """الحصول على حالة الوكيل الحالية"""
-        total_tasks = len(self.tasks)
-        pending_tasks = sum(1 for task in self.tasks if task.status == TaskStatus.PENDING)
-        in_progress_tasks = sum(1 for task in self.tasks if task.status == TaskStatus.IN_PROGRESS)
-        completed_tasks = sum(1 for task in self.tasks if task.status == TaskStatus.COMPLETED)
-        failed_tasks = sum(1 for task in self.tasks if task.status == TaskStatus.FAILED)
-        
-        return {
-            "is_running": self.is_running,
-            "is_paused": self.is_paused,
-            "total_tasks": total_tasks,
-            "pending_tasks": pending_tasks,
-            "in_progress_tasks": in_progress_tasks,
-            "completed_tasks": completed_tasks,
-            "failed_tasks": failed_tasks,
-            "completion_percentage": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        }
-    
-    def add_tool(self, tool: 'Tool') -> None:
-        """إضافة أداة جديدة للوكيل"""
-        self.tools.append(tool)
-        logger.info(f"Tool '{tool.name}' added to agent '{self.name}'")
-    
-    def get_available_tools(self) -> List[Dict[str, str]]:
-        """الحصول على قائمة الأدوات المتاحة للوكيل"""
-        return [{"name": tool.name, "description": tool.description} for tool in self.tools]
-    
-    def find_tool(self, tool_name: str) -> Optional['Tool']:
-        """البحث عن أداة بالاسم"""
-        for tool in self.tools:
-            if tool.name.lower() == tool_name.lower():
-                return tool
-        return None
-    
-    def _log_action(self, action: str, details: Any) -> None:
-        """تسجيل إجراء في سجل الوكيل"""
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "action": action,
-            "details": details
-        }
-        self.history.append(entry)
-        
-        # حفظ الإجراء في قاعدة البيانات إذا كانت متاحة
-        if self.db_service:
-            self.db_service.log_agent_action(self.id, entry)
-            
-        logger.info(f"Agent '{self.name}': {action} - {details}")
-    
-    def _break_down_task(self, task: Task) -> None:
-        """تقسيم مهمة إلى مهام فرعية باستخدام نموذج لغوي"""
-        self._log_action("Task Breakdown Started", f"Breaking down task: {task.name}")
-        task.update_status(TaskStatus.IN_PROGRESS)
-        
-        # إنشاء سياق لتحليل المهمة
-        context = {
-            "agent_goal": self.goal,
-            "task_name": task.name,
-            "task_description": task.description,
-            "available_tools": self.get_available_tools()
-        }
-        
-        prompt = f"""
-        أنت وكيل ذكاء اصطناعي مهمتك تقسيم المهام إلى خطوات أصغر وأكثر قابلية للتنفيذ.
-        
-        هدفك العام: {self.goal}
-        
-        المهمة التي تحتاج إلى تقسيمها:
-        اسم: {task.name}
-        وصف: {task.description}
-        
-        الأدوات المتاحة لك:
-        {json.dumps(self.get_available_tools(), ensure_ascii=False, indent=2)}
-        
-        قم بتقسيم هذه المهمة إلى خطوات أصغر (3-7 خطوات) تكون منطقية ومترابطة.
-        
-        قدم الإجابة بتنسيق JSON كما يلي:
-        {{
-            "subtasks": [
-                {{
-                    "name": "اسم المهمة الفرعية 1",
-                    "description": "وصف تفصيلي للمهمة 1",
-                    "priority": 5,
-                    "tools": ["اسم_الأداة_1", "اسم_الأداة_2"]
-                }},
-                ...
-            ]
-        }}
-        """
-        
-        try:
-            response = self.llm_service.query(prompt, context=context)
-            self._log_action("LLM Response", f"Received response for task breakdown")
-            
-            try:
-                # محاولة تحليل الاستجابة كـ JSON
-                result = json.loads(response)
-                if "subtasks" in result:
-                    for subtask_info in result["subtasks"]:
-                        priority = subtask_info.get("priority", 5)
-                        subtask = task.add_subtask(
-                            subtask_info["name"], 
-                            subtask_info["description"],
-                            priority=priority
-                        )
-                        
-                        # حفظ المهمة الفرعية في قاعدة البيانات إذا كانت متاحة
-                        if self.db_service:
-                            self.db_service.save_task(subtask)
-                            
-                        # إضافة بيانات وصفية حول الأدوات المقترحة
-                        if "tools" in subtask_info:
-                            subtask.add_metadata("suggested_tools", subtask_info["tools"])
-                    
-                    self._log_action(
-                        "Task Breakdown Completed", 
-                        f"Divided '{task.name}' into {len(task.subtasks)} subtasks"
-                    )
-                    return
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.warning(f"Failed to parse LLM response as JSON: {str(e)}")
-                logger.debug(f"Raw response: {response}")
-                
-            # إذا وصلنا إلى هنا، فقد فشل التحليل، لذا نحاول مرة أخرى بتوجيهات أكثر صرامة
-            fallback_prompt = f"""
-            لم أتمكن من فهم استجابتك السابقة. من فضلك قم بتقسيم المهمة "{task.description}" إلى خطوات أصغر.
-            
-            قدم الإجابة فقط بتنسيق JSON التالي:
-            {{
-                "subtasks": [
-                    {{
-                        "name": "اسم المهمة الفرعية",
-                        "description": "وصف تفصيلي"
-                    }},
-                    ...
-                ]
-            }}
-            """
-            
-            response = self.llm_service.query(fallback_prompt)
-            try:
-                result = json.loads(response)
-                if "subtasks" in result:
-                    for subtask_info in result["subtasks"]:
-                        subtask = task.add_subtask(
-                            subtask_info["name"], 
-                            subtask_info["description"]
-                        )
-                        if self.db_service:
-                            self.db_service.save_task(subtask)
-                    
-                    self._log_action(
-                        "Task Breakdown Completed (Fallback)", 
-                        f"Divided '{task.name}' into {len(task.subtasks)} subtasks using fallback method"
-                    )
-                    return
-            except (json.JSONDecodeError, KeyError):
-                pass
-                
-            # إذا استمر الفشل، نقوم بإنشاء مهام فرعية افتراضية
-            self._log_action(
-                "Task Breakdown Failed", 
-                f"Could not break down '{task.name}' properly. Creating default subtasks."
-            )
-            
-            default_subtasks = [
-                {"name": "Research", "description": f"Gather information about {task.description}"},
-                {"name": "Analysis", "description": f"Analyze the information related to {task.description}"},
-                {"name": "Execution", "description": f"Execute the primary actions for {task.description}"},
-                {"name": "Summary", "description": f"Summarize findings and results from {task.description}"}
-            ]
-            
-            for subtask_info in default_subtasks:
-                subtask = task.add_subtask(subtask_info["name"], subtask_info["description"])
-                if self.db_service:
-                    self.db_service.save_task(subtask)
-                    
-        except Exception as e:
-            logger.error(f"Error in task breakdown: {str(e)}", exc_info=True)
-            self._log_action("Task Breakdown Error", f"Error: {str(e)}")
-            task.fail(f"Could not break down task: {str(e)}")
-    
-    def _execute_task(self, task: Task) -> None:
-        """تنفيذ مهمة محددة"""
-        self._log_action("Task Started", f"Executing '{task.name}'")
-        task.update_status(TaskStatus.IN_PROGRESS)
-        
-        # حفظ المهمة المحدثة في قاعدة البيانات إذا كانت متاحة
-        if self.db_service:
-            self.db_service.update_task(task)
-            
-        # إذا كانت المهمة لديها مهام فرعية، قم بتنفيذها أولاً
-        if task.subtasks:
-            # ترتيب المهام الفرعية حسب الأولوية
-            sorted_subtasks = sorted(
-                task.subtasks, 
-                key=lambda subtask: (-subtask.priority, subtask.created_at)
-            )
-            
-            for subtask in sorted_subtasks:
-                if subtask.status == TaskStatus.PENDING:
-                    self._execute_task(subtask)
-            
-            # تحقق مما إذا كانت جميع المهام الفرعية مكتملة
-            if all(subtask.status == TaskStatus.COMPLETED for subtask in task.subtasks):
-                # جمع نتائج المهام الفرعية
-                results = [f"{subtask.name}: {subtask.result}" for subtask in task.subtasks]
-                results_text = "\n".join(results)
-                
-                summary_prompt = f"""
-                أنت وكيل ذكاء اصطناعي تقوم بتلخيص وتجميع نتائج المهام الفرعية في نتيجة واحدة شاملة.
-                
-                المهمة الرئيسية: {task.name}
-                وصف المهمة: {task.description}
-                
-                نتائج المهام الفرعية:
-                {results_text}
-                
-                قم بتلخيص هذه النتائج في إجابة شاملة ومتماسكة. قدم تحليلاً للنتائج واستنتاجات نهائية.
-                """
-                
-                try:
-                    final_result = self.llm_service.query(summary_prompt)
-                    task.complete(final_result)
-                    self._log_action("Task Completed", f"'{task.name}' completed with all subtasks")
-                    
-                    # حفظ المهمة المكتملة في قاعدة البيانات إذا كانت متاحة
-                    if self.db_service:
-                        self.db_service.update_task(task)
-                        
-                    # حفظ التجربة في الذاكرة للتعلم
-                    self.memory.add_memory(
-                        "completed_task",
-                        {
-                            "task_name": task.name,
-                            "task_description": task.description,
-                            "result": final_result,
-                            "subtasks": [subtask.to_dict(include_subtasks=False) for subtask in task.subtasks]
-                        },
-                        metadata={"success": True}
-                    )
-                except Exception as e:
-                    logger.error(f"Error generating summary: {str(e)}", exc_info=True)
-                    task.fail(f"Error generating summary: {str(e)}")
-            else:
-                # إذا فشلت أي من المهام الفرعية
-                failed_subtasks = [subtask for subtask in task.subtasks if subtask.status == TaskStatus.FAILED]
-                reasons = [f"{subtask.name}: {subtask.error_message}" for subtask in failed_subtasks]
-                failure_details = "\n".join(reasons)
-                task.fail(f"Subtasks failed: {failure_details}")
-                self._log_action("Task Failed", f"'{task.name}' failed due to subtask failures")
-                
-                # حفظ المهمة الفاشلة في قاعدة البيانات إذا كانت متاحة
-                if self.db_service:
-                    self.db_service.update_task(task)
-                    
-                # حفظ التجربة في الذاكرة للتعلم
-                self.memory.add_memory(
-                    "failed_task",
-                    {
-                        "task_name": task.name,
-                        "task_description": task.description,
-                        "error": failure_details,
-                        "subtasks": [subtask.to_dict(include_subtasks=False) for subtask in task.subtasks]
-                    },
-                    metadata={"success": False}
-                )
-        else:
-            # إذا لم تكن هناك مهام فرعية، قم بتنفيذ المهمة مباشرة
-            try:
-                # تحقق مما إذا كانت المهمة تتطلب أدوات محددة
-                required_tools = []
-                if hasattr(task, 'metadata') and "suggested_tools" in task.metadata:
-                    required_tools = [
-                        self.find_tool(tool_name) 
-                        for tool_name in task.metadata["suggested_tools"]
-                        if self.find_tool(tool_name) is not None
-                    ]
-                
-                # إنشاء سياق للمهمة
-                context = {
-                    "agent_goal": self.goal,
-                    "task_name": task.name,
-                    "task_description": task.description,
-                    "available_tools": self.get_available_tools()
-                }
-                
-                # إنشاء نص توجيهي للنموذج اللغوي
-                prompt = f"""
-                أنت وكيل ذكاء اصطناعي مهمتك تنفيذ المهمة التالية بناءً على المعلومات المقدمة.
-                
-                الهدف العام: {self.goal}
-                
-                المهمة المطلوب تنفيذها:
-                اسم: {task.name}
-                وصف: {task.description}
-                
-                الأدوات المتاحة لك:
-                {json.dumps(self.get_available_tools(), ensure_ascii=False, indent=2)}
-                
-                قم بتنفيذ المهمة وتقديم نتيجة مفصلة وشاملة.
-                """
-                
-                # تنفيذ المهمة باستخدام النموذج اللغوي
-                result = self.llm_service.query(prompt, context=context)
-                
-                # استخدام الأدوات إذا كانت مطلوبة
-                if required_tools:
-                    tool_results = []
-                    for tool in required_tools:
-                        tool_prompt = f"""
-                        أنا بحاجة إلى استخدام أداة "{tool.name}" لتنفيذ مهمة:
-                        {task.description}
-                        
-                        وصف الأداة: {tool.description}
-                        
-                        كيف يمكنني استخدام هذه الأداة بشكل فعال لتنفيذ المهمة؟ قدم مدخلات دقيقة وتفصيلية لاستخدام الأداة.
-                        """
-                        
-                        tool_instructions = self.llm_service.query(tool_prompt)
-                        
-                        try:
-                            # استدعاء الأداة بالمدخلات المقترحة
-                            tool_result = tool.run(task.description, tool_instructions)
-                            tool_results.append(f"نتيجة أداة {tool.name}: {tool_result}")
-                        except Exception as e:
-                            tool_results.append(f"فشل تنفيذ أداة {tool.name}: {str(e)}")
-                    
-                    # دمج نتائج الأدوات مع النتيجة الرئيسية
-                    if tool_results:
-                        tools_output = "\n".join(tool_results)
-                        integration_prompt = f"""
-                        لقد قمت بتنفيذ المهمة:
-                        {task.description}
-                        
-                        وتوصلت إلى النتيجة التالية:
-                        {result}
-                        
-                        كما استخدمت الأدوات التالية:
-                        {tools_output}
-                        
-                        قم بدمج نتائج الأدوات مع النتيجة الرئيسية لتقديم إجابة شاملة ومتكاملة.
-                        """
-                        
-                        result = self.llm_service.query(integration_prompt)
-                
-                # إكمال المهمة بنجاح
-                task.complete(result)
-                self._log_action("Task Completed", f"'{task.name}' executed directly")
-                
-                # حفظ المهمة المكتملة في قاعدة البيانات إذا كانت متاحة
-                if self.db_service:
-                    self.db_service.update_task(task)
-                    
-                # حفظ التجربة في الذاكرة للتعلم
-                self.memory.add_memory(
-                    "direct_task",
-                    {
-                        "task_name": task.name,
-                        "task_description": task.description,
-                        "prompt": prompt,
-                        "result": result,
-                        "tools_used": [tool.name for tool in required_tools] if required_tools else []
-                    },
-                    metadata={"success": True}
-                )
-            except Exception as e:
-                logger.error(f"Error in direct task execution: {str(e)}", exc_info=True)
-                task.fail(str(e))
-                self._log_action("Task Failed", f"'{task.name}' failed with error: {str(e)}")
-                
-                # حفظ المهمة الفاشلة في قاعدة البيانات إذا كانت متاحة
-                if self.db_service:
-                    self.db_service.update_task(task)
-                    
-                # حفظ التجربة في الذاكرة للتعلم
-                self.memory.add_memory(
-                    "direct_task",
-                    {
-                        "task_name": task.name,
-                        "task_description": task.description,
-                        "error": str(e)
-                    },
-                    metadata={"success": False}
-                )
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """تحويل الوكيل إلى قاموس للتخزين"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "goal": self.goal,
-            "description": self.description,
-            "creator_id": self.creator_id,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "is_running": self.is_running,
-            "is_paused": self.is_paused,
-            "tasks": [task.to_dict() for task in self.tasks],
-            "history": self.history,
-            "memory": self.memory.to_dict(),
-            "tools": [tool.to_dict() for tool in self.tools]
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any], llm_service: 'LLMService', 
-                 db_service: Optional['DatabaseService'] = None,
-                 tool_registry: Optional[Dict[str, 'Tool']] = None,
-                 learning_service: Optional['LearningService'] = None) -> 'Agent':
-        """استعادة وكيل من قاموس"""
-        agent = cls(
-            name=data["name"],
-            goal=data["goal"],
-            llm_service=llm_service,
-            db_service=db_service,
-            agent_id=data["id"],
-            description=data.get("description"),
-            creator_id=data.get("creator_id"),
-            learning_service=learning_service
-        )
-        
-        # تحويل التواريخ من النص إلى كائنات datetime
-        if "created_at" in data:
-            agent.created_at = datetime.fromisoformat(data["created_at"])
-        if "updated_at" in data:
-            agent.updated_at = datetime.fromisoformat(data["updated_at"])
-            
-        agent.is_running = data.get("is_running", False)
-        agent.is_paused = data.get("is_paused", False)
-        agent.history = data.get("history", [])
-        
-        # استعادة المهام
-        if "tasks" in data:
-            for task_data in data["tasks"]:
-                task = Task.from_dict(task_data)
-                agent.tasks.append(task)
-                
-        # استعادة الذاكرة
-        if "memory" in data:
-            agent.memory = AgentMemory.from_dict(data["memory"])
-            
-        # استعادة الأدوات
-        if "tools" in data and tool_registry:
-            for tool_data in data["tools"]:
-                if tool_data["name"] in tool_registry:
-                    agent.tools.append(tool_registry[tool_data["name"]])
-                    
+"""
+وكيل ذكاء اصطناعي مستقل يمكنه تنفيذ المهام
+"""
+import os
+import uuid
+import time
+import asyncio
+import json
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Iterable, Iterator, Set
+from contextlib import contextmanager
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+
+from core.task import Task, TaskStatus, TaskTreeStats
+from core.memory import AgentMemory
+from core.scheduler import TaskScheduler
+from core.history import AgentHistory
+from core.prefetch import SpeculativePrefetcher, PREFETCH_BREAKDOWN, PREFETCH_EXECUTION
+from core.result_cache import ResultCache
+from core.cancellation import CancellationToken, TaskCancelledError, DeadlineExceededError
+from core.budget import (
+    TokenBudget, BudgetExceededError, degradation_level, degradation_name,
+    LEVEL_NORMAL, LEVEL_ECONOMY_MODEL, LEVEL_FUSED_CALLS, LEVEL_SKIP_INTEGRATION, LEVEL_EXHAUSTED
+)
+from llm.tokens import estimate_tokens, estimate_prompt_tokens
+from llm.context_packer import ContextPacker, Section
+from llm.http import call_bounds
+from core import prompts
+from tools.registry import ToolRegistry, ToolView
+
+logger = logging.getLogger("autogpt")
+
+class Agent:
+    """وكيل ذكاء اصطناعي مستقل يمكنه تنفيذ المهام"""
+    
+    def __init__(
+        self, 
+        name: str, 
+        goal: str, 
+        llm_service: 'LLMService',
+        db_service: Optional['DatabaseService'] = None,
+        agent_id: Optional[str] = None,
+        description: Optional[str] = None,  # إضافة معلمة description
+        creator_id: Optional[str] = None,
+        tools: Optional[Union[List['Tool'], ToolView]] = None,
+        learning_service: Optional['LearningService'] = None,
+        parallel_subtasks: bool = False,
+        executor: Optional[ThreadPoolExecutor] = None,
+        call_executor: Optional[ThreadPoolExecutor] = None,
+        tool_timeout: Optional[float] = 60.0,
+        fused_calls: bool = False,
+        token_budget: Optional[int] = None,
+        creator_budget: Optional[TokenBudget] = None,
+        history_limit: int = 500,
+        history_dir: Optional[str] = None,
+        lazy_decomposition: bool = False,
+        max_depth: int = 2,
+        max_fanout: int = 7,
+        expansion_min_words: int = 12,
+        prefetch_window: int = 0,
+        result_cache: Optional[ResultCache] = None,
+        stream_results: bool = False,
+        task_timeout: Optional[float] = None,
+        run_timeout: Optional[float] = None,
+        llm_timeout: Optional[float] = None,
+        summary_token_budget: int = 6000
+    ):
+        self.id = agent_id or str(uuid.uuid4())
+        self.name = name
+        self.goal = goal
+        self.description = description or f"وكيل لتنفيذ المهام المتعلقة بـ: {goal}"  # تعيين الوصف
+        self.creator_id = creator_id
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.llm_service = llm_service
+        self.db_service = db_service
+        # عرض للأدوات يشارك النسخ مع سجل الأدوات بدلاً من نسخ القوائم
+        self.tools = tools if isinstance(tools, ToolView) else ToolView(tools=tools or [])
+        self._tool_catalog_cache: Optional[Tuple[List[Dict[str, str]], str, int]] = None
+        self.learning_service = learning_service
+        self.tasks: List[Task] = []
+        # عدادات حالات جميع المهام في الشجرة، تُحدّث تدريجيًا مع كل تغيير حالة
+        self.task_stats = TaskTreeStats()
+        # سجل محدود في الذاكرة؛ تُرحل الإدخالات الأقدم إلى ملف عند تحديد history_dir
+        spill_path = os.path.join(history_dir, f"{self.id}.history.jsonl") if history_dir else None
+        self.history = AgentHistory(max_entries=history_limit, spill_path=spill_path)
+        self.is_running = False
+        self.memory = AgentMemory()
+        # استخدام مجمع العمال المشترك إذا تم توفيره بدلاً من مجمع خاص بالوكيل
+        self.thread_executor = executor or ThreadPoolExecutor(max_workers=5)
+        # مجمع منفصل لاستدعاءات الأدوات المتوازية حتى لا تنتظر المهام داخل مجمع العمال نفسه
+        self.call_executor = call_executor or ThreadPoolExecutor(max_workers=5)
+        self.tool_timeout = tool_timeout
+        # تقسيم المهام تكراريًا عند الحاجة فقط، مع حدود للعمق وعدد المهام الفرعية
+        self.lazy_decomposition = lazy_decomposition
+        self.max_depth = max_depth
+        self.max_fanout = max_fanout
+        self.expansion_min_words = expansion_min_words
+        # دمج استعلام التنفيذ واستعلامات مدخلات الأدوات في استدعاء واحد للمهام المباشرة
+        self.fused_calls = fused_calls
+        # عدد استدعاءات النموذج اللغوي لكل موضع استدعاء
+        self.llm_call_counts: Dict[str, int] = {}
+        self._llm_calls_lock = threading.Lock()
+        # ميزانية توكنات خاصة بالوكيل وميزانية مشتركة لمنشئه (اختياريتان)
+        self.budget = TokenBudget(token_budget, owner=f"agent:{self.id}") if token_budget else None
+        self.creator_budget = creator_budget
+        # ذاكرة مؤقتة لنتائج المهام مشتركة مع بقية الوكلاء (None = معطلة)
+        self.result_cache = result_cache
+        # بث الاستعلامات التي تصبح نتيجة المهمة إلى المهمة والمراقبين أثناء توليدها
+        self.stream_results = stream_results
+        self._observers: List[Callable[[str, Task, Any], None]] = []
+        # مهل اختيارية بالثواني لكل مهمة (مع مهامها الفرعية) ولكل تشغيل ولكل استدعاء للنموذج اللغوي
+        self.task_timeout = task_timeout
+        self.run_timeout = run_timeout
+        self.llm_timeout = llm_timeout
+        # ميزانية توكنات نتائج المهام الفرعية في نص التلخيص
+        self.summary_token_budget = summary_token_budget
+        self.context_packer = ContextPacker()
+        # رمز إلغاء التشغيل الحالي، تتفرع منه رموز المهام
+        self._run_token: Optional[CancellationToken] = None
+        self.token_usage: Dict[str, int] = {
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "estimated_calls": 0
+        }
+        self._budget_level = LEVEL_NORMAL
+        # تحضير تخميني للمهام التالية أثناء تنفيذ المهمة الحالية (0 = معطل)
+        self.prefetch_window = prefetch_window
+        self.prefetcher = (
+            SpeculativePrefetcher(self, prefetch_window, self.call_executor) if prefetch_window > 0 else None
+        )
+        self.status_lock = threading.Lock()
+        self.is_paused = False
+        self.scheduler = TaskScheduler()
+        # تنفيذ المهام الفرعية المستقلة بالتوازي مع احترام الاعتماديات بينها
+        self.parallel_subtasks = parallel_subtasks
+        
+    def add_task(self, name: str, description: str, priority: int = 5, tags: Optional[List[str]] = None) -> Task:
+        """إضافة مهمة جديدة إلى قائمة المهام"""
+        task = Task(
+            name=name, 
+            description=description, 
+            agent_id=self.id,
+            priority=priority,
+            tags=tags or []
+        )
+        
+        self.tasks.append(task)
+        self.task_stats.track(task)
+        self.scheduler.push(task)
+        
+        # حفظ المهمة في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.save_task(task)
+        self._checkpoint(task)
+            
+        return task
+    
+    def start(self, async_mode: bool = False) -> Union[None, threading.Thread]:
+        """بدء تشغيل الوكيل لتنفيذ المهام"""
+        with self.status_lock:
+            self.is_running = True
+            self.is_paused = False
+            self.scheduler.reset()
+            self._run_token = CancellationToken(self.run_timeout)
+            
+        logger.info(f"🤖 Agent '{self.name}' starting with goal: {self.goal}")
+        self._log_action("Agent Started", f"Starting with goal: {self.goal}")
+        
+        # إذا لم تكن هناك مهام، قم بإنشاء مهمة أولية استنادًا إلى الهدف
+        if not self.tasks:
+            self.add_task("Main Goal", self.goal, priority=10, tags=["main", "auto-generated"])
+            
+        # تقسيم المهمة الرئيسية إذا لم تُقسم بعد (بما في ذلك تقسيم انقطع قبل اكتماله)
+        for task in self.tasks:
+            if self._needs_breakdown(task):
+                self._break_down_task(task, token=self._run_token)
+        
+        if async_mode:
+            thread = threading.Thread(target=self._run_tasks)
+            thread.daemon = True
+            thread.start()
+            return thread
+        else:
+            self._run_tasks()
+            return None
+    
+    def _run_tasks(self) -> None:
+        """تنفيذ المهام في حلقة"""
+        try:
+            # سحب المهام حسب الأولوية؛ تنتظر الجدولة أثناء الإيقاف المؤقت دون استطلاع
+            while self.is_running:
+                task = self.scheduler.pop()
+                if task is None:
+                    break
+                if self._run_token.expired:
+                    self.stop("Run deadline exceeded")
+                    break
+                    
+                self._prefetch(self.scheduler.peek(self.prefetch_window))
+                self._execute_task(task, self._run_token)
+                
+            self._finish_run()
+        except Exception as e:
+            self._handle_run_error(e)
+    
+    def _needs_breakdown(self, task: Task) -> bool:
+        """هل المهمة مهمة رئيسية مُنشأة تلقائيًا ولم تُقسم بعد
+
+        في وضع التقسيم الكسول تُقسم المهمة الرئيسية عند تنفيذها بدلاً من ذلك.
+        """
+        return (
+            not self.lazy_decomposition
+            and task.status == TaskStatus.PENDING
+            and not task.subtasks
+            and "main" in task.tags
+            and "auto-generated" in task.tags
+        )
+    
+    def _checkpoint(self, task: Task, include_subtasks: bool = False) -> None:
+        """حفظ نقطة استعادة للمهمة بعد تغير حالتها
+
+        تُخزن كل مهمة كسجل مسطح يحمل parent_id حتى يمكن إعادة بناء الشجرة
+        بعد إعادة التشغيل، ولا يؤدي فشل الحفظ إلى إيقاف التنفيذ.
+        """
+        if not self.db_service:
+            return
+            
+        tasks = [task] + (task.subtasks if include_subtasks else [])
+        try:
+            for checkpoint_task in tasks:
+                self.db_service.save_task_checkpoint(self.id, checkpoint_task.to_dict(include_subtasks=False))
+        except NotImplementedError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not checkpoint task '{task.name}': {str(e)}")
+    
+    def restore_checkpoint(self) -> int:
+        """إعادة بناء شجرة المهام من آخر نقاط الاستعادة المحفوظة
+
+        المهام المكتملة تحتفظ بنتائجها ولا يعاد تنفيذها، والمهام التي كانت
+        قيد التنفيذ عند الانقطاع تعود معلقة. تعيد عدد المهام التي أعيد ضبطها.
+        """
+        checkpoints = []
+        if self.db_service:
+            try:
+                checkpoints = self.db_service.get_task_checkpoints(self.id)
+            except NotImplementedError:
+                checkpoints = []
+                
+        if checkpoints:
+            self.tasks = self._rebuild_task_tree(checkpoints)
+            self.task_stats.reset()
+            for task in self.tasks:
+                self.task_stats.track(task)
+            
+        interrupted = 0
+        pending = list(self.tasks)
+        while pending:
+            task = pending.pop()
+            pending.extend(task.subtasks)
+            if task.status == TaskStatus.IN_PROGRESS:
+                task.update_status(TaskStatus.PENDING)
+                self._checkpoint(task)
+                interrupted += 1
+                
+        self.scheduler.clear()
+        for task in self.tasks:
+            self.scheduler.push(task)
+            
+        self._log_action(
+            "Checkpoint Restored", 
+            f"Restored {len(checkpoints)} task checkpoints, {interrupted} interrupted tasks reset"
+        )
+        return interrupted
+    
+    @staticmethod
+    def _rebuild_task_tree(checkpoints: List[Dict[str, Any]]) -> List[Task]:
+        """بناء شجرة المهام من سجلات نقاط الاستعادة المسطحة"""
+        tasks = [Task.from_dict(task_data) for task_data in checkpoints]
+        tasks.sort(key=lambda task: task.created_at)
+        tasks_by_id = {task.id: task for task in tasks}
+        
+        roots = []
+        for task in tasks:
+            parent = tasks_by_id.get(task.parent_id) if task.parent_id else None
+            if parent is not None:
+                parent.attach_subtask(task)
+            else:
+                roots.append(task)
+        return roots
+    
+    def resume_from_checkpoint(self, async_mode: bool = False) -> Union[None, threading.Thread]:
+        """استئناف تشغيل متقطع من حيث توقف دون إعادة تنفيذ المهام المكتملة"""
+        self.restore_checkpoint()
+        return self.start(async_mode)
+    
+    def has_unfinished_tasks(self) -> bool:
+        """هل توجد مهام معلقة أو قيد التنفيذ في شجرة المهام"""
+        counts = self.task_stats.snapshot()
+        return counts[TaskStatus.PENDING] + counts[TaskStatus.IN_PROGRESS] > 0
+    
+    def _should_expand(self, task: Task) -> bool:
+        """تقرير ما إذا كان تقسيم مهمة قبل تنفيذها مباشرة يستحق استدعاء النموذج اللغوي
+
+        يعمل فقط في وضع التقسيم الكسول وضمن حد العمق. تُقسم المهمة الرئيسية
+        دائمًا، ويمكن فرض القرار عبر البيانات الوصفية "expand"، وإلا تُقسم
+        المهام ذات الوصف الطويل أو التي تقترح أكثر من أداتين.
+        """
+        if not self.lazy_decomposition or task.subtasks or task.status != TaskStatus.PENDING:
+            return False
+        if task.depth >= self.max_depth:
+            return False
+        if "expand" in task.metadata:
+            return bool(task.metadata["expand"])
+        if "main" in task.tags:
+            return True
+            
+        suggested_tools = task.metadata.get("suggested_tools") or []
+        return len(task.description.split()) >= self.expansion_min_words or len(suggested_tools) > 2
+    
+    def _prefetch(self, tasks: List[Task]) -> None:
+        """تحضير المهام التالية تخمينيًا إذا كان التحضير المسبق مفعلاً"""
+        if self.prefetcher is not None and tasks:
+            self.prefetcher.prefetch(tasks)
+    
+    def _take_prefetched(self, task: Task, kind: str, token: Optional[CancellationToken] = None) -> Optional[Any]:
+        """الحصول على نتيجة التحضير المسبق لمهمة إن كانت ما تزال صالحة"""
+        if self.prefetcher is None:
+            return None
+        return self.prefetcher.take(task, kind, token)
+    
+    def _discard_prefetched(self, task: Optional[Task] = None) -> None:
+        """إلغاء التحضير المسبق لمهمة لن تُنفذ، أو لجميع المهام"""
+        if self.prefetcher is not None:
+            self.prefetcher.discard(task.id if task is not None else None)
+    
+    def _finish_run(self) -> None:
+        """إنهاء التشغيل بعد نفاد المهام المعلقة"""
+        self._discard_prefetched()
+        if self.is_running:  # لم يتم إيقافه من خلال stop()
+            logger.info(f"🏁 Agent '{self.name}' completed all tasks!")
+            self._log_action("All Tasks Completed", "Agent finished executing all tasks")
+            
+            # تعلم من التجربة إذا كانت خدمة التعلم متوفرة
+            if self.learning_service:
+                self.learning_service.learn_from_execution(self)
+                
+            with self.status_lock:
+                self.is_running = False
+    
+    def _handle_run_error(self, error: Exception) -> None:
+        """تسجيل خطأ غير متوقع أثناء التشغيل وإيقاف الوكيل"""
+        self._discard_prefetched()
+        logger.error(f"Error in agent execution: {str(error)}", exc_info=True)
+        self._log_action("Agent Error", f"Error during execution: {str(error)}")
+        with self.status_lock:
+            self.is_running = False
+    
+    def stop(self, reason: str = "Manual stop requested") -> None:
+        """إيقاف تشغيل الوكيل وقطع العمل الجاري للمهام قيد التنفيذ"""
+        with self.status_lock:
+            if self.is_running:
+                self.is_running = False
+                self.scheduler.stop()
+                if self._run_token is not None:
+                    self._run_token.cancel("Agent stopped")
+                self._discard_prefetched()
+                logger.info(f"🛑 Agent '{self.name}' stopped")
+                self._log_action("Agent Stopped", reason)
+    
+    def pause(self) -> None:
+        """إيقاف تشغيل الوكيل مؤقتًا"""
+        with self.status_lock:
+            if self.is_running:
+                self.is_paused = True
+                self.scheduler.pause()
+                logger.info(f"⏸️ Agent '{self.name}' paused")
+                self._log_action("Agent Paused", "Execution paused")
+    
+    def resume(self) -> None:
+        """استئناف تشغيل الوكيل بعد الإيقاف المؤقت"""
+        with self.status_lock:
+            if self.is_running and self.is_paused:
+                self.is_paused = False
+                self.scheduler.resume()
+                logger.info(f"▶️ Agent '{self.name}' resumed")
+                self._log_action("Agent Resumed", "Execution resumed")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """الحصول على حالة الوكيل الحالية"""
+        # عدادات مجمّعة لكامل شجرة المهام بدلاً من المرور على المهام في كل استدعاء
+        counts = self.task_stats.snapshot()
+        total_tasks = sum(counts.values())
+        completed_tasks = counts[TaskStatus.COMPLETED]
+        
+        return {
+            "is_running": self.is_running,
+            "is_paused": self.is_paused,
+            "top_level_tasks": len(self.tasks),
+            "total_tasks": total_tasks,
+            "pending_tasks": counts[TaskStatus.PENDING],
+            "in_progress_tasks": counts[TaskStatus.IN_PROGRESS],
+            "completed_tasks": completed_tasks,
+            "failed_tasks": counts[TaskStatus.FAILED],
+            "canceled_tasks": counts[TaskStatus.CANCELED],
+            "completion_percentage": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0,
+            "llm_calls": self.get_llm_call_counts(),
+            "token_usage": self.get_token_usage(),
+            "budget": self.get_budget_status(),
+            "prefetch": self.prefetcher.get_stats() if self.prefetcher else None
+        }
+    
+    def get_token_usage(self) -> Dict[str, int]:
+        """إجمالي التوكنات المستهلكة في استدعاءات النموذج اللغوي"""
+        with self._llm_calls_lock:
+            return dict(self.token_usage)
+    
+    def get_budget_status(self) -> Dict[str, Any]:
+        """حالة ميزانيات التوكنات ومستوى التخفيض الحالي"""
+        return {
+            "level": degradation_name(self._budget_level),
+            "agent": self.budget.to_dict() if self.budget else None,
+            "creator": self.creator_budget.to_dict() if self.creator_budget else None
+        }
+    
+    def _get_budget_level(self) -> int:
+        """حساب مستوى التخفيض من أعلى نسبة استهلاك بين ميزانيات الوكيل"""
+        budgets = [budget for budget in (self.budget, self.creator_budget) if budget is not None]
+        if not budgets:
+            return LEVEL_NORMAL
+            
+        fraction_used = max(budget.fraction_used for budget in budgets)
+        level = degradation_level(fraction_used)
+        if level > self._budget_level:
+            self._budget_level = level
+            self._log_action(
+                "Budget Degraded", 
+                f"{fraction_used:.0%} of token budget used, switching to '{degradation_name(level)}'"
+            )
+        return level
+    
+    def get_llm_call_counts(self) -> Dict[str, int]:
+        """عدد استدعاءات النموذج اللغوي لكل موضع استدعاء"""
+        with self._llm_calls_lock:
+            return dict(self.llm_call_counts)
+    
+    def _count_llm_call(self, call_site: str) -> None:
+        """احتساب استدعاء للنموذج اللغوي في موضع محدد"""
+        with self._llm_calls_lock:
+            self.llm_call_counts[call_site] = self.llm_call_counts.get(call_site, 0) + 1
+    
+    def _prepare_llm_call(self, call_site: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """تطبيق قيود الميزانية على استدعاء قبل إرساله واحتسابه"""
+        level = self._get_budget_level()
+        if level >= LEVEL_EXHAUSTED:
+            raise BudgetExceededError(f"Token budget exhausted for agent '{self.name}'")
+            
+        economy_model = getattr(self.llm_service, "economy_model", None)
+        if level >= LEVEL_ECONOMY_MODEL and economy_model:
+            kwargs.setdefault("model", economy_model)
+            
+        self._count_llm_call(call_site)
+        return kwargs
+    
+    def _record_token_usage(self, prompt: str, context: Optional[Dict[str, Any]], response: str) -> None:
+        """تسجيل استخدام استدعاء من أرقام المزود إن توفرت أو بالتقدير، وخصمه من الميزانيات"""
+        pop_last_usage = getattr(self.llm_service, "pop_last_usage", None)
+        usage = pop_last_usage() if pop_last_usage else None
+        estimated = usage is None
+        if estimated:
+            prompt_tokens = estimate_prompt_tokens(prompt, context)
+            completion_tokens = estimate_tokens(response)
+        else:
+            prompt_tokens = usage["prompt_tokens"]
+            completion_tokens = usage["completion_tokens"]
+            
+        total_tokens = prompt_tokens + completion_tokens
+        with self._llm_calls_lock:
+            self.token_usage["prompt_tokens"] += prompt_tokens
+            self.token_usage["completion_tokens"] += completion_tokens
+            self.token_usage["total_tokens"] += total_tokens
+            if estimated:
+                self.token_usage["estimated_calls"] += 1
+                
+        for budget in (self.budget, self.creator_budget):
+            if budget is not None:
+                budget.consume(total_tokens)
+    
+    def _query_llm(
+        self,
+        call_site: str,
+        prompt: str,
+        stream_to: Optional[Task] = None,
+        token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> str:
+        """إرسال استعلام إلى النموذج اللغوي مع احتسابه ضمن موضع الاستدعاء وخصمه من الميزانية
+
+        إذا حُددت stream_to وكان البث مفعلاً تُلحق أجزاء الاستجابة بنتيجة تلك
+        المهمة وتُنشر للمراقبين فور وصولها. عند تمرير رمز إلغاء أو تحديد مهلة
+        للاستدعاءات يُنفذ الاستدعاء في مجمع الاستدعاءات، فيعود المستدعي فور
+        الإلغاء أو انتهاء المهلة، وتنتهي طلبات HTTP المعلقة للاستدعاء بالحدود
+        نفسها فيتحرر خيط المجمع.
+        """
+        if token is None and self.llm_timeout is None:
+            return self._query_llm_now(call_site, prompt, stream_to, None, kwargs)
+            
+        token = token or CancellationToken()
+        call_token = token.child(self.llm_timeout)
+        future = self.call_executor.submit(self._query_llm_now, call_site, prompt, stream_to, call_token, kwargs)
+        try:
+            return token.wait_for(future, self.llm_timeout)
+        finally:
+            call_token.detach()
+    
+    def _query_llm_now(
+        self,
+        call_site: str,
+        prompt: str,
+        stream_to: Optional[Task],
+        token: Optional[CancellationToken],
+        kwargs: Dict[str, Any]
+    ) -> str:
+        """تنفيذ استدعاء النموذج اللغوي في الخيط الحالي"""
+        kwargs = self._prepare_llm_call(call_site, kwargs)
+        with self._http_bounds(token):
+            if stream_to is not None and self.stream_results:
+                response = self._consume_stream(stream_to, self.llm_service.query_stream(prompt, **kwargs), token)
+            else:
+                response = self.llm_service.query(prompt, **kwargs)
+        self._record_token_usage(prompt, kwargs.get("context"), response)
+        return response
+    
+    @contextmanager
+    def _http_bounds(self, token: Optional[CancellationToken]) -> Iterator[None]:
+        """تقييد طلبات HTTP داخل الكتلة بمهلة الرمز وإلغائه"""
+        if token is None:
+            yield
+            return
+        remaining = token.remaining()
+        cancelled = threading.Event()
+        remove = token.on_cancel(cancelled.set)
+        try:
+            with call_bounds(time.monotonic() + remaining if remaining is not None else None, cancelled):
+                yield
+        finally:
+            remove()
+    
+    def add_observer(self, observer: Callable[[str, Task, Any], None]) -> None:
+        """تسجيل مراقب يُستدعى بـ (الحدث، المهمة، البيانات)
+
+        الحدث الحالي هو "result_chunk" وبياناته الجزء الجديد من النتيجة. قد
+        يُستدعى المراقب من خيوط العمال أو من حلقة الأحداث، لذا يجب أن يكون سريعًا.
+        """
+        self._observers.append(observer)
+    
+    def remove_observer(self, observer: Callable[[str, Task, Any], None]) -> None:
+        """إلغاء تسجيل مراقب"""
+        if observer in self._observers:
+            self._observers.remove(observer)
+    
+    def _notify(self, event: str, task: Task, data: Any) -> None:
+        """نشر حدث لجميع المراقبين دون أن يوقف خطأ أحدهم التنفيذ"""
+        for observer in list(self._observers):
+            try:
+                observer(event, task, data)
+            except Exception as e:
+                logger.warning(f"Observer failed on {event} for task '{task.name}': {str(e)}")
+    
+    def _begin_stream(self, task: Task) -> float:
+        """تهيئة نتيجة المهمة لاستقبال الأجزاء وإعادة وقت البدء"""
+        task.result = None
+        task.metadata.pop("time_to_first_token", None)
+        return time.monotonic()
+    
+    def _publish_chunk(self, task: Task, chunk: str, started: float) -> None:
+        """إلحاق جزء بنتيجة المهمة ونشره، مع تسجيل زمن وصول أول جزء"""
+        if "time_to_first_token" not in task.metadata:
+            task.metadata["time_to_first_token"] = round(time.monotonic() - started, 3)
+        task.append_result(chunk)
+        self._notify("result_chunk", task, chunk)
+    
+    def _consume_stream(self, task: Task, chunks: Iterable[str], token: Optional[CancellationToken] = None) -> str:
+        """استهلاك بث استجابة إلى نتيجة المهمة وإعادة النص الكامل، مع التوقف عند الإلغاء"""
+        started = self._begin_stream(task)
+        parts = []
+        try:
+            for chunk in chunks:
+                if token is not None:
+                    token.raise_if_cancelled()
+                parts.append(chunk)
+                self._publish_chunk(task, chunk, started)
+        except Exception:
+            # عدم ترك نتيجة جزئية في مهمة فشل توليدها
+            task.result = None
+            raise
+        return "".join(parts)
+    
+    def add_tool(self, tool: 'Tool') -> None:
+        """إضافة أداة جديدة للوكيل"""
+        self.tools.append(tool)
+        # إبطال فهرس الأدوات المخزن مؤقتًا
+        self._tool_catalog_cache = None
+        logger.info(f"Tool '{tool.name}' added to agent '{self.name}'")
+    
+    def get_available_tools(self) -> List[Dict[str, str]]:
+        """الحصول على قائمة الأدوات المتاحة للوكيل"""
+        return list(self._get_tool_catalog()[0])
+    
+    def _get_tool_catalog(self) -> Tuple[List[Dict[str, str]], str, int]:
+        """الحصول على فهرس الأدوات ونسخته المسلسلة المضغوطة وعدد البايتات الموفرة
+
+        يُحسب الفهرس مرة واحدة ويُعاد استخدامه حتى يتغير عبر add_tool.
+        """
+        cache = self._tool_catalog_cache
+        if cache is None:
+            available_tools = self.tools.describe()
+            compact = json.dumps(available_tools, ensure_ascii=False, separators=(",", ":"))
+            pretty = json.dumps(available_tools, ensure_ascii=False, indent=2)
+            savings = len(pretty.encode("utf-8")) - len(compact.encode("utf-8"))
+            cache = (available_tools, compact, savings)
+            self._tool_catalog_cache = cache
+        return cache
+    
+    def find_tool(self, tool_name: str) -> Optional['Tool']:
+        """البحث عن أداة بالاسم"""
+        return self.tools.find(tool_name)
+    
+    def _log_action(self, action: str, details: Any) -> None:
+        """تسجيل إجراء في سجل الوكيل"""
+        entry = self.history.append({
+            "timestamp": datetime.now().isoformat(),
+            "action": action,
+            "details": details
+        })
+        
+        # حفظ الإجراء في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.log_agent_action(self.id, entry)
+            
+        logger.info(f"Agent '{self.name}': {action} - {details}")
+    
+    def _build_breakdown_request(self, task: Task) -> Tuple[str, Dict[str, Any]]:
+        """إنشاء النص التوجيهي والسياق لتقسيم مهمة"""
+        available_tools, tool_catalog, catalog_savings = self._get_tool_catalog()
+        
+        # إنشاء سياق لتحليل المهمة
+        context = {
+            "agent_goal": self.goal,
+            "task_name": task.name,
+            "task_description": task.description,
+            "available_tools": available_tools
+        }
+        
+        prompt = prompts.BREAKDOWN.render(
+            extra_saved_bytes=catalog_savings,
+            min_steps=min(3, self.max_fanout),
+            max_steps=self.max_fanout,
+            goal=self.goal,
+            task_name=task.name,
+            task_description=task.description,
+            tool_catalog=tool_catalog
+        )
+        
+        return prompt, context
+    
+    def _build_breakdown_fallback_prompt(self, task: Task) -> str:
+        """إنشاء نص توجيهي أكثر صرامة عند فشل تحليل استجابة التقسيم"""
+        return prompts.BREAKDOWN_FALLBACK.render(task_description=task.description)
+    
+    def _apply_breakdown_response(self, task: Task, response: str, fallback: bool = False) -> bool:
+        """تحليل استجابة التقسيم وإضافة المهام الفرعية، وتعيد False إذا تعذر التحليل"""
+        try:
+            # محاولة تحليل الاستجابة كـ JSON
+            result = json.loads(response)
+            if "subtasks" not in result:
+                return False
+                
+            # الالتزام بالحد الأقصى لعدد المهام الفرعية
+            for subtask_info in result["subtasks"][:self.max_fanout]:
+                priority = subtask_info.get("priority", 5)
+                subtask = task.add_subtask(
+                    subtask_info["name"], 
+                    subtask_info["description"],
+                    priority=priority
+                )
+                
+                # إضافة بيانات وصفية حول الأدوات المقترحة
+                if "tools" in subtask_info:
+                    subtask.add_metadata("suggested_tools", subtask_info["tools"])
+                    
+                # إضافة الاعتماديات بين المهام الفرعية
+                if subtask_info.get("depends_on"):
+                    subtask.add_metadata("depends_on", subtask_info["depends_on"])
+                    
+                # تلميح اختياري من النموذج حول ما إذا كانت المهمة تستحق تقسيمًا إضافيًا
+                if "expand" in subtask_info:
+                    subtask.add_metadata("expand", bool(subtask_info["expand"]))
+                
+                # حفظ المهمة الفرعية في قاعدة البيانات إذا كانت متاحة
+                if self.db_service:
+                    self.db_service.save_task(subtask)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            if not fallback:
+                logger.warning(f"Failed to parse LLM response as JSON: {str(e)}")
+                logger.debug(f"Raw response: {response}")
+            return False
+        
+        # المهمة جاهزة الآن للتنفيذ عبر مهامها الفرعية
+        task.update_status(TaskStatus.PENDING)
+        self._checkpoint(task, include_subtasks=True)
+        if fallback:
+            self._log_action(
+                "Task Breakdown Completed (Fallback)", 
+                f"Divided '{task.name}' into {len(task.subtasks)} subtasks using fallback method"
+            )
+        else:
+            self._log_action(
+                "Task Breakdown Completed", 
+                f"Divided '{task.name}' into {len(task.subtasks)} subtasks"
+            )
+        return True
+    
+    def _apply_default_breakdown(self, task: Task) -> None:
+        """إنشاء مهام فرعية افتراضية عند فشل التقسيم"""
+        self._log_action(
+            "Task Breakdown Failed", 
+            f"Could not break down '{task.name}' properly. Creating default subtasks."
+        )
+        
+        default_subtasks = [
+            {"name": "Research", "description": f"Gather information about {task.description}"},
+            {"name": "Analysis", "description": f"Analyze the information related to {task.description}"},
+            {"name": "Execution", "description": f"Execute the primary actions for {task.description}"},
+            {"name": "Summary", "description": f"Summarize findings and results from {task.description}"}
+        ]
+        
+        for subtask_info in default_subtasks:
+            subtask = task.add_subtask(subtask_info["name"], subtask_info["description"])
+            if self.db_service:
+                self.db_service.save_task(subtask)
+                
+        task.update_status(TaskStatus.PENDING)
+        self._checkpoint(task, include_subtasks=True)
+    
+    def _skip_breakdown(self, task: Task) -> None:
+        """إعادة مهمة تعذر تقسيمها إلى الانتظار لتُنفذ مباشرة"""
+        self._log_action("Task Breakdown Skipped", f"'{task.name}' will be executed directly")
+        task.update_status(TaskStatus.PENDING)
+        self._checkpoint(task)
+    
+    def _break_down_task(
+        self,
+        task: Task,
+        allow_default: bool = True,
+        token: Optional[CancellationToken] = None
+    ) -> None:
+        """تقسيم مهمة إلى مهام فرعية باستخدام نموذج لغوي
+        
+        allow_default: إنشاء مهام فرعية افتراضية عند فشل التحليل، وإلا تعود المهمة
+        إلى الانتظار لتُنفذ مباشرة.
+        """
+        self._log_action("Task Breakdown Started", f"Breaking down task: {task.name}")
+        task.update_status(TaskStatus.IN_PROGRESS)
+        self._checkpoint(task)
+        
+        try:
+            # استخدام استعلام التقسيم المرسل مسبقًا إن وجد وما زال صالحًا
+            response = self._take_prefetched(task, PREFETCH_BREAKDOWN, token)
+            if response is None:
+                prompt, context = self._build_breakdown_request(task)
+                response = self._query_llm("breakdown", prompt, token=token, context=context)
+            self._log_action("LLM Response", f"Received response for task breakdown")
+            if self._apply_breakdown_response(task, response):
+                return
+                
+            # إذا وصلنا إلى هنا، فقد فشل التحليل، لذا نحاول مرة أخرى بتوجيهات أكثر صرامة
+            response = self._query_llm(
+                "breakdown_fallback", self._build_breakdown_fallback_prompt(task), token=token
+            )
+            if self._apply_breakdown_response(task, response, fallback=True):
+                return
+                
+            # إذا استمر الفشل، نقوم بإنشاء مهام فرعية افتراضية
+            if allow_default:
+                self._apply_default_breakdown(task)
+            else:
+                self._skip_breakdown(task)
+                    
+        except TaskCancelledError as e:
+            self._handle_interruption(task, e)
+        except Exception as e:
+            logger.error(f"Error in task breakdown: {str(e)}", exc_info=True)
+            self._log_action("Task Breakdown Error", f"Error: {str(e)}")
+            task.fail(f"Could not break down task: {str(e)}")
+            self._checkpoint(task)
+    
+    def _mark_task_started(self, task: Task) -> None:
+        """تحديث حالة المهمة عند بدء تنفيذها"""
+        self._log_action("Task Started", f"Executing '{task.name}'")
+        task.update_status(TaskStatus.IN_PROGRESS)
+        
+        # حفظ المهمة المحدثة في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+    
+    def _build_summary_prompt(self, task: Task) -> str:
+        """إنشاء نص توجيهي لتلخيص نتائج المهام الفرعية"""
+        # تعبئة نتائج المهام الفرعية ضمن الميزانية بدل دمجها كاملة
+        sections = [Section(subtask.name, f"{subtask.name}: {subtask.result}") for subtask in task.subtasks]
+        packed = self.context_packer.pack(sections, self.summary_token_budget)
+        if not packed.complete:
+            task.metadata["summary_packing"] = packed.to_dict()
+            self._log_action(
+                "Summary Packed",
+                f"'{task.name}': {len(packed.truncated)} results truncated, {len(packed.dropped)} dropped"
+            )
+        
+        return prompts.SUMMARY.render(
+            task_name=task.name,
+            task_description=task.description,
+            results_text=packed.join()
+        )
+    
+    def _record_composite_success(self, task: Task, final_result: str) -> None:
+        """إكمال مهمة مركبة بعد نجاح جميع مهامها الفرعية"""
+        task.complete(final_result)
+        self._log_action("Task Completed", f"'{task.name}' completed with all subtasks")
+        
+        # حفظ المهمة المكتملة في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+            
+        # حفظ التجربة في الذاكرة للتعلم
+        self.memory.add_memory(
+            "completed_task",
+            {
+                "task_name": task.name,
+                "task_description": task.description,
+                "result": final_result,
+                "subtasks": [subtask.to_dict(include_subtasks=False) for subtask in task.subtasks]
+            },
+            metadata={"success": True}
+        )
+    
+    def _record_composite_failure(self, task: Task) -> None:
+        """إفشال مهمة مركبة بسبب فشل بعض مهامها الفرعية"""
+        # إذا فشلت أي من المهام الفرعية
+        failed_subtasks = [subtask for subtask in task.subtasks if subtask.status == TaskStatus.FAILED]
+        reasons = [f"{subtask.name}: {subtask.error_message}" for subtask in failed_subtasks]
+        failure_details = "\n".join(reasons)
+        task.fail(f"Subtasks failed: {failure_details}")
+        self._log_action("Task Failed", f"'{task.name}' failed due to subtask failures")
+        
+        # حفظ المهمة الفاشلة في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+            
+        # حفظ التجربة في الذاكرة للتعلم
+        self.memory.add_memory(
+            "failed_task",
+            {
+                "task_name": task.name,
+                "task_description": task.description,
+                "error": failure_details,
+                "subtasks": [subtask.to_dict(include_subtasks=False) for subtask in task.subtasks]
+            },
+            metadata={"success": False}
+        )
+    
+    def _resolve_required_tools(self, task: Task) -> List['Tool']:
+        """تحديد الأدوات المقترحة للمهمة والمتوفرة لدى الوكيل"""
+        required_tools = []
+        if hasattr(task, 'metadata') and "suggested_tools" in task.metadata:
+            for tool_name in task.metadata["suggested_tools"]:
+                tool = self.find_tool(tool_name)
+                if tool is not None:
+                    required_tools.append(tool)
+        return required_tools
+    
+    def _build_execution_request(self, task: Task) -> Tuple[str, Dict[str, Any]]:
+        """إنشاء النص التوجيهي والسياق لتنفيذ مهمة مباشرة"""
+        available_tools, tool_catalog, catalog_savings = self._get_tool_catalog()
+        
+        # إنشاء سياق للمهمة
+        context = {
+            "agent_goal": self.goal,
+            "task_name": task.name,
+            "task_description": task.description,
+            "available_tools": available_tools
+        }
+        
+        # إنشاء نص توجيهي للنموذج اللغوي
+        prompt = prompts.EXECUTION.render(
+            extra_saved_bytes=catalog_savings,
+            goal=self.goal,
+            task_name=task.name,
+            task_description=task.description,
+            tool_catalog=tool_catalog
+        )
+        
+        return prompt, context
+    
+    def _prepare_execution(self, task: Task) -> Tuple[List['Tool'], bool, str, Dict[str, Any]]:
+        """تحضير تنفيذ مهمة مباشرة: الأدوات المطلوبة ونوع الاستدعاء والنص التوجيهي والسياق"""
+        required_tools = self._resolve_required_tools(task)
+        if required_tools and self._use_fused_calls():
+            prompt, context = self._build_fused_request(task, required_tools)
+            return required_tools, True, prompt, context
+            
+        prompt, context = self._build_execution_request(task)
+        return required_tools, False, prompt, context
+    
+    def _build_fused_request(self, task: Task, tools: List['Tool']) -> Tuple[str, Dict[str, Any]]:
+        """إنشاء نص توجيهي يطلب مسودة النتيجة ومدخلات الأدوات المقترحة معًا"""
+        suggested_tools = [{"name": tool.name, "description": tool.description} for tool in tools]
+        
+        context = {
+            "agent_goal": self.goal,
+            "task_name": task.name,
+            "task_description": task.description,
+            "suggested_tools": [tool.name for tool in tools]
+        }
+        
+        prompt = prompts.FUSED_EXECUTION.render(
+            goal=self.goal,
+            task_name=task.name,
+            task_description=task.description,
+            tool_catalog=json.dumps(suggested_tools, ensure_ascii=False, separators=(",", ":"))
+        )
+        
+        return prompt, context
+    
+    def _parse_fused_response(self, response: str, tools: List['Tool']) -> Tuple[str, List[Optional[str]]]:
+        """استخراج المسودة ومدخلات كل أداة من استجابة الاستدعاء المدمج
+
+        الأدوات التي لم ترد مدخلاتها تأخذ None فتُطلب مدخلاتها بالطريقة المعتادة،
+        وإذا تعذر التحليل تُستخدم الاستجابة كاملة كمسودة.
+        """
+        try:
+            data = json.loads(response)
+            draft = data["draft"]
+            raw_inputs = data.get("tool_inputs") or {}
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Failed to parse fused LLM response as JSON: {str(e)}")
+            return response, [None] * len(tools)
+            
+        if not isinstance(raw_inputs, dict):
+            raw_inputs = {}
+        inputs_by_name = {str(name).lower(): value for name, value in raw_inputs.items()}
+        
+        tool_inputs = []
+        for tool in tools:
+            value = inputs_by_name.get(tool.name.lower())
+            if value is not None and not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False)
+            tool_inputs.append(value)
+            
+        return str(draft), tool_inputs
+    
+    def _build_tool_prompt(self, task: Task, tool: 'Tool') -> str:
+        """إنشاء نص توجيهي للحصول على مدخلات أداة"""
+        return prompts.TOOL_INSTRUCTIONS.render(
+            tool_name=tool.name,
+            tool_description=tool.description,
+            task_description=task.description
+        )
+    
+    def _build_integration_prompt(self, task: Task, result: str, tool_results: List[str]) -> str:
+        """إنشاء نص توجيهي لدمج نتائج الأدوات مع النتيجة الرئيسية"""
+        return prompts.INTEGRATION.render(
+            task_description=task.description,
+            result=result,
+            tools_output="\n".join(tool_results)
+        )
+    
+    def _record_direct_success(self, task: Task, prompt: str, result: str, required_tools: List['Tool']) -> None:
+        """إكمال مهمة نُفذت مباشرة"""
+        # إكمال المهمة بنجاح
+        task.complete(result)
+        self._log_action("Task Completed", f"'{task.name}' executed directly")
+        
+        # حفظ المهمة المكتملة في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+            
+        # حفظ التجربة في الذاكرة للتعلم
+        self.memory.add_memory(
+            "direct_task",
+            {
+                "task_name": task.name,
+                "task_description": task.description,
+                "prompt": prompt,
+                "result": result,
+                "tools_used": [tool.name for tool in required_tools] if required_tools else []
+            },
+            metadata={"success": True}
+        )
+    
+    def _result_cache_key(self, task: Task, required_tools: List['Tool'], fused: bool = False) -> Optional[str]:
+        """مفتاح الذاكرة المؤقتة المشتركة لمهمة مباشرة، أو None إذا كانت معطلة لهذا الوكيل"""
+        if self.result_cache is None or not self.result_cache.is_enabled_for(self.creator_id):
+            return None
+            
+        model = getattr(self.llm_service, "default_model", None)
+        economy_model = getattr(self.llm_service, "economy_model", None)
+        if economy_model and self._get_budget_level() >= LEVEL_ECONOMY_MODEL:
+            model = economy_model
+            
+        return ResultCache.make_key(
+            task.description,
+            self.goal,
+            [tool.name for tool in required_tools],
+            {
+                "service": getattr(self.llm_service, "provider_name", type(self.llm_service).__name__),
+                "model": model,
+                # نتائج إعدادات التوليد المختلفة لا تُستبدل ببعضها
+                "temperature": getattr(self.llm_service, "default_temperature", None),
+                "max_tokens": getattr(self.llm_service, "max_tokens", None),
+                "fused": fused
+            }
+        )
+    
+    def _serve_from_cache(self, task: Task, cache_key: str) -> bool:
+        """إكمال مهمة من الذاكرة المؤقتة المشتركة إن وجدت نتيجة صالحة"""
+        entry = self.result_cache.get(cache_key)
+        if entry is None:
+            return False
+            
+        task.metadata["served_from_cache"] = True
+        task.complete(entry["result"])
+        self._log_action("Task Completed", f"'{task.name}' served from result cache")
+        
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+        return True
+    
+    def _record_direct_failure(self, task: Task, error: Exception) -> None:
+        """إفشال مهمة نُفذت مباشرة"""
+        logger.error(f"Error in direct task execution: {str(error)}", exc_info=True)
+        task.fail(str(error))
+        self._log_action("Task Failed", f"'{task.name}' failed with error: {str(error)}")
+        
+        # حفظ المهمة الفاشلة في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+            
+        # حفظ التجربة في الذاكرة للتعلم
+        self.memory.add_memory(
+            "direct_task",
+            {
+                "task_name": task.name,
+                "task_description": task.description,
+                "error": str(error)
+            },
+            metadata={"success": False}
+        )
+    
+    def _fail_for_budget(self, task: Task) -> None:
+        """إفشال مهمة ومهامها الفرعية غير المنتهية بعد نفاد ميزانية التوكنات"""
+        pending = [task]
+        while pending:
+            current = pending.pop()
+            pending.extend(current.subtasks)
+            if current.status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+                current.fail("Token budget exhausted")
+                self._discard_prefetched(current)
+                if self.db_service:
+                    self.db_service.update_task(current)
+                self._checkpoint(current)
+        self._log_action("Task Failed", f"'{task.name}' skipped because the token budget is exhausted")
+    
+    def _integrate_tool_results(
+        self,
+        task: Task,
+        result: str,
+        tool_results: List[str],
+        token: Optional[CancellationToken] = None
+    ) -> str:
+        """دمج نتائج الأدوات مع النتيجة، أو إلحاقها مباشرة عند تخطي الدمج لتوفير الميزانية"""
+        if self._get_budget_level() >= LEVEL_SKIP_INTEGRATION:
+            return "\n\n".join([result] + tool_results)
+        return self._query_llm(
+            "integration", self._build_integration_prompt(task, result, tool_results), stream_to=task, token=token
+        )
+    
+    def _use_fused_calls(self) -> bool:
+        """هل يجب استخدام الاستدعاء المدمج (مفعّل للوكيل أو مفروض بالميزانية)"""
+        return self.fused_calls or self._get_budget_level() >= LEVEL_FUSED_CALLS
+    
+    def _task_token(self, task: Task, parent_token: Optional[CancellationToken]) -> CancellationToken:
+        """إنشاء رمز إلغاء لمهمة متفرع من رمز المهمة الأم أو التشغيل وربطه بالمهمة
+
+        تُطبق task_timeout على المهام المباشرة فقط، وتخضع المهام المركبة لمهل
+        أسلافها، ويمكن تحديد مهلة أي مهمة عبر البيانات الوصفية "timeout".
+        """
+        parent_token = parent_token or self._run_token or CancellationToken()
+        if "timeout" in task.metadata:
+            timeout = task.metadata["timeout"]
+        elif task.subtasks or self._should_expand(task):
+            timeout = None
+        else:
+            timeout = self.task_timeout
+        token = parent_token.child(timeout)
+        task._cancel_token = token
+        return token
+    
+    def _release_task_token(self, task: Task, token: CancellationToken) -> None:
+        """فك ارتباط رمز الإلغاء بالمهمة بعد انتهاء تنفيذها"""
+        task._cancel_token = None
+        token.detach()
+    
+    def _handle_interruption(self, task: Task, error: TaskCancelledError) -> None:
+        """معالجة مهمة قُطع تنفيذها بإيقاف الوكيل أو بإلغائها أو بانتهاء مهلتها
+
+        عند إيقاف الوكيل تعود المهمة إلى الانتظار لتُستأنف لاحقًا، وعند انتهاء
+        المهلة تفشل، وعند إلغائها (أو إلغاء مهمة أم) تُلغى مع مهامها المعلقة.
+        """
+        if self._run_token is not None and self._run_token.cancelled:
+            task.update_status(TaskStatus.PENDING)
+            if task.parent_id is None:
+                # إعادة المهمة الرئيسية إلى الطابور؛ المهام الفرعية تُعاد عبر المهمة الأم
+                self.scheduler.push(task)
+            self._log_action("Task Interrupted", f"'{task.name}' interrupted: {str(error)}")
+        else:
+            if isinstance(error, DeadlineExceededError):
+                task.fail(str(error))
+                self._log_action("Task Failed", f"'{task.name}' exceeded its deadline: {str(error)}")
+            else:
+                if task.status != TaskStatus.CANCELED:
+                    task.update_status(TaskStatus.CANCELED)
+                self._log_action("Task Canceled", f"'{task.name}' canceled: {str(error)}")
+                
+            # المهام الفرعية التي لم تبدأ لن تُنفذ بعد الآن
+            pending = list(task.subtasks)
+            while pending:
+                subtask = pending.pop()
+                pending.extend(subtask.subtasks)
+                if subtask.status == TaskStatus.PENDING:
+                    subtask.update_status(TaskStatus.CANCELED)
+                    self._checkpoint(subtask)
+            
+        if self.db_service:
+            self.db_service.update_task(task)
+        self._checkpoint(task)
+    
+    def _execute_task(self, task: Task, parent_token: Optional[CancellationToken] = None) -> None:
+        """تنفيذ مهمة محددة برمز إلغاء خاص بها متفرع من رمز المهمة الأم"""
+        token = self._task_token(task, parent_token)
+        try:
+            self._execute_task_with_token(task, token)
+        finally:
+            self._release_task_token(task, token)
+    
+    def _execute_task_with_token(self, task: Task, token: CancellationToken) -> None:
+        """تنفيذ مهمة محددة"""
+        if self._get_budget_level() >= LEVEL_EXHAUSTED:
+            self._fail_for_budget(task)
+            return
+            
+        # تقسيم المهمة الآن فقط إذا كانت على وشك التنفيذ (وضع التقسيم الكسول)
+        if self._should_expand(task):
+            self._break_down_task(task, allow_default=False, token=token)
+            if task.status != TaskStatus.PENDING or token.interrupted:
+                return
+                
+        self._mark_task_started(task)
+            
+        # إذا كانت المهمة لديها مهام فرعية، قم بتنفيذها أولاً
+        if task.subtasks:
+            try:
+                if self.parallel_subtasks:
+                    self._execute_subtasks_parallel(task, token)
+                else:
+                    # ترتيب المهام الفرعية حسب الأولوية
+                    sorted_subtasks = sorted(
+                        task.subtasks, 
+                        key=lambda subtask: (-subtask.priority, subtask.created_at)
+                    )
+                    
+                    for index, subtask in enumerate(sorted_subtasks):
+                        token.raise_if_cancelled()
+                        if subtask.status == TaskStatus.PENDING:
+                            self._prefetch(sorted_subtasks[index + 1:index + 1 + self.prefetch_window])
+                            self._execute_task(subtask, token)
+            except TaskCancelledError as e:
+                self._handle_interruption(task, e)
+                return
+            
+            self._finish_composite(task, token)
+        else:
+            # إذا لم تكن هناك مهام فرعية، قم بتنفيذ المهمة مباشرة
+            try:
+                # تحقق مما إذا كانت المهمة تتطلب أدوات محددة، مع استخدام التحضير المسبق إن وجد
+                prepared = self._take_prefetched(task, PREFETCH_EXECUTION, token)
+                required_tools, fused, prompt, context = prepared or self._prepare_execution(task)
+                tool_inputs = None
+                
+                # إكمال المهمة فورًا إذا نفذها وكيل آخر بالمعطيات نفسها
+                cache_key = self._result_cache_key(task, required_tools, fused)
+                if cache_key and self._serve_from_cache(task, cache_key):
+                    return
+                
+                if fused:
+                    # استدعاء واحد يعيد المسودة ومدخلات جميع الأدوات
+                    response = self._query_llm("fused_execution", prompt, token=token, context=context)
+                    result, tool_inputs = self._parse_fused_response(response, required_tools)
+                else:
+                    # تنفيذ المهمة باستخدام النموذج اللغوي، مع بث النتيجة إذا لم تُدمج لاحقًا مع نتائج أدوات
+                    result = self._query_llm(
+                        "execution", prompt, stream_to=None if required_tools else task, token=token, context=context
+                    )
+                
+                # استخدام الأدوات إذا كانت مطلوبة
+                if required_tools:
+                    tool_results = self._run_tools(task, required_tools, tool_inputs, token)
+                    
+                    # دمج نتائج الأدوات مع النتيجة الرئيسية
+                    if tool_results:
+                        result = self._integrate_tool_results(task, result, tool_results, token)
+                
+                if cache_key:
+                    self.result_cache.put(cache_key, result, task_name=task.name)
+                self._record_direct_success(task, prompt, result, required_tools)
+            except TaskCancelledError as e:
+                self._handle_interruption(task, e)
+            except Exception as e:
+                self._record_direct_failure(task, e)
+    
+    def _finish_composite(self, task: Task, token: CancellationToken) -> None:
+        """إنهاء مهمة مركبة بعد انتهاء مهامها الفرعية: تلخيص نتائجها أو تسجيل فشلها"""
+        try:
+            token.raise_if_cancelled()
+        except TaskCancelledError as e:
+            self._handle_interruption(task, e)
+            return
+            
+        # تحقق مما إذا كانت جميع المهام الفرعية مكتملة
+        if all(subtask.status == TaskStatus.COMPLETED for subtask in task.subtasks):
+            try:
+                final_result = self._query_llm(
+                    "summary", self._build_summary_prompt(task), stream_to=task, token=token
+                )
+                self._record_composite_success(task, final_result)
+            except TaskCancelledError as e:
+                self._handle_interruption(task, e)
+            except Exception as e:
+                logger.error(f"Error generating summary: {str(e)}", exc_info=True)
+                task.fail(f"Error generating summary: {str(e)}")
+                self._checkpoint(task)
+        else:
+            self._record_composite_failure(task)
+    
+    def _format_tool_result(self, tool: 'Tool', tool_result: Any = None, error: Optional[BaseException] = None) -> str:
+        """تنسيق نتيجة أداة أو سبب فشلها لإدراجها في نص الدمج"""
+        if isinstance(error, (FutureTimeoutError, asyncio.TimeoutError, DeadlineExceededError)):
+            return f"فشل تنفيذ أداة {tool.name}: انتهت المهلة بعد {self.tool_timeout} ثانية"
+        if error is not None:
+            return f"فشل تنفيذ أداة {tool.name}: {str(error)}"
+        return f"نتيجة أداة {tool.name}: {tool_result}"
+    
+    def _run_tools(
+        self,
+        task: Task,
+        tools: List['Tool'],
+        tool_inputs: Optional[List[Optional[str]]] = None,
+        token: Optional[CancellationToken] = None
+    ) -> List[str]:
+        """تشغيل الأدوات المطلوبة لمهمة بالتوازي وإعادة نتائجها بترتيب الأدوات
+
+        تُرسل استعلامات مدخلات الأدوات التي لا تملك مدخلات جاهزة معًا، ثم تُشغل
+        الأدوات معًا مع مهلة لكل أداة، وتبقى النتائج مرتبة حسب ترتيب الأدوات
+        لثبات نص الدمج. إلغاء المهمة يقطع الانتظار فورًا.
+        """
+        token = token or CancellationToken()
+        tool_instructions = list(tool_inputs) if tool_inputs is not None else [None] * len(tools)
+        call_token = token.child(self.llm_timeout)
+        instruction_futures = {
+            index: self.call_executor.submit(
+                self._query_llm_now, "tool_instructions", self._build_tool_prompt(task, tools[index]), None, call_token, {}
+            )
+            for index, instructions in enumerate(tool_instructions) if instructions is None
+        }
+        try:
+            for index, future in instruction_futures.items():
+                tool_instructions[index] = token.wait_for(future, self.llm_timeout)
+        finally:
+            call_token.detach()
+        
+        # استدعاء الأدوات بالمدخلات المقترحة
+        started_at = time.monotonic()
+        run_futures = [
+            self.call_executor.submit(tool.run, task.description, instructions)
+            for tool, instructions in zip(tools, tool_instructions)
+        ]
+        
+        tool_results = []
+        for tool, future in zip(tools, run_futures):
+            timeout = None
+            if self.tool_timeout is not None:
+                timeout = max(0.0, started_at + self.tool_timeout - time.monotonic())
+            try:
+                tool_results.append(self._format_tool_result(tool, token.wait_for(future, timeout)))
+            except Exception as e:
+                future.cancel()
+                if token.interrupted:
+                    # إلغاء المهمة أو انتهاء مهلتها يوقف بقية الأدوات أيضًا
+                    for pending in run_futures:
+                        pending.cancel()
+                    raise
+                tool_results.append(self._format_tool_result(tool, error=e))
+        return tool_results
+    
+    def _resolve_subtask_dependencies(self, task: Task) -> Dict[str, List[str]]:
+        """تحويل الاعتماديات المعلنة في البيانات الوصفية إلى معرفات المهام الفرعية"""
+        subtasks_by_id = {subtask.id: subtask for subtask in task.subtasks}
+        subtasks_by_name = {subtask.name.lower(): subtask for subtask in task.subtasks}
+        
+        dependencies = {}
+        for subtask in task.subtasks:
+            declared = subtask.metadata.get("depends_on") or []
+            if isinstance(declared, str):
+                declared = [declared]
+                
+            resolved = []
+            for reference in declared:
+                parent = subtasks_by_id.get(reference) or subtasks_by_name.get(str(reference).lower())
+                if parent is None or parent is subtask:
+                    logger.warning(f"Ignoring unknown dependency '{reference}' for subtask '{subtask.name}'")
+                    continue
+                if parent.id not in resolved:
+                    resolved.append(parent.id)
+                    
+            dependencies[subtask.id] = resolved
+            
+        return dependencies
+    
+    def _order_subtasks(self, task: Task, dependencies: Dict[str, List[str]]) -> Tuple[List[Task], List[Task]]:
+        """ترتيب المهام الفرعية طوبولوجيًا، وتعيد أيضًا المهام العالقة في اعتماديات دائرية"""
+        subtasks_by_id = {subtask.id: subtask for subtask in task.subtasks}
+        indegree = {subtask_id: len(parents) for subtask_id, parents in dependencies.items()}
+        children: Dict[str, List[str]] = {subtask_id: [] for subtask_id in dependencies}
+        for subtask_id, parents in dependencies.items():
+            for parent_id in parents:
+                children[parent_id].append(subtask_id)
+        
+        ready = sorted(
+            (subtasks_by_id[subtask_id] for subtask_id, degree in indegree.items() if degree == 0),
+            key=lambda subtask: (-subtask.priority, subtask.created_at)
+        )
+        ordered = []
+        while ready:
+            subtask = ready.pop(0)
+            ordered.append(subtask)
+            for child_id in children[subtask.id]:
+                indegree[child_id] -= 1
+                if indegree[child_id] == 0:
+                    ready.append(subtasks_by_id[child_id])
+                    
+        ordered_ids = {subtask.id for subtask in ordered}
+        cyclic = [subtask for subtask in task.subtasks if subtask.id not in ordered_ids]
+        return ordered, cyclic
+    
+    def _fail_blocked_subtask(self, subtask: Task, blocked_by: List[Task]) -> None:
+        """إفشال مهمة فرعية فشلت إحدى المهام التي تعتمد عليها"""
+        subtask.fail(f"Dependency failed: {', '.join(parent.name for parent in blocked_by)}")
+        self._discard_prefetched(subtask)
+        self._log_action("Task Failed", f"'{subtask.name}' skipped due to failed dependencies")
+        if self.db_service:
+            self.db_service.update_task(subtask)
+        self._checkpoint(subtask)
+    
+    def _execute_subtasks_parallel(self, task: Task, token: Optional[CancellationToken] = None) -> None:
+        """تنفيذ المهام الفرعية كمخطط اعتماديات مع تشغيل المهام المستقلة بالتوازي
+
+        ينتظر الخيط المستدعي وحده اكتمال المخطط؛ المهام المركبة داخله تُنسق
+        كمتابعات على مجمع العمال دون خيوط منتظرة إضافية.
+        """
+        self._start_subtask_graph(task, token or CancellationToken()).result()
+    
+    def _start_subtask_graph(self, task: Task, token: CancellationToken) -> Future:
+        """بدء تنفيذ المهام الفرعية كمخطط اعتماديات دون حجب أي خيط
+
+        كل مهمة جاهزة تُرسل إلى مجمع العمال، واكتمالها يستدعي متابعة تُرسل ما
+        أصبح جاهزًا بعدها. التقسيم الكسول يُرسل إلى المجمع أيضًا ثم تُرسل المهمة
+        بعد اكتماله، والمهام المركبة تُنسق بمخطط متداخل بالطريقة نفسها. عند
+        الإلغاء لا تبدأ مهام جديدة، ويكتمل الـ Future المعاد بعد توقف الجارية.
+        """
+        graph_done: Future = Future()
+        graph_done.set_running_or_notify_cancel()
+        subtasks_by_id = {subtask.id: subtask for subtask in task.subtasks}
+        dependencies = self._resolve_subtask_dependencies(task)
+        remaining = {subtask.id for subtask in task.subtasks if subtask.status == TaskStatus.PENDING}
+        # المهام الجاري تنفيذها أو تقسيمها
+        active: Set[str] = set()
+        # قابل لإعادة الدخول لأن المتابعة تُستدعى فورًا إذا اكتمل الـ Future قبل تسجيلها
+        lock = threading.RLock()
+        closed = False
+        
+        def step(future: Optional[Future] = None, subtask: Optional[Task] = None, expanded: bool = False) -> None:
+            """متابعة المخطط بعد اكتمال مهمة (أو عند البدء)، وإكمال الـ Future خارج القفل"""
+            try:
+                with lock:
+                    if subtask is not None:
+                        active.discard(subtask.id)
+                        error = future.exception()
+                        if error is not None and subtask.status != TaskStatus.FAILED:
+                            subtask.fail(str(error))
+                            self._checkpoint(subtask)
+                        elif expanded and subtask.status == TaskStatus.PENDING and not token.interrupted:
+                            dispatch(subtask)
+                    complete = advance()
+            except BaseException as e:
+                logger.error(f"Error scheduling subtasks of '{task.name}': {str(e)}", exc_info=True)
+                if not graph_done.done():
+                    graph_done.set_exception(e)
+                return
+            if complete:
+                graph_done.set_result(None)
+        
+        def dispatch(subtask: Task) -> None:
+            active.add(subtask.id)
+            if subtask.subtasks:
+                future = self._start_composite(subtask, token)
+            else:
+                future = self.thread_executor.submit(self._execute_task, subtask, token)
+            future.add_done_callback(lambda done: step(done, subtask))
+        
+        def advance() -> bool:
+            """إرسال المهام الجاهزة، وإرجاع True مرة واحدة عند انتهاء المخطط"""
+            nonlocal closed
+            if closed:
+                return False
+            progressed = True
+            while progressed:
+                progressed = False
+                ready = []
+                for subtask_id in list(remaining):
+                    subtask = subtasks_by_id[subtask_id]
+                    parents = [subtasks_by_id[parent_id] for parent_id in dependencies[subtask_id]]
+                    
+                    # إفشال المهام التي فشلت إحدى المهام التي تعتمد عليها
+                    blocked_by = [
+                        parent for parent in parents
+                        if parent.status in (TaskStatus.FAILED, TaskStatus.CANCELED)
+                    ]
+                    if blocked_by:
+                        remaining.discard(subtask_id)
+                        self._fail_blocked_subtask(subtask, blocked_by)
+                        progressed = True
+                    elif all(parent.status == TaskStatus.COMPLETED for parent in parents):
+                        ready.append(subtask)
+                
+                ready.sort(key=lambda subtask: (-subtask.priority, subtask.created_at))
+                for subtask in ready:
+                    # قد تكون متابعة متداخلة أرسلت المهمة بالفعل
+                    if token.interrupted or subtask.id not in remaining:
+                        continue
+                    remaining.discard(subtask.id)
+                    progressed = True
+                    if self._should_expand(subtask):
+                        active.add(subtask.id)
+                        future = self.thread_executor.submit(
+                            self._break_down_task, subtask, allow_default=False, token=token
+                        )
+                        future.add_done_callback(lambda done, subtask=subtask: step(done, subtask, True))
+                    else:
+                        dispatch(subtask)
+            
+            # قد تكون متابعة متداخلة أنهت المخطط أثناء الإرسال
+            if active or closed:
+                return False
+            if remaining and not token.interrupted:
+                # لا توجد مهمة جاهزة ولا مهمة قيد التنفيذ: اعتماديات دائرية
+                for subtask_id in remaining:
+                    subtask = subtasks_by_id[subtask_id]
+                    subtask.fail("Unresolvable subtask dependencies")
+                    if self.db_service:
+                        self.db_service.update_task(subtask)
+                    self._checkpoint(subtask)
+                self._log_action("Task Failed", f"'{task.name}' has circular subtask dependencies")
+                remaining.clear()
+            closed = True
+            return True
+        
+        step()
+        return graph_done
+    
+    def _start_composite(self, task: Task, parent_token: CancellationToken) -> Future:
+        """تنسيق مهمة مركبة كمتابعات: مخطط مهامها الفرعية ثم خطوة التلخيص على المجمع
+
+        يكتمل الـ Future المعاد بانتهاء المهمة دون أن يشغل انتظارها أي خيط.
+        """
+        result: Future = Future()
+        result.set_running_or_notify_cancel()
+        token = self._task_token(task, parent_token)
+        
+        def settle(future: Future) -> None:
+            self._release_task_token(task, token)
+            error = future.exception()
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(None)
+        
+        def summarize(graph: Future) -> None:
+            try:
+                graph.result()
+                self.thread_executor.submit(self._finish_composite, task, token).add_done_callback(settle)
+            except BaseException as e:
+                failed: Future = Future()
+                failed.set_exception(e)
+                settle(failed)
+        
+        try:
+            if self._get_budget_level() >= LEVEL_EXHAUSTED:
+                self._fail_for_budget(task)
+                graph: Future = Future()
+                graph.set_result(None)
+                settle(graph)
+                return result
+            self._mark_task_started(task)
+            self._start_subtask_graph(task, token).add_done_callback(summarize)
+        except BaseException as e:
+            failed = Future()
+            failed.set_exception(e)
+            settle(failed)
+        return result
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل الوكيل إلى قاموس للتخزين"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "goal": self.goal,
+            "description": self.description,
+            "creator_id": self.creator_id,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "is_running": self.is_running,
+            "is_paused": self.is_paused,
+            "parallel_subtasks": self.parallel_subtasks,
+            "tool_timeout": self.tool_timeout,
+            "fused_calls": self.fused_calls,
+            "stream_results": self.stream_results,
+            "task_timeout": self.task_timeout,
+            "run_timeout": self.run_timeout,
+            "llm_timeout": self.llm_timeout,
+            "summary_token_budget": self.summary_token_budget,
+            "lazy_decomposition": self.lazy_decomposition,
+            "max_depth": self.max_depth,
+            "max_fanout": self.max_fanout,
+            "expansion_min_words": self.expansion_min_words,
+            "prefetch_window": self.prefetch_window,
+            "llm_call_counts": self.get_llm_call_counts(),
+            "token_usage": self.get_token_usage(),
+            "token_budget": self.budget.to_dict() if self.budget else None,
+            "tasks": [task.to_dict() for task in self.tasks],
+            "history": self.history.to_dict(),
+            "memory": self.memory.to_dict(),
+            "tools": self.tools.to_dicts()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], llm_service: 'LLMService', 
+                 db_service: Optional['DatabaseService'] = None,
+                 tool_registry: Optional[Union[ToolRegistry, Dict[str, 'Tool']]] = None,
+                 learning_service: Optional['LearningService'] = None,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 call_executor: Optional[ThreadPoolExecutor] = None,
+                 history_limit: int = 500,
+                 history_dir: Optional[str] = None) -> 'Agent':
+        """استعادة وكيل من قاموس"""
+        agent = cls(
+            name=data["name"],
+            goal=data["goal"],
+            llm_service=llm_service,
+            db_service=db_service,
+            agent_id=data["id"],
+            description=data.get("description"),
+            creator_id=data.get("creator_id"),
+            learning_service=learning_service,
+            parallel_subtasks=data.get("parallel_subtasks", False),
+            executor=executor,
+            call_executor=call_executor,
+            history_limit=history_limit,
+            history_dir=history_dir,
+            tool_timeout=data.get("tool_timeout", 60.0),
+            fused_calls=data.get("fused_calls", False),
+            stream_results=data.get("stream_results", False),
+            task_timeout=data.get("task_timeout"),
+            run_timeout=data.get("run_timeout"),
+            llm_timeout=data.get("llm_timeout"),
+            summary_token_budget=data.get("summary_token_budget", 6000),
+            lazy_decomposition=data.get("lazy_decomposition", False),
+            max_depth=data.get("max_depth", 2),
+            max_fanout=data.get("max_fanout", 7),
+            expansion_min_words=data.get("expansion_min_words", 12),
+            prefetch_window=data.get("prefetch_window", 0)
+        )
+        
+        # تحويل التواريخ من النص إلى كائنات datetime
+        if "created_at" in data:
+            agent.created_at = datetime.fromisoformat(data["created_at"])
+        if "updated_at" in data:
+            agent.updated_at = datetime.fromisoformat(data["updated_at"])
+            
+        agent.is_running = data.get("is_running", False)
+        agent.is_paused = data.get("is_paused", False)
+        agent.history = AgentHistory.from_dict(
+            data.get("history", []),
+            max_entries=agent.history.max_entries,
+            spill_path=agent.history.spill_path
+        )
+        agent.llm_call_counts = dict(data.get("llm_call_counts", {}))
+        agent.token_usage.update(data.get("token_usage", {}))
+        if data.get("token_budget"):
+            agent.budget = TokenBudget.from_dict(data["token_budget"])
+        
+        # استعادة المهام
+        if "tasks" in data:
+            for task_data in data["tasks"]:
+                task = Task.from_dict(task_data)
+                agent.tasks.append(task)
+                agent.task_stats.track(task)
+                agent.scheduler.push(task)
+                
+        # استعادة الذاكرة
+        if "memory" in data:
+            agent.memory = AgentMemory.from_dict(data["memory"])
+            
+        # استعادة الأدوات
+        if "tools" in data and tool_registry:
+            tool_names = [tool_data["name"] for tool_data in data["tools"] if tool_data["name"] in tool_registry]
+            if isinstance(tool_registry, ToolRegistry):
+                agent.tools = tool_registry.view(tool_names)
+            else:
+                for tool_name in tool_names:
+                    agent.tools.append(tool_registry[tool_name])
+            agent._tool_catalog_cache = None
+                    
         return agent
\ No newline at end of file
@@ -0,0 +1,382 @@
+"""
+وكيل غير متزامن يعمل على حلقة أحداث asyncio
+"""
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+from core.agent import Agent
+from core.task import Task, TaskStatus
+from core.budget import LEVEL_EXHAUSTED, LEVEL_SKIP_INTEGRATION
+from core.cancellation import CancellationToken, TaskCancelledError
+from core.prefetch import PREFETCH_BREAKDOWN, PREFETCH_EXECUTION
+
+logger = logging.getLogger("autogpt")
+
+class AsyncAgent(Agent):
+    """وكيل ينفذ التقسيم والتنفيذ واستدعاء الأدوات والتلخيص كـ coroutines
+
+    يسمح ذلك لحلقة أحداث واحدة بتشغيل عدد كبير من الوكلاء المعتمدين على
+    الإدخال والإخراج دون تخصيص خيط نظام لكل وكيل.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._resume_event: Optional[asyncio.Event] = None
+
+    async def arun(self) -> None:
+        """تشغيل الوكيل على حلقة الأحداث الحالية حتى تنفد المهام المعلقة"""
+        with self.status_lock:
+            self.is_running = True
+            self.is_paused = False
+            self.scheduler.reset()
+            self._run_token = CancellationToken(self.run_timeout)
+
+        self._loop = asyncio.get_running_loop()
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+
+        logger.info(f"🤖 Agent '{self.name}' starting (async) with goal: {self.goal}")
+        self._log_action("Agent Started", f"Starting with goal: {self.goal}")
+
+        try:
+            # إذا لم تكن هناك مهام، قم بإنشاء مهمة أولية استنادًا إلى الهدف
+            if not self.tasks:
+                self.add_task("Main Goal", self.goal, priority=10, tags=["main", "auto-generated"])
+
+            for task in self.tasks:
+                if self._needs_breakdown(task):
+                    await self._abreak_down_task(task, token=self._run_token)
+
+            while self.is_running:
+                # الانتظار دون استطلاع أثناء الإيقاف المؤقت
+                if not self._resume_event.is_set():
+                    await self._resume_event.wait()
+                    continue
+
+                task = self.scheduler.pop(block=False)
+                if task is None:
+                    if self.scheduler.is_paused:
+                        # إفساح المجال لتطبيق إشارة الإيقاف المؤقت على الحدث
+                        await asyncio.sleep(0)
+                        continue
+                    break
+                if self._run_token.expired:
+                    self.stop("Run deadline exceeded")
+                    break
+
+                self._prefetch(self.scheduler.peek(self.prefetch_window))
+                await self._aexecute_task(task, self._run_token)
+
+            self._finish_run()
+        except Exception as e:
+            self._handle_run_error(e)
+
+    async def aresume_from_checkpoint(self) -> None:
+        """استئناف تشغيل متقطع من آخر نقاط الاستعادة على حلقة الأحداث الحالية"""
+        self.restore_checkpoint()
+        await self.arun()
+
+    def stop(self, reason: str = "Manual stop requested") -> None:
+        """إيقاف تشغيل الوكيل وإيقاظ الحلقة إذا كانت في انتظار الاستئناف"""
+        super().stop(reason)
+        self._signal_resume(True)
+
+    def pause(self) -> None:
+        """إيقاف تشغيل الوكيل مؤقتًا"""
+        super().pause()
+        self._signal_resume(not self.is_paused)
+
+    def resume(self) -> None:
+        """استئناف تشغيل الوكيل بعد الإيقاف المؤقت"""
+        super().resume()
+        self._signal_resume(not self.is_paused)
+
+    def _signal_resume(self, resumed: bool) -> None:
+        """تحديث حدث الاستئناف من أي خيط بشكل آمن"""
+        if self._loop is None or self._resume_event is None or self._loop.is_closed():
+            return
+        callback = self._resume_event.set if resumed else self._resume_event.clear
+        self._loop.call_soon_threadsafe(callback)
+
+    async def _abreak_down_task(
+        self,
+        task: Task,
+        allow_default: bool = True,
+        token: Optional[CancellationToken] = None
+    ) -> None:
+        """تقسيم مهمة إلى مهام فرعية باستخدام نموذج لغوي بشكل غير متزامن"""
+        self._log_action("Task Breakdown Started", f"Breaking down task: {task.name}")
+        task.update_status(TaskStatus.IN_PROGRESS)
+        self._checkpoint(task)
+
+        try:
+            response = await self._atake_prefetched(task, PREFETCH_BREAKDOWN, token)
+            if response is None:
+                prompt, context = self._build_breakdown_request(task)
+                response = await self._aquery_llm("breakdown", prompt, token=token, context=context)
+            self._log_action("LLM Response", f"Received response for task breakdown")
+            if self._apply_breakdown_response(task, response):
+                return
+
+            response = await self._aquery_llm(
+                "breakdown_fallback", self._build_breakdown_fallback_prompt(task), token=token
+            )
+            if self._apply_breakdown_response(task, response, fallback=True):
+                return
+
+            if allow_default:
+                self._apply_default_breakdown(task)
+            else:
+                self._skip_breakdown(task)
+
+        except TaskCancelledError as e:
+            self._handle_interruption(task, e)
+        except Exception as e:
+            logger.error(f"Error in task breakdown: {str(e)}", exc_info=True)
+            self._log_action("Task Breakdown Error", f"Error: {str(e)}")
+            task.fail(f"Could not break down task: {str(e)}")
+            self._checkpoint(task)
+
+    async def _aexecute_task(self, task: Task, parent_token: Optional[CancellationToken] = None) -> None:
+        """تنفيذ مهمة محددة بشكل غير متزامن برمز إلغاء خاص بها"""
+        token = self._task_token(task, parent_token)
+        try:
+            await self._aexecute_task_with_token(task, token)
+        finally:
+            self._release_task_token(task, token)
+
+    async def _aexecute_task_with_token(self, task: Task, token: CancellationToken) -> None:
+        """تنفيذ مهمة محددة بشكل غير متزامن"""
+        if self._get_budget_level() >= LEVEL_EXHAUSTED:
+            self._fail_for_budget(task)
+            return
+
+        if self._should_expand(task):
+            await self._abreak_down_task(task, allow_default=False, token=token)
+            if task.status != TaskStatus.PENDING or token.interrupted:
+                return
+
+        self._mark_task_started(task)
+
+        if task.subtasks:
+            try:
+                await self._aexecute_subtasks(task, token)
+                token.raise_if_cancelled()
+            except TaskCancelledError as e:
+                self._handle_interruption(task, e)
+                return
+
+            if all(subtask.status == TaskStatus.COMPLETED for subtask in task.subtasks):
+                try:
+                    final_result = await self._aquery_llm(
+                        "summary", self._build_summary_prompt(task), stream_to=task, token=token
+                    )
+                    self._record_composite_success(task, final_result)
+                except TaskCancelledError as e:
+                    self._handle_interruption(task, e)
+                except Exception as e:
+                    logger.error(f"Error generating summary: {str(e)}", exc_info=True)
+                    task.fail(f"Error generating summary: {str(e)}")
+                    self._checkpoint(task)
+            else:
+                self._record_composite_failure(task)
+        else:
+            try:
+                prepared = await self._atake_prefetched(task, PREFETCH_EXECUTION, token)
+                required_tools, fused, prompt, context = prepared or self._prepare_execution(task)
+                tool_inputs = None
+
+                cache_key = self._result_cache_key(task, required_tools, fused)
+                if cache_key and self._serve_from_cache(task, cache_key):
+                    return
+
+                if fused:
+                    response = await self._aquery_llm("fused_execution", prompt, token=token, context=context)
+                    result, tool_inputs = self._parse_fused_response(response, required_tools)
+                else:
+                    result = await self._aquery_llm(
+                        "execution", prompt, stream_to=None if required_tools else task, token=token, context=context
+                    )
+
+                if required_tools:
+                    tool_results = await self._arun_tools(task, required_tools, tool_inputs, token)
+
+                    if tool_results:
+                        result = await self._aintegrate_tool_results(task, result, tool_results, token)
+
+                if cache_key:
+                    self.result_cache.put(cache_key, result, task_name=task.name)
+                self._record_direct_success(task, prompt, result, required_tools)
+            except TaskCancelledError as e:
+                self._handle_interruption(task, e)
+            except Exception as e:
+                self._record_direct_failure(task, e)
+
+    async def _atake_prefetched(
+        self,
+        task: Task,
+        kind: str,
+        token: Optional[CancellationToken] = None
+    ) -> Optional[Any]:
+        """الحصول على نتيجة التحضير المسبق لمهمة دون حجب حلقة الأحداث"""
+        if self.prefetcher is None:
+            return None
+        return await self.prefetcher.atake(task, kind, token)
+
+    async def _aquery_llm(
+        self,
+        call_site: str,
+        prompt: str,
+        stream_to: Optional[Task] = None,
+        token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> str:
+        """إرسال استعلام غير متزامن إلى النموذج اللغوي مع احتسابه ضمن موضع الاستدعاء
+
+        يُلغى الاستدعاء فور إلغاء الرمز أو انتهاء مهلة الاستدعاءات، وتنتهي طلبات
+        HTTP التي تنفذها الخدمة في خيوط منفصلة بالحدود نفسها.
+        """
+        async def call(call_token: Optional[CancellationToken]) -> str:
+            # الاستخدام يُقرأ داخل المهمة نفسها لأن متغيرات السياق لا تعود منها إلى المستدعي
+            prepared = self._prepare_llm_call(call_site, kwargs)
+            with self._http_bounds(call_token):
+                if stream_to is not None and self.stream_results:
+                    response = await self._aconsume_stream(stream_to, self.llm_service.aquery_stream(prompt, **prepared))
+                else:
+                    response = await self.llm_service.aquery(prompt, **prepared)
+            self._record_token_usage(prompt, prepared.get("context"), response)
+            return response
+
+        if token is None and self.llm_timeout is None:
+            return await call(None)
+        token = token or CancellationToken()
+        call_token = token.child(self.llm_timeout)
+        try:
+            return await token.await_for(call(call_token), self.llm_timeout)
+        finally:
+            call_token.detach()
+
+    async def _aconsume_stream(self, task: Task, chunks: AsyncIterator[str]) -> str:
+        """استهلاك بث استجابة غير متزامن إلى نتيجة المهمة وإعادة النص الكامل"""
+        started = self._begin_stream(task)
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                self._publish_chunk(task, chunk, started)
+        except (Exception, asyncio.CancelledError):
+            task.result = None
+            raise
+        return "".join(parts)
+
+    async def _aintegrate_tool_results(
+        self,
+        task: Task,
+        result: str,
+        tool_results: List[str],
+        token: Optional[CancellationToken] = None
+    ) -> str:
+        """دمج نتائج الأدوات مع النتيجة بشكل غير متزامن، أو إلحاقها عند تخطي الدمج"""
+        if self._get_budget_level() >= LEVEL_SKIP_INTEGRATION:
+            return "\n\n".join([result] + tool_results)
+        return await self._aquery_llm(
+            "integration", self._build_integration_prompt(task, result, tool_results), stream_to=task, token=token
+        )
+
+    async def _arun_tools(
+        self,
+        task: Task,
+        tools: List['Tool'],
+        tool_inputs: Optional[List[Optional[str]]] = None,
+        token: Optional[CancellationToken] = None
+    ) -> List[str]:
+        """تشغيل الأدوات المطلوبة لمهمة بالتوازي مع مهلة لكل أداة وترتيب ثابت للنتائج
+
+        إلغاء المهمة يلغي جميع استدعاءات الأدوات الجارية فورًا.
+        """
+        token = token or CancellationToken()
+        tool_instructions = list(tool_inputs) if tool_inputs is not None else [None] * len(tools)
+        missing = [index for index, instructions in enumerate(tool_instructions) if instructions is None]
+        responses = await token.await_for(asyncio.gather(*(
+            self._aquery_llm("tool_instructions", self._build_tool_prompt(task, tools[index]))
+            for index in missing
+        )))
+        for index, instructions in zip(missing, responses):
+            tool_instructions[index] = instructions
+
+        outcomes = await token.await_for(asyncio.gather(*(
+            asyncio.wait_for(self._arun_tool(tool, task.description, instructions), self.tool_timeout)
+            for tool, instructions in zip(tools, tool_instructions)
+        ), return_exceptions=True))
+
+        return [
+            self._format_tool_result(tool, error=outcome) if isinstance(outcome, BaseException)
+            else self._format_tool_result(tool, outcome)
+            for tool, outcome in zip(tools, outcomes)
+        ]
+
+    async def _arun_tool(self, tool: 'Tool', query: str, params: Optional[str] = None) -> str:
+        """تشغيل أداة دون حجب حلقة الأحداث"""
+        if hasattr(tool, "arun"):
+            return await tool.arun(query, params)
+        return await asyncio.to_thread(tool.run, query, params)
+
+    async def _aexecute_subtasks(self, task: Task, token: CancellationToken) -> None:
+        """تنفيذ المهام الفرعية بالتتابع أو كمخطط اعتماديات متوازٍ"""
+        if not self.parallel_subtasks:
+            sorted_subtasks = sorted(
+                task.subtasks,
+                key=lambda subtask: (-subtask.priority, subtask.created_at)
+            )
+            for index, subtask in enumerate(sorted_subtasks):
+                token.raise_if_cancelled()
+                if subtask.status == TaskStatus.PENDING:
+                    self._prefetch(sorted_subtasks[index + 1:index + 1 + self.prefetch_window])
+                    await self._aexecute_task(subtask, token)
+            return
+
+        subtasks_by_id = {subtask.id: subtask for subtask in task.subtasks}
+        dependencies = self._resolve_subtask_dependencies(task)
+        ordered, cyclic = self._order_subtasks(task, dependencies)
+        runners: Dict[str, asyncio.Task] = {}
+
+        async def run_subtask(subtask: Task) -> None:
+            # انتظار المهام التي تعتمد عليها هذه المهمة فقط
+            for parent_id in dependencies[subtask.id]:
+                if parent_id in runners:
+                    await runners[parent_id]
+
+            # عدم بدء مهام جديدة بعد الإلغاء؛ تبقى معلقة أو تُلغى مع المهمة الأم
+            if token.interrupted:
+                return
+
+            parents = [subtasks_by_id[parent_id] for parent_id in dependencies[subtask.id]]
+            blocked_by = [parent for parent in parents if parent.status != TaskStatus.COMPLETED]
+            if blocked_by:
+                self._fail_blocked_subtask(subtask, blocked_by)
+                return
+
+            await self._aexecute_task(subtask, token)
+
+        # الترتيب الطوبولوجي يضمن إنشاء مهمة كل أب قبل أبنائه
+        for subtask in ordered:
+            if subtask.status == TaskStatus.PENDING:
+                runners[subtask.id] = asyncio.ensure_future(run_subtask(subtask))
+
+        for subtask in cyclic:
+            if subtask.status == TaskStatus.PENDING:
+                subtask.fail("Unresolvable subtask dependencies")
+                if self.db_service:
+                    self.db_service.update_task(subtask)
+                self._checkpoint(subtask)
+
+        if runners:
+            await asyncio.gather(*runners.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل الوكيل إلى قاموس للتخزين"""
+        data = super().to_dict()
+        data["runtime"] = "async"
+        return data
\ No newline at end of file
@@ -1,320 +1,725 @@
-"""
-الفئة الرئيسية AutoGPT التي تدير النظام بأكمله
-"""
-import os
-import logging
-import sys
-from typing import List, Dict, Any, Optional, Union, Tuple, Set, Callable
-from datetime import datetime
-
-# تعديل الاستيرادات من استيرادات نسبية إلى مطلقة
-from core.agent import Agent
-from core.task import Task, TaskStatus
-from core.memory import AgentMemory
-
-logger = logging.getLogger("autogpt")
-
-class AutoGPT:
-    """واجهة رئيسية للتفاعل مع نظام وكلاء الذكاء الاصطناعي"""
-    
-    def __init__(
-        self, 
-        llm_provider: str = "openai",
-        api_key: Optional[str] = None,
-        db_provider: str = "memory",
-        db_connection_string: Optional[str] = None,
-        enable_learning: bool = False
-    ):
-        # إعداد خدمة النموذج اللغوي
-        self.llm_provider = llm_provider
-        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        self.llm_service = self._create_llm_service(llm_provider, self.api_key)
-        
-        # إعداد خدمة قاعدة البيانات
-        self.db_provider = db_provider
-        self.db_service = self._create_db_service(db_provider, db_connection_string)
-        
-        # إعداد خدمة التعلم
-        self.enable_learning = enable_learning
-        self.learning_service = self._create_learning_service() if enable_learning else None
-        
-        # تسجيل الأدوات المتاحة
-        self.tool_registry = {}
-        self._register_default_tools()
-        
-        # قائمة الوكلاء
-        self.agents = {}
-        
-        # استعادة الوكلاء المخزنة إذا كانت قاعدة البيانات متوفرة
-        if self.db_service:
-            self._load_agents_from_db()
-            
-        logger.info(f"🚀 AutoGPT initialized with LLM: {llm_provider}, DB: {db_provider}")
-    
-    def _create_llm_service(self, provider: str, api_key: Optional[str] = None) -> 'LLMService':
-        """إنشاء خدمة النموذج اللغوي المناسبة"""
-        try:
-            if provider == "openai":
-                try:
-                    from llm.openai_service import OpenAIService
-                    return OpenAIService(api_key)
-                except ImportError as e:
-                    print(f"خطأ في استيراد OpenAIService: {e}")
-                    print("الرجوع إلى خدمة المحاكاة...")
-            elif provider == "claude":
-                try:
-                    from llm.anthropic_service import AnthropicService
-                    return AnthropicService(api_key)
-                except ImportError as e:
-                    print(f"خطأ في استيراد AnthropicService: {e}")
-                    print("الرجوع إلى خدمة المحاكاة...")
-            elif provider == "llama":
-                try:
-                    from llm.llama_service import LlamaService
-                    return LlamaService()
-                except ImportError as e:
-                    print(f"خطأ في استيراد LlamaService: {e}")
-                    print("الرجوع إلى خدمة المحاكاة...")
-            elif provider == "mock":
-                from llm.mock_service import MockLLMService
-                return MockLLMService()
-            else:
-                print(f"تحذير: مزود LLM غير معروف '{provider}'، استخدام خدمة المحاكاة")
-                
-            # إذا وصلنا إلى هنا، فهناك مشكلة، لذا نستخدم المحاكاة
-            from llm.mock_service import MockLLMService
-            return MockLLMService()
-        
-        except Exception as e:
-            print(f"خطأ غير متوقع أثناء إنشاء خدمة LLM: {e}")
-            print("الرجوع إلى خدمة المحاكاة...")
-            
-            try:
-                from llm.mock_service import MockLLMService
-                return MockLLMService()
-            except ImportError:
-                # إذا كان ملف المحاكاة غير موجود، نقوم بإنشاء فئة محاكاة مضمنة
-                print("خدمة المحاكاة غير موجودة، إنشاء محاكاة مضمنة...")
-                
-                from llm.llm_service import LLMService
-                from typing import List
-                
-                class InlineMockLLMService(LLMService):
-                    def query(self, prompt: str, **kwargs) -> str:
-                        return f"استجابة محاكاة مضمنة لاستعلام: {prompt[:50]}..."
-                    
-                    def get_embedding(self, text: str) -> List[float]:
-                        return [0.1, 0.2, 0.3, 0.4, 0.5]  # قيم للاختبار
-                
-                return InlineMockLLMService()
-    
-    def _create_db_service(self, provider: str, connection_string: Optional[str] = None) -> Optional['DatabaseService']:
-        """إنشاء خدمة قاعدة البيانات المناسبة"""
-        try:
-            if provider == "memory":
-                from database.memory_db import MemoryDatabaseService
-                return MemoryDatabaseService()
-            elif provider == "sqlite":
-                from database.sqlite_db import SQLiteDatabaseService
-                return SQLiteDatabaseService(connection_string or "autogpt.db")
-            elif provider == "mongodb":
-                from database.mongo_db import MongoDatabaseService
-                return MongoDatabaseService(connection_string)
-            elif provider == "none":
-                return None
-            else:
-                print(f"تحذير: مزود DB غير معروف: {provider}، استخدام قاعدة بيانات في الذاكرة")
-                from database.memory_db import MemoryDatabaseService
-                return MemoryDatabaseService()
-        except ImportError as e:
-            print(f"خطأ في استيراد خدمة قاعدة البيانات: {e}")
-            print("الرجوع إلى قاعدة بيانات في الذاكرة...")
-            try:
-                from database.memory_db import MemoryDatabaseService
-                return MemoryDatabaseService()
-            except ImportError:
-                print("تعذر استيراد حتى قاعدة البيانات في الذاكرة، العمل بدون تخزين")
-                return None
-    
-    def _create_learning_service(self) -> Optional['LearningService']:
-        """إنشاء خدمة التعلم"""
-        try:
-            from learning.learning_service import LearningService
-            return LearningService()
-        except ImportError as e:
-            print(f"خطأ في استيراد خدمة التعلم: {e}")
-            print("تعطيل خاصية التعلم...")
-            return None
-    
-    def _register_default_tools(self) -> None:
-        """تسجيل الأدوات الافتراضية"""
-        try:
-            # محاولة استيراد الأدوات الأساسية
-            tool_modules = [
-                ("tools.web_search", "WebSearchTool"),
-                ("tools.web_scraping", "WebScrapingTool"),
-                ("tools.file_operations", "FileOperationsTool"),
-                ("tools.data_analysis", "DataAnalysisTool"),
-                ("tools.content_generator", "ContentGeneratorTool")
-            ]
-            
-            for module_path, class_name in tool_modules:
-                try:
-                    module = __import__(module_path, fromlist=[class_name])
-                    tool_class = getattr(module, class_name)
-                    tool = tool_class()
-                    self.register_tool(tool)
-                except (ImportError, AttributeError) as e:
-                    print(f"تعذر تحميل الأداة {class_name}: {e}")
-                    
-        except Exception as e:
-            print(f"خطأ أثناء تسجيل الأدوات الافتراضية: {e}")
-            print("تخطي تسجيل الأدوات...")
-    
-    def register_tool(self, tool: 'Tool') -> None:
-        """تسجيل أداة جديدة في النظام"""
-        self.tool_registry[tool.name] = tool
-        logger.info(f"Tool registered: {tool.name}")
-    
-    def _load_agents_from_db(self) -> None:
-        """تحميل الوكلاء المخزنة من قاعدة البيانات"""
-        if not self.db_service:
-            return
-            
-        try:
-            agent_dicts = self.db_service.get_all_agents()
-            for agent_dict in agent_dicts:
-                agent = Agent.from_dict(
-                    agent_dict, 
-                    self.llm_service, 
-                    self.db_service,
-                    self.tool_registry,
-                    self.learning_service
-                )
-                self.agents[agent.id] = agent
-                logger.info(f"Loaded agent from database: {agent.name} (ID: {agent.id})")
-        except Exception as e:
-            print(f"خطأ أثناء تحميل الوكلاء من قاعدة البيانات: {e}")
-    
-    def create_agent(
-        self, 
-        name: str, 
-        goal: str, 
-        description: Optional[str] = None,
-        creator_id: Optional[str] = None,
-        tools: Optional[List[str]] = None
-    ) -> Agent:
-        """إنشاء وكيل جديد بهدف محدد"""
-        # تجميع الأدوات المطلوبة
-        agent_tools = []
-        if tools:
-            for tool_name in tools:
-                if tool_name in self.tool_registry:
-                    agent_tools.append(self.tool_registry[tool_name])
-        
-        # إنشاء الوكيل
-        agent = Agent(
-            name=name, 
-            goal=goal, 
-            llm_service=self.llm_service,
-            db_service=self.db_service,
-            description=description,
-            creator_id=creator_id,
-            tools=agent_tools,
-            learning_service=self.learning_service
-        )
-        
-        # تسجيل الوكيل
-        self.agents[agent.id] = agent
-        
-        # حفظ الوكيل في قاعدة البيانات إذا كانت متاحة
-        if self.db_service:
-            self.db_service.save_agent(agent)
-            
-        logger.info(f"Created new agent: {name} (ID: {agent.id})")
-        return agent
-    
-    def list_agents(self, creator_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """الحصول على قائمة جميع الوكلاء المتاحين"""
-        agents_list = []
-        for agent_id, agent in self.agents.items():
-            if creator_id and agent.creator_id != creator_id:
-                continue
-                
-            agents_list.append({
-                "id": agent.id,
-                "name": agent.name,
-                "goal": agent.goal,
-                "description": agent.description,
-                "is_running": agent.is_running,
-                "is_paused": agent.is_paused if hasattr(agent, 'is_paused') else False,
-                "creator_id": agent.creator_id,
-                "created_at": agent.created_at.isoformat(),
-                "status": agent.get_status() if hasattr(agent, 'get_status') else {}
-            })
-            
-        return agents_list
-    
-    def get_agent(self, agent_id: str) -> Optional[Agent]:
-        """الحصول على وكيل معين بالمعرف"""
-        return self.agents.get(agent_id)
-    
-    def delete_agent(self, agent_id: str) -> bool:
-        """حذف وكيل"""
-        if agent_id in self.agents:
-            agent = self.agents[agent_id]
-            
-            # إيقاف الوكيل إذا كان قيد التشغيل
-            if agent.is_running:
-                agent.stop()
-                
-            # حذف الوكيل من قاعدة البيانات إذا كانت متاحة
-            if self.db_service:
-                self.db_service.delete_agent(agent_id)
-                
-            # حذف الوكيل من القائمة
-            del self.agents[agent_id]
-            
-            logger.info(f"Deleted agent ID: {agent_id}")
-            return True
-            
-        return False
-    
-    def get_available_tools(self) -> List[Dict[str, str]]:
-        """الحصول على قائمة الأدوات المتاحة في النظام"""
-        return [
-            {"name": name, "description": tool.description}
-            for name, tool in self.tool_registry.items()
-        ]
-    
-    def get_agent_tasks(self, agent_id: str, include_subtasks: bool = True) -> List[Dict[str, Any]]:
-        """الحصول على قائمة مهام الوكيل"""
-        agent = self.get_agent(agent_id)
-        if not agent:
-            return []
-            
-        return [task.to_dict(include_subtasks) for task in agent.tasks]
-    
-    def get_agent_history(self, agent_id: str) -> List[Dict[str, Any]]:
-        """الحصول على سجل إجراءات الوكيل"""
-        agent = self.get_agent(agent_id)
-        if not agent:
-            return []
-            
-        return agent.history
-    
-    def save_state(self) -> None:
-        """حفظ حالة النظام بالكامل"""
-        if not self.db_service:
-            logger.warning("Cannot save state: no database service available")
-            return
-            
-        for agent in self.agents.values():
-            self.db_service.save_agent(agent)
-            
-        logger.info(f"Saved state with {len(self.agents)} agents")
-    
-    def load_state(self) -> None:
-        """تحميل حالة النظام"""
-        self._load_agents_from_db()
+"""
+الفئة الرئيسية AutoGPT التي تدير النظام بأكمله
+"""
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+# تعديل الاستيرادات من استيرادات نسبية إلى مطلقة
+from core.agent import Agent
+from core.async_agent import AsyncAgent
+from core.orchestrator import AgentOrchestrator
+from core.process_runner import run_agent_in_process
+from core.prompts import get_prompt_stats
+from core.budget import BudgetManager
+from core.result_cache import ResultCache
+from llm.cached_service import CachedLLMService
+from llm.http import PooledHTTPClient
+from llm.rate_limiter import RateLimiter, RateLimitedLLMService
+from llm.single_flight import SingleFlightLLMService
+from llm.embeddings import EmbeddingCache, CachedEmbeddingService
+from llm.router import RouterLLMService
+from tools.registry import ToolRegistry, DEFAULT_TOOL_ENTRY_POINTS
+from core.task import Task
+
+logger = logging.getLogger("autogpt")
+
+# متغيرات البيئة لمفاتيح API الخاصة بكل مزود عند استخدامه ضمن الموجه
+PROVIDER_API_KEY_ENV = {
+    "openai": "OPENAI_API_KEY",
+    "claude": "ANTHROPIC_API_KEY"
+}
+
+class AutoGPT:
+    """واجهة رئيسية للتفاعل مع نظام وكلاء الذكاء الاصطناعي"""
+    
+    def __init__(
+        self, 
+        llm_provider: str = "openai",
+        api_key: Optional[str] = None,
+        db_provider: str = "memory",
+        db_connection_string: Optional[str] = None,
+        enable_learning: bool = False,
+        max_workers: int = 16,
+        max_concurrent_agents: int = 8,
+        process_pool_workers: int = 0,
+        history_limit: int = 500,
+        history_dir: Optional[str] = None,
+        result_cache_ttl: Optional[float] = 86400.0,
+        llm_cache: bool = False,
+        llm_cache_size: int = 1024,
+        llm_cache_path: Optional[str] = None,
+        llm_cache_max_bytes: int = 64 * 1024 * 1024,
+        llm_cache_nonzero_temperature: bool = False,
+        http_pool_size: int = 10,
+        http_max_retries: int = 3,
+        llm_requests_per_minute: Optional[float] = None,
+        llm_tokens_per_minute: Optional[float] = None,
+        llm_max_concurrent: Optional[int] = None,
+        llm_single_flight: bool = False,
+        embedding_cache_size: int = 10000,
+        router_backends: Optional[Dict[str, float]] = None,
+        router_hedging: bool = False,
+        router_api_keys: Optional[Dict[str, str]] = None,
+        anthropic_simulate: bool = False
+    ):
+        # إعداد خدمة النموذج اللغوي
+        self.llm_provider = llm_provider
+        self.api_key = api_key or os.environ.get(PROVIDER_API_KEY_ENV.get(llm_provider, "OPENAI_API_KEY"))
+        # إعادة استجابات محاكاة من Claude بدل إرسال طلبات فعلية إلى Anthropic
+        self.anthropic_simulate = anthropic_simulate
+        # مجمع اتصالات HTTP دائمة مشترك بين استدعاءات مزود النموذج
+        self.http_client = PooledHTTPClient(pool_size=http_pool_size, max_retries=http_max_retries)
+        # مزودو الموجه وأوزانهم عند llm_provider="router"
+        self.router_backends = router_backends or {"openai": 1.0, "claude": 1.0}
+        self.router_hedging = router_hedging
+        # عدد الاستدعاءات المتزامنة في مجمع استدعاءات المنسق، يحدد حجم مجمع طلبات الموجه
+        self.max_workers = max_workers
+        # مفاتيح API لكل مزود في الموجه؛ تُقرأ من متغير بيئة المزود إن لم تُحدد
+        self.router_api_keys = router_api_keys or {}
+        # إعدادات خدمة النموذج اللغوي وأغلفتها، تُمرر إلى العمليات الفرعية لإعادة بنائها
+        self.llm_config: Dict[str, Any] = {
+            "llm_provider": llm_provider,
+            "api_key": api_key,
+            "llm_cache": llm_cache,
+            "llm_cache_size": llm_cache_size,
+            "llm_cache_path": llm_cache_path,
+            "llm_cache_max_bytes": llm_cache_max_bytes,
+            "llm_cache_nonzero_temperature": llm_cache_nonzero_temperature,
+            "http_pool_size": http_pool_size,
+            "http_max_retries": http_max_retries,
+            "llm_requests_per_minute": llm_requests_per_minute,
+            "llm_tokens_per_minute": llm_tokens_per_minute,
+            "llm_max_concurrent": llm_max_concurrent,
+            "llm_single_flight": llm_single_flight,
+            "embedding_cache_size": embedding_cache_size,
+            "router_backends": router_backends,
+            "router_hedging": router_hedging,
+            "router_api_keys": router_api_keys,
+            "anthropic_simulate": anthropic_simulate
+        }
+        self.llm_service = self._create_llm_service(llm_provider, self.api_key)
+        
+        # محدد معدل اختياري للاستدعاءات المرسلة فعليًا إلى المزود (None = معطل)
+        self.rate_limiter = None
+        if llm_requests_per_minute or llm_tokens_per_minute or llm_max_concurrent:
+            self.rate_limiter = RateLimiter(
+                requests_per_minute=llm_requests_per_minute,
+                tokens_per_minute=llm_tokens_per_minute,
+                max_concurrent=llm_max_concurrent
+            )
+            self.llm_service = RateLimitedLLMService(self.llm_service, self.rate_limiter)
+        
+        # دمج الاستعلامات المتطابقة الجارية في وقت واحد في طلب واحد إلى المزود
+        self.single_flight = SingleFlightLLMService(self.llm_service) if llm_single_flight else None
+        if self.single_flight:
+            self.llm_service = self.single_flight
+        
+        # ذاكرة مؤقتة اختيارية لاستجابات النموذج اللغوي (في الذاكرة وعلى القرص)
+        # تغلف محدد المعدل حتى لا تستهلك الإصابات من حصة المزود
+        self.llm_cache = None
+        if llm_cache:
+            self.llm_cache = self.llm_service = CachedLLMService(
+                self.llm_service,
+                max_entries=llm_cache_size,
+                db_path=llm_cache_path,
+                max_disk_bytes=llm_cache_max_bytes,
+                cache_nonzero_temperature=llm_cache_nonzero_temperature
+            )
+        
+        # ذاكرة مؤقتة للتمثيلات الشعاعية معنونة بالمحتوى أمام get_embeddings (0 = معطلة)
+        self.embedding_cache = EmbeddingCache(embedding_cache_size) if embedding_cache_size else None
+        if self.embedding_cache:
+            self.llm_service = CachedEmbeddingService(self.llm_service, self.embedding_cache)
+        
+        # إعداد خدمة قاعدة البيانات
+        self.db_provider = db_provider
+        self.db_connection_string = db_connection_string
+        self.db_service = self._create_db_service(db_provider, db_connection_string)
+        
+        # إعداد خدمة التعلم
+        self.enable_learning = enable_learning
+        self.learning_service = self._create_learning_service() if enable_learning else None
+        
+        # تسجيل الأدوات المتاحة
+        self.tool_registry = ToolRegistry()
+        self._register_default_tools()
+        
+        # قائمة الوكلاء
+        self.agents = {}
+        
+        # حدود سجل إجراءات الوكلاء في الذاكرة ومجلد ترحيل الإدخالات الأقدم
+        self.history_limit = history_limit
+        self.history_dir = history_dir
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+        
+        # ميزانيات التوكنات المشتركة لكل منشئ
+        self.budget_manager = BudgetManager()
+        
+        # ذاكرة مؤقتة لنتائج المهام مشتركة بين جميع الوكلاء في قاعدة البيانات (None = معطلة)
+        self.result_cache = (
+            ResultCache(self.db_service, result_cache_ttl) if self.db_service and result_cache_ttl else None
+        )
+        
+        # منسق تشغيل الوكلاء بمجمع عمال مشترك ومحدود
+        self.orchestrator = AgentOrchestrator(
+            max_workers=max_workers,
+            max_concurrent_agents=max_concurrent_agents
+        )
+        
+        # وضع اختياري لتشغيل الوكلاء في عمليات منفصلة (0 = معطل)
+        self.process_pool_workers = process_pool_workers
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        if process_pool_workers > 0 and self.result_cache and db_provider != "sqlite":
+            logger.warning("Process-mode agents only share the result cache with an SQLite database; it is disabled for them")
+        
+        # حلقة أحداث مشتركة لتشغيل الوكلاء غير المتزامنين
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        
+        # استعادة الوكلاء المخزنة إذا كانت قاعدة البيانات متوفرة
+        if self.db_service:
+            self._load_agents_from_db()
+            
+        logger.info(f"🚀 AutoGPT initialized with LLM: {llm_provider}, DB: {db_provider}")
+    
+    def _create_llm_service(self, provider: str, api_key: Optional[str] = None, fallback: bool = True) -> Optional['LLMService']:
+        """إنشاء خدمة النموذج اللغوي المناسبة
+        
+        عند تعذر إنشاء المزود تُستخدم خدمة المحاكاة مع تحذير، أو يُعاد None إذا كان fallback معطلاً.
+        """
+        try:
+            if provider == "openai":
+                try:
+                    from llm.openai_service import OpenAIService
+                    return OpenAIService(api_key, http_client=self.http_client)
+                except ImportError as e:
+                    print(f"خطأ في استيراد OpenAIService: {e}")
+                    print("الرجوع إلى خدمة المحاكاة...")
+            elif provider == "claude":
+                try:
+                    from llm.anthropic_service import AnthropicService
+                    return AnthropicService(api_key, http_client=self.http_client, simulate=self.anthropic_simulate)
+                except ImportError as e:
+                    print(f"خطأ في استيراد AnthropicService: {e}")
+                    print("الرجوع إلى خدمة المحاكاة...")
+            elif provider == "llama":
+                try:
+                    from llm.llama_service import LlamaService
+                    return LlamaService()
+                except ImportError as e:
+                    print(f"خطأ في استيراد LlamaService: {e}")
+                    print("الرجوع إلى خدمة المحاكاة...")
+            elif provider == "router":
+                router = self._create_router_service()
+                if router:
+                    return router
+            elif provider == "mock":
+                from llm.mock_service import MockLLMService
+                return MockLLMService()
+            else:
+                print(f"تحذير: مزود LLM غير معروف '{provider}'، استخدام خدمة المحاكاة")
+                
+            # إذا وصلنا إلى هنا، فهناك مشكلة، لذا نستخدم المحاكاة
+            if not fallback:
+                return None
+            logger.warning(f"LLM provider '{provider}' is unavailable, falling back to the mock service")
+            from llm.mock_service import MockLLMService
+            return MockLLMService()
+        
+        except Exception as e:
+            print(f"خطأ غير متوقع أثناء إنشاء خدمة LLM: {e}")
+            print("الرجوع إلى خدمة المحاكاة...")
+            if not fallback:
+                return None
+            logger.warning(f"Creating LLM provider '{provider}' failed ({str(e)}), falling back to the mock service")
+            
+            try:
+                from llm.mock_service import MockLLMService
+                return MockLLMService()
+            except ImportError:
+                # إذا كان ملف المحاكاة غير موجود، نقوم بإنشاء فئة محاكاة مضمنة
+                print("خدمة المحاكاة غير موجودة، إنشاء محاكاة مضمنة...")
+                
+                from llm.llm_service import LLMService
+                from typing import List
+                
+                class InlineMockLLMService(LLMService):
+                    def query(self, prompt: str, **kwargs) -> str:
+                        return f"استجابة محاكاة مضمنة لاستعلام: {prompt[:50]}..."
+                    
+                    def get_embedding(self, text: str) -> List[float]:
+                        return [0.1, 0.2, 0.3, 0.4, 0.5]  # قيم للاختبار
+                
+                return InlineMockLLMService()
+    
+    def _create_router_service(self) -> Optional[RouterLLMService]:
+        """إنشاء موجه بين المزودين المتاحين من router_backends، أو None إذا لم يتوفر أي منهم
+        
+        لكل مزود مفتاحه الخاص من router_api_keys أو من متغير بيئته، ولا يُعاد
+        استخدام مفتاح مزود آخر. المزودون بلا مفتاح والخدمات المحاكية تُتخطى،
+        لأن استجاباتها الفورية تجعل الموجه يفضلها على المزودين الفعليين.
+        """
+        backends = []
+        for name, weight in self.router_backends.items():
+            if name == "router":
+                continue
+            env_var = PROVIDER_API_KEY_ENV.get(name)
+            backend_key = self.router_api_keys.get(name) or (os.environ.get(env_var) if env_var else None)
+            if env_var and not backend_key:
+                logger.warning(f"Router backend '{name}' has no API key ({env_var}) and was skipped")
+                continue
+            service = self._create_llm_service(name, backend_key, fallback=False)
+            if service is None:
+                logger.warning(f"Router backend '{name}' is unavailable and was skipped")
+                continue
+            if service.simulate:
+                logger.warning(f"Router backend '{name}' only returns simulated responses and was skipped")
+                continue
+            backends.append((name, service, weight))
+            
+        if not backends:
+            return None
+        logger.info(f"Router created with backends: {', '.join(name for name, _, _ in backends)}")
+        return RouterLLMService(backends, hedging=self.router_hedging, max_concurrent_calls=self.max_workers)
+    
+    def _create_db_service(self, provider: str, connection_string: Optional[str] = None) -> Optional['DatabaseService']:
+        """إنشاء خدمة قاعدة البيانات المناسبة"""
+        try:
+            if provider == "memory":
+                from database.memory_db import MemoryDatabaseService
+                return MemoryDatabaseService()
+            elif provider == "sqlite":
+                from database.sqlite_db import SQLiteDatabaseService
+                return SQLiteDatabaseService(connection_string or "autogpt.db")
+            elif provider == "mongodb":
+                from database.mongo_db import MongoDatabaseService
+                return MongoDatabaseService(connection_string)
+            elif provider == "none":
+                return None
+            else:
+                print(f"تحذير: مزود DB غير معروف: {provider}، استخدام قاعدة بيانات في الذاكرة")
+                from database.memory_db import MemoryDatabaseService
+                return MemoryDatabaseService()
+        except ImportError as e:
+            print(f"خطأ في استيراد خدمة قاعدة البيانات: {e}")
+            print("الرجوع إلى قاعدة بيانات في الذاكرة...")
+            try:
+                from database.memory_db import MemoryDatabaseService
+                return MemoryDatabaseService()
+            except ImportError:
+                print("تعذر استيراد حتى قاعدة البيانات في الذاكرة، العمل بدون تخزين")
+                return None
+    
+    def _create_learning_service(self) -> Optional['LearningService']:
+        """إنشاء خدمة التعلم"""
+        try:
+            from learning.learning_service import LearningService
+            return LearningService()
+        except ImportError as e:
+            print(f"خطأ في استيراد خدمة التعلم: {e}")
+            print("تعطيل خاصية التعلم...")
+            return None
+    
+    def _register_default_tools(self) -> None:
+        """تسجيل الأدوات الافتراضية"""
+        try:
+            # إعلان نقاط دخول الأدوات الأساسية؛ تُستورد كل أداة عند أول استخدام لها
+            for name, module_path, class_name, description in DEFAULT_TOOL_ENTRY_POINTS:
+                if not self.tool_registry.declare(name, module_path, class_name, description):
+                    print(f"تعذر تحميل الأداة {class_name}: الوحدة {module_path} غير موجودة")
+                    
+        except Exception as e:
+            print(f"خطأ أثناء تسجيل الأدوات الافتراضية: {e}")
+            print("تخطي تسجيل الأدوات...")
+    
+    def register_tool(self, tool: 'Tool') -> None:
+        """تسجيل أداة جديدة في النظام"""
+        self.tool_registry.register(tool)
+        logger.info(f"Tool registered: {tool.name}")
+    
+    def _load_agents_from_db(self) -> None:
+        """تحميل الوكلاء المخزنة من قاعدة البيانات"""
+        if not self.db_service:
+            return
+            
+        try:
+            agent_dicts = self.db_service.get_all_agents()
+            for agent_dict in agent_dicts:
+                agent_class = AsyncAgent if agent_dict.get("runtime") == "async" else Agent
+                agent = agent_class.from_dict(
+                    agent_dict, 
+                    self.llm_service, 
+                    self.db_service,
+                    self.tool_registry,
+                    self.learning_service,
+                    executor=self.orchestrator.worker_pool,
+                    call_executor=self.orchestrator.call_pool,
+                    history_limit=self.history_limit,
+                    history_dir=self.history_dir
+                )
+                agent.creator_budget = self.budget_manager.get_creator_budget(agent.creator_id)
+                agent.result_cache = self.result_cache
+                self.agents[agent.id] = agent
+                logger.info(f"Loaded agent from database: {agent.name} (ID: {agent.id})")
+        except Exception as e:
+            print(f"خطأ أثناء تحميل الوكلاء من قاعدة البيانات: {e}")
+    
+    def create_agent(
+        self, 
+        name: str, 
+        goal: str, 
+        description: Optional[str] = None,
+        creator_id: Optional[str] = None,
+        tools: Optional[List[str]] = None,
+        parallel_subtasks: bool = False,
+        async_runtime: bool = False,
+        tool_timeout: Optional[float] = 60.0,
+        fused_calls: bool = False,
+        token_budget: Optional[int] = None,
+        lazy_decomposition: bool = False,
+        max_depth: int = 2,
+        max_fanout: int = 7,
+        prefetch_window: int = 0,
+        stream_results: bool = False,
+        task_timeout: Optional[float] = None,
+        run_timeout: Optional[float] = None,
+        llm_timeout: Optional[float] = None,
+        summary_token_budget: int = 6000
+    ) -> Agent:
+        """إنشاء وكيل جديد بهدف محدد"""
+        # إنشاء عرض للأدوات المطلوبة يشارك نسخها مع سجل الأدوات
+        agent_tools = self.tool_registry.view(tools)
+        
+        # إنشاء الوكيل
+        agent_class = AsyncAgent if async_runtime else Agent
+        agent = agent_class(
+            name=name, 
+            goal=goal, 
+            llm_service=self.llm_service,
+            db_service=self.db_service,
+            description=description,
+            creator_id=creator_id,
+            tools=agent_tools,
+            learning_service=self.learning_service,
+            parallel_subtasks=parallel_subtasks,
+            executor=self.orchestrator.worker_pool,
+            call_executor=self.orchestrator.call_pool,
+            tool_timeout=tool_timeout,
+            fused_calls=fused_calls,
+            token_budget=token_budget,
+            creator_budget=self.budget_manager.get_creator_budget(creator_id),
+            history_limit=self.history_limit,
+            history_dir=self.history_dir,
+            lazy_decomposition=lazy_decomposition,
+            max_depth=max_depth,
+            max_fanout=max_fanout,
+            prefetch_window=prefetch_window,
+            result_cache=self.result_cache,
+            stream_results=stream_results,
+            task_timeout=task_timeout,
+            run_timeout=run_timeout,
+            llm_timeout=llm_timeout,
+            summary_token_budget=summary_token_budget
+        )
+        
+        # تسجيل الوكيل
+        self.agents[agent.id] = agent
+        
+        # حفظ الوكيل في قاعدة البيانات إذا كانت متاحة
+        if self.db_service:
+            self.db_service.save_agent(agent)
+            
+        logger.info(f"Created new agent: {name} (ID: {agent.id})")
+        return agent
+    
+    def submit_agent(self, agent_id: str) -> Optional[Future]:
+        """إضافة وكيل إلى طابور المنسق ليعمل على مجمع العمال المشترك"""
+        agent = self.get_agent(agent_id)
+        if not agent:
+            return None
+            
+        if self.process_pool_workers > 0:
+            return self.run_agent_in_process(agent_id)
+            
+        return self.orchestrator.submit(agent)
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """الحصول على مجمع العمليات، وإنشاؤه عند أول استخدام"""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=max(1, self.process_pool_workers))
+        return self._process_pool
+    
+    def _process_service_config(self) -> Dict[str, Any]:
+        """إعدادات الخدمات التي تعيد كل عملية فرعية بناءها
+        
+        حدود المعدل تُقسم على عدد العمليات حتى يبقى مجموع استدعاءاتها ضمن حصة
+        المزود، والذاكرة المؤقتة لنتائج المهام تُشارك عبر ملف SQLite فقط.
+        """
+        config = dict(self.llm_config, history_limit=self.history_limit, history_dir=self.history_dir)
+        workers = max(1, self.process_pool_workers)
+        for key in ("llm_requests_per_minute", "llm_tokens_per_minute"):
+            if config[key]:
+                config[key] = config[key] / workers
+        if config["llm_max_concurrent"]:
+            config["llm_max_concurrent"] = max(1, config["llm_max_concurrent"] // workers)
+        if self.result_cache and self.db_provider == "sqlite":
+            config["result_cache_db"] = self.db_connection_string or "autogpt.db"
+            config["result_cache_ttl"] = self.result_cache.ttl_seconds
+        return config
+    
+    def run_agent_in_process(self, agent_id: str) -> Optional[Future]:
+        """تشغيل وكيل في عملية منفصلة ودمج حالته الناتجة في سجل الوكلاء
+        
+        تنتقل حالة الوكيل بين العمليات عبر to_dict/from_dict، ويكتمل الـ Future
+        بحالة الوكيل بعد الدمج.
+        """
+        agent = self.get_agent(agent_id)
+        if not agent:
+            return None
+            
+        agent_data = agent.to_dict()
+        agent.is_running = True
+        # إفراغ ملف ترحيل السجل قبل أن تلحق به العملية الفرعية حتى تبقى الإدخالات مرتبة
+        agent.history.close()
+        
+        process_future = self._get_process_pool().submit(
+            run_agent_in_process,
+            agent_data,
+            self._process_service_config(),
+            self.orchestrator.max_workers
+        )
+        result_future: Future = Future()
+        
+        def merge_result(completed: Future) -> None:
+            try:
+                merged_agent = self._merge_agent_state(completed.result())
+                result_future.set_result(merged_agent.get_status())
+            except Exception as e:
+                logger.error(f"Error running agent {agent_id} in process pool: {str(e)}", exc_info=True)
+                agent.is_running = False
+                result_future.set_exception(e)
+                
+        process_future.add_done_callback(merge_result)
+        logger.info(f"Agent '{agent.name}' submitted to process pool")
+        return result_future
+    
+    def _merge_agent_state(self, agent_data: Dict[str, Any]) -> Agent:
+        """استبدال الوكيل في السجل بالحالة العائدة من عملية فرعية وحفظها"""
+        agent_class = AsyncAgent if agent_data.get("runtime") == "async" else Agent
+        agent = agent_class.from_dict(
+            agent_data,
+            self.llm_service,
+            self.db_service,
+            self.tool_registry,
+            self.learning_service,
+            executor=self.orchestrator.worker_pool,
+            call_executor=self.orchestrator.call_pool,
+            history_limit=self.history_limit,
+            history_dir=self.history_dir
+        )
+        agent.creator_budget = self.budget_manager.get_creator_budget(agent.creator_id)
+        agent.result_cache = self.result_cache
+        previous = self.agents.get(agent.id)
+        if previous is not None:
+            previous.history.close()
+        self.agents[agent.id] = agent
+        
+        if self.db_service:
+            self.db_service.save_agent(agent)
+            
+        return agent
+    
+    def get_event_loop(self) -> asyncio.AbstractEventLoop:
+        """الحصول على حلقة الأحداث المشتركة للوكلاء غير المتزامنين، وإنشاؤها عند الحاجة"""
+        with self._loop_lock:
+            if self._event_loop is None or self._event_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="autogpt-event-loop")
+                thread.daemon = True
+                thread.start()
+                self._event_loop = loop
+            return self._event_loop
+    
+    def run_agent_async(self, agent_id: str) -> Optional[Future]:
+        """تشغيل وكيل غير متزامن على حلقة الأحداث المشتركة"""
+        agent = self.get_agent(agent_id)
+        if not agent:
+            return None
+            
+        if not isinstance(agent, AsyncAgent):
+            logger.warning(f"Agent {agent_id} does not use the async runtime; use agent.start() instead")
+            return None
+            
+        return asyncio.run_coroutine_threadsafe(agent.arun(), self.get_event_loop())
+
+    def resume_interrupted_agents(self) -> Dict[str, Future]:
+        """استئناف الوكلاء الذين انقطع تشغيلهم (مثلاً بسبب إعادة تشغيل العملية)
+
+        يعيد كل وكيل بناء شجرة مهامه من نقاط الاستعادة ثم يُضاف إلى طابور
+        المنسق، فلا يعاد تنفيذ المهام المكتملة ولا إعادة دفع كلفة استدعاءاتها.
+        """
+        futures = {}
+        for agent in list(self.agents.values()):
+            was_running = agent.is_running
+            interrupted = agent.restore_checkpoint()
+            if not (was_running or interrupted) or not agent.has_unfinished_tasks():
+                continue
+
+            agent.is_running = False
+            future = self.submit_agent(agent.id)
+            if future is not None:
+                futures[agent.id] = future
+                logger.info(f"Resuming interrupted agent: {agent.name} (ID: {agent.id})")
+
+        return futures
+
+    def list_agents(self, creator_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """الحصول على قائمة جميع الوكلاء المتاحين"""
+        agents_list = []
+        for agent_id, agent in self.agents.items():
+            if creator_id and agent.creator_id != creator_id:
+                continue
+                
+            agents_list.append({
+                "id": agent.id,
+                "name": agent.name,
+                "goal": agent.goal,
+                "description": agent.description,
+                "is_running": agent.is_running,
+                "is_paused": agent.is_paused if hasattr(agent, 'is_paused') else False,
+                "creator_id": agent.creator_id,
+                "created_at": agent.created_at.isoformat(),
+                "status": agent.get_status() if hasattr(agent, 'get_status') else {}
+            })
+            
+        return agents_list
+    
+    def get_agent(self, agent_id: str) -> Optional[Agent]:
+        """الحصول على وكيل معين بالمعرف"""
+        return self.agents.get(agent_id)
+    
+    def delete_agent(self, agent_id: str) -> bool:
+        """حذف وكيل"""
+        if agent_id in self.agents:
+            agent = self.agents[agent_id]
+            
+            # إلغاء الوكيل من طابور المنسق أو إيقافه إذا كان قيد التشغيل
+            self.orchestrator.cancel(agent_id)
+            if agent.is_running:
+                agent.stop()
+                
+            # حذف ملف ترحيل السجل
+            agent.history.discard()
+                
+            # حذف الوكيل من قاعدة البيانات إذا كانت متاحة
+            if self.db_service:
+                self.db_service.delete_agent(agent_id)
+                
+            # حذف الوكيل من القائمة
+            del self.agents[agent_id]
+            
+            logger.info(f"Deleted agent ID: {agent_id}")
+            return True
+            
+        return False
+    
+    def get_available_tools(self) -> List[Dict[str, str]]:
+        """الحصول على قائمة الأدوات المتاحة في النظام"""
+        return self.tool_registry.describe()
+    
+    def set_creator_budget(self, creator_id: str, max_tokens: int) -> None:
+        """تحديد ميزانية توكنات مشتركة لجميع وكلاء منشئ محدد"""
+        budget = self.budget_manager.set_creator_budget(creator_id, max_tokens)
+        for agent in self.agents.values():
+            if agent.creator_id == creator_id:
+                agent.creator_budget = budget
+        logger.info(f"Token budget for creator {creator_id} set to {max_tokens}")
+    
+    def get_budget_stats(self) -> Dict[str, Dict[str, Any]]:
+        """الحصول على استهلاك ميزانيات التوكنات لكل منشئ"""
+        return self.budget_manager.get_stats()
+    
+    def set_result_cache_opt_out(self, creator_id: str, opted_out: bool = True) -> None:
+        """إلغاء اشتراك منشئ في الذاكرة المؤقتة المشتركة لنتائج المهام أو إعادته"""
+        if self.result_cache:
+            self.result_cache.set_opt_out(creator_id, opted_out)
+            logger.info(f"Result cache {'disabled' if opted_out else 'enabled'} for creator {creator_id}")
+    
+    def get_result_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """الحصول على إحصائيات الذاكرة المؤقتة المشتركة لنتائج المهام"""
+        return self.result_cache.get_stats() if self.result_cache else None
+    
+    def get_llm_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """الحصول على إحصائيات الذاكرة المؤقتة لاستجابات النموذج اللغوي"""
+        return self.llm_cache.get_stats() if self.llm_cache else None
+    
+    def get_embedding_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """الحصول على إحصائيات الذاكرة المؤقتة للتمثيلات الشعاعية"""
+        return self.embedding_cache.get_stats() if self.embedding_cache else None
+    
+    def get_rate_limit_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """الحصول على إحصائيات محدد المعدل وزمن الانتظار لكل مزود ونموذج"""
+        return self.rate_limiter.get_stats() if self.rate_limiter else None
+    
+    def get_single_flight_stats(self) -> Optional[Dict[str, Any]]:
+        """الحصول على إحصائيات دمج الاستعلامات المتطابقة الجارية"""
+        return self.single_flight.get_stats() if self.single_flight else None
+    
+    def get_router_stats(self) -> Optional[Dict[str, Any]]:
+        """الحصول على أزمنة الاستجابة ومعدلات الأخطاء لخلفيات الموجه"""
+        service = self.llm_service
+        # تجاوز الأغلفة (الذاكرة المؤقتة ومحدد المعدل...) للوصول إلى الموجه
+        while not isinstance(service, RouterLLMService) and hasattr(service, "inner"):
+            service = service.inner
+        return service.get_stats() if isinstance(service, RouterLLMService) else None
+    
+    def get_prompt_stats(self) -> Dict[str, Dict[str, int]]:
+        """الحصول على إحصائيات التوفير في البايتات والتوكنات لكل نوع من النصوص التوجيهية"""
+        return get_prompt_stats()
+    
+    def get_agent_tasks(self, agent_id: str, include_subtasks: bool = True) -> List[Dict[str, Any]]:
+        """الحصول على قائمة مهام الوكيل"""
+        agent = self.get_agent(agent_id)
+        if not agent:
+            return []
+            
+        return [task.to_dict(include_subtasks) for task in agent.tasks]
+    
+    def get_agent_history(self, agent_id: str) -> List[Dict[str, Any]]:
+        """الحصول على آخر إدخالات سجل إجراءات الوكيل الموجودة في الذاكرة"""
+        agent = self.get_agent(agent_id)
+        if not agent:
+            return []
+            
+        return list(agent.history)
+    
+    def get_agent_history_page(self, agent_id: str, cursor: Optional[int] = None, limit: int = 50) -> Dict[str, Any]:
+        """تصفح سجل إجراءات الوكيل كاملاً بالترتيب الزمني باستخدام مؤشر"""
+        agent = self.get_agent(agent_id)
+        if not agent:
+            return {"entries": [], "next_cursor": None, "total": 0}
+            
+        entries, next_cursor = agent.history.page(cursor, limit)
+        return {"entries": entries, "next_cursor": next_cursor, "total": agent.history.total}
+    
+    def save_state(self) -> None:
+        """حفظ حالة النظام بالكامل"""
+        if not self.db_service:
+            logger.warning("Cannot save state: no database service available")
+            return
+            
+        for agent in self.agents.values():
+            self.db_service.save_agent(agent)
+            
+        logger.info(f"Saved state with {len(self.agents)} agents")
+    
+    def load_state(self) -> None:
+        """تحميل حالة النظام"""
+        self._load_agents_from_db()
         logger.info(f"Loaded state with {len(self.agents)} agents")
\ No newline at end of file
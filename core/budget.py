@@ -0,0 +1,110 @@
+"""
+ميزانيات التوكنات للوكلاء والمنشئين مع تخفيض تدريجي لكلفة التشغيل
+"""
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+# مستويات التخفيض: (نسبة الاستهلاك التي يبدأ عندها المستوى، اسم المستوى)
+DEGRADATION_LEVELS: List[Tuple[float, str]] = [
+    (0.6, "economy_model"),     # استخدام نموذج أرخص
+    (0.75, "fused_calls"),      # دمج استعلامات التنفيذ ومدخلات الأدوات
+    (0.9, "skip_integration"),  # تخطي استعلام دمج نتائج الأدوات
+    (1.0, "exhausted")          # إفشال المهام المتبقية كحل أخير
+]
+
+LEVEL_NORMAL = 0
+LEVEL_ECONOMY_MODEL = 1
+LEVEL_FUSED_CALLS = 2
+LEVEL_SKIP_INTEGRATION = 3
+LEVEL_EXHAUSTED = 4
+
+def degradation_level(fraction_used: float) -> int:
+    """تحديد مستوى التخفيض المناسب لنسبة الاستهلاك"""
+    level = LEVEL_NORMAL
+    for index, (threshold, _) in enumerate(DEGRADATION_LEVELS, start=1):
+        if fraction_used >= threshold:
+            level = index
+    return level
+
+def degradation_name(level: int) -> str:
+    """اسم مستوى التخفيض"""
+    return "normal" if level == LEVEL_NORMAL else DEGRADATION_LEVELS[level - 1][1]
+
+class BudgetExceededError(Exception):
+    """استثناء عند نفاد ميزانية التوكنات"""
+    pass
+
+class TokenBudget:
+    """ميزانية توكنات آمنة للاستخدام من عدة خيوط"""
+
+    def __init__(self, max_tokens: int, used_tokens: int = 0, owner: Optional[str] = None):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.max_tokens = max_tokens
+        self.used_tokens = used_tokens
+        self.owner = owner
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: int) -> None:
+        """خصم عدد من التوكنات من الميزانية"""
+        with self._lock:
+            self.used_tokens += tokens
+
+    @property
+    def remaining(self) -> int:
+        """التوكنات المتبقية"""
+        return max(0, self.max_tokens - self.used_tokens)
+
+    @property
+    def fraction_used(self) -> float:
+        """نسبة الاستهلاك من الميزانية"""
+        return self.used_tokens / self.max_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل الميزانية إلى قاموس"""
+        return {
+            "owner": self.owner,
+            "max_tokens": self.max_tokens,
+            "used_tokens": self.used_tokens,
+            "remaining_tokens": self.remaining
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TokenBudget':
+        """استعادة ميزانية من قاموس"""
+        return cls(data["max_tokens"], data.get("used_tokens", 0), data.get("owner"))
+
+class BudgetManager:
+    """ميزانيات مشتركة لكل منشئ (creator_id) تتقاسمها جميع وكلائه"""
+
+    def __init__(self):
+        self._creator_budgets: Dict[str, TokenBudget] = {}
+        self._lock = threading.Lock()
+
+    def set_creator_budget(self, creator_id: str, max_tokens: int) -> TokenBudget:
+        """تحديد ميزانية منشئ، مع الاحتفاظ بالاستهلاك السابق إذا كانت موجودة"""
+        with self._lock:
+            budget = self._creator_budgets.get(creator_id)
+            if budget is None:
+                budget = TokenBudget(max_tokens, owner=f"creator:{creator_id}")
+                self._creator_budgets[creator_id] = budget
+            else:
+                budget.max_tokens = max_tokens
+            return budget
+
+    def get_creator_budget(self, creator_id: Optional[str]) -> Optional[TokenBudget]:
+        """الحصول على ميزانية منشئ إن وجدت"""
+        if creator_id is None:
+            return None
+        with self._lock:
+            return self._creator_budgets.get(creator_id)
+
+    def remove_creator_budget(self, creator_id: str) -> bool:
+        """إزالة ميزانية منشئ"""
+        with self._lock:
+            return self._creator_budgets.pop(creator_id, None) is not None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """استهلاك الميزانيات لكل منشئ"""
+        with self._lock:
+            return {creator_id: budget.to_dict() for creator_id, budget in self._creator_budgets.items()}
\ No newline at end of file
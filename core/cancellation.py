@@ -0,0 +1,158 @@
+"""
+رموز إلغاء تعاونية مع مهل زمنية تُمرر عبر شجرة تنفيذ المهام
+"""
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import List, Any, Optional, Callable, Awaitable
+
+class TaskCancelledError(Exception):
+    """استثناء عند إلغاء العمل الجاري لمهمة أو إيقاف الوكيل"""
+    pass
+
+class DeadlineExceededError(TaskCancelledError):
+    """استثناء عند تجاوز مهلة مهمة أو تشغيل أو استدعاء"""
+    pass
+
+class CancellationToken:
+    """رمز إلغاء بمهلة اختيارية يرث الإلغاء والمهلة من الرمز الأب
+
+    يُنشأ رمز فرعي لكل مهمة من رمز المهمة الأم (أو رمز التشغيل)، فيلغي
+    إلغاء الأب جميع الرموز الفرعية. الاستدعاءات المحجوبة تُنفذ في مجمع خيوط
+    وينتظرها المستدعي عبر wait_for، فيعود فور الإلغاء أو انتهاء المهلة دون
+    انتظار الاستدعاء المعلق نفسه.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, parent: Optional['CancellationToken'] = None):
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent._add_callback(self._on_parent_cancelled)
+
+    def child(self, timeout: Optional[float] = None) -> 'CancellationToken':
+        """إنشاء رمز فرعي بمهلة اختيارية لا تتجاوز مهلة هذا الرمز"""
+        return CancellationToken(timeout, parent=self)
+
+    def cancel(self, reason: str = "Cancelled") -> None:
+        """إلغاء هذا الرمز وجميع رموزه الفرعية"""
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    def _on_parent_cancelled(self) -> None:
+        self.cancel(self.parent.reason or "Cancelled")
+
+    def _add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """تسجيل دالة تُستدعى عند الإلغاء، وتعيد دالة لإلغاء التسجيل"""
+        with self._lock:
+            cancelled = self.reason is not None
+            if not cancelled:
+                self._callbacks.append(callback)
+        if cancelled:
+            callback()
+
+        def remove() -> None:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+        return remove
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """تسجيل دالة تُستدعى عند إلغاء الرمز أو أحد أسلافه، وتعيد دالة لإلغاء التسجيل"""
+        return self._add_callback(callback)
+
+    def detach(self) -> None:
+        """فصل الرمز عن أبيه بعد انتهاء المهمة حتى لا تتراكم الرموز المنتهية"""
+        if self.parent is not None:
+            with self.parent._lock:
+                if self._on_parent_cancelled in self.parent._callbacks:
+                    self.parent._callbacks.remove(self._on_parent_cancelled)
+
+    @property
+    def cancelled(self) -> bool:
+        """هل أُلغي الرمز أو أحد أسلافه (يُنقل إلغاء الأب إلى أبنائه فورًا)"""
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """الوقت المتبقي حتى أقرب مهلة في السلسلة، أو None إذا لم توجد مهلة"""
+        remaining = None
+        token: Optional[CancellationToken] = self
+        now = time.monotonic()
+        while token is not None:
+            if token.deadline is not None:
+                left = token.deadline - now
+                remaining = left if remaining is None else min(remaining, left)
+            token = token.parent
+        return None if remaining is None else max(0.0, remaining)
+
+    @property
+    def expired(self) -> bool:
+        """هل انتهت مهلة الرمز أو أحد أسلافه"""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    @property
+    def interrupted(self) -> bool:
+        """هل يجب إيقاف العمل: أُلغي الرمز أو انتهت مهلته"""
+        return self.cancelled or self.expired
+
+    def raise_if_cancelled(self) -> None:
+        """إطلاق استثناء إذا أُلغي الرمز أو انتهت مهلته"""
+        if self.cancelled:
+            raise TaskCancelledError(self.reason)
+        if self.expired:
+            raise DeadlineExceededError("Deadline exceeded")
+
+    def _timeout_for(self, timeout: Optional[float]) -> Optional[float]:
+        """أقصر مدة انتظار بين مهلة الاستدعاء والوقت المتبقي للرمز"""
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def wait_for(self, future: Future, timeout: Optional[float] = None) -> Any:
+        """انتظار نتيجة future حتى تكتمل أو يُلغى الرمز أو تنتهي المهلة
+
+        عند الإلغاء أو انتهاء المهلة تُلغى future إن لم تبدأ بعد، وإلا تُترك
+        لتنتهي في الخلفية ويُهمل ناتجها.
+        """
+        self.raise_if_cancelled()
+        waiter = threading.Event()
+        future.add_done_callback(lambda _: waiter.set())
+        remove = self._add_callback(waiter.set)
+        try:
+            waiter.wait(self._timeout_for(timeout))
+        finally:
+            remove()
+
+        if future.done():
+            return future.result()
+        future.cancel()
+        self.raise_if_cancelled()
+        raise DeadlineExceededError(f"Call timed out after {timeout} seconds")
+
+    async def await_for(self, awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+        """نسخة غير متزامنة من wait_for تلغي الـ coroutine فور إلغاء الرمز"""
+        self.raise_if_cancelled()
+        loop = asyncio.get_running_loop()
+        inner = asyncio.ensure_future(awaitable)
+        remove = self._add_callback(lambda: loop.call_soon_threadsafe(inner.cancel))
+        try:
+            return await asyncio.wait_for(inner, self._timeout_for(timeout))
+        except asyncio.TimeoutError:
+            self.raise_if_cancelled()
+            raise DeadlineExceededError(f"Call timed out after {timeout} seconds")
+        except asyncio.CancelledError:
+            if self.cancelled:
+                raise TaskCancelledError(self.reason)
+            raise
+        finally:
+            remove()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+سجل إجراءات الوكيل بذاكرة محدودة مع ترحيل الإدخالات القديمة إلى ملف
+"""
+import os
+import json
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional, Deque, Tuple, Iterator, Union, BinaryIO
+
+class AgentHistory:
+    """مخزن دائري لآخر إدخالات السجل مع ترحيل الأقدم إلى ملف إلحاق فقط
+
+    يحمل كل إدخال رقمًا تسلسليًا (seq) يُستخدم كمؤشر للتصفح. إذا لم يُحدد
+    ملف للترحيل تُسقط الإدخالات الأقدم من الذاكرة فقط، وتبقى متاحة في سجلات
+    قاعدة البيانات إن وجدت. يبقى ملف الترحيل مفتوحًا طوال عمر السجل وتُجمع
+    كتاباته في مخزن مؤقت يُفرغ قبل أي قراءة منه.
+    """
+
+    # المسافة بين نقاط فهرس مواقع الإدخالات داخل ملف الترحيل
+    INDEX_STRIDE = 100
+
+    def __init__(self, max_entries: int = 500, spill_path: Optional[str] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.spill_path = spill_path
+        self._entries: Deque[Dict[str, Any]] = deque()
+        self._next_seq = 0
+        self._oldest_seq = 0
+        # فهرس متباعد (seq, موقع البايت) لملف الترحيل، يُبنى عند أول قراءة
+        self._index: Optional[List[Tuple[int, int]]] = None
+        # مقبض ملف الترحيل وموقع نهايته، يُفتحان عند أول ترحيل
+        self._spill_file: Optional[BinaryIO] = None
+        self._spill_offset = 0
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """إضافة إدخال إلى السجل وترحيل الأقدم عند امتلاء المخزن"""
+        with self._lock:
+            entry = dict(entry, seq=self._next_seq)
+            self._next_seq += 1
+            self._entries.append(entry)
+            if len(self._entries) > self.max_entries:
+                self._evict(self._entries.popleft())
+        return entry
+
+    def _evict(self, entry: Dict[str, Any]) -> None:
+        """ترحيل إدخال خرج من الذاكرة إلى ملف الترحيل أو إسقاطه"""
+        if not self.spill_path:
+            self._oldest_seq = entry["seq"] + 1
+            return
+
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "ab")
+            self._spill_offset = self._spill_file.seek(0, os.SEEK_END)
+
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        offset = self._spill_offset
+        self._spill_file.write(line)
+        self._spill_offset += len(line)
+
+        if self._index is not None and entry["seq"] % self.INDEX_STRIDE == 0:
+            self._index.append((entry["seq"], offset))
+
+    def _flush_spill(self) -> None:
+        """إفراغ الكتابات المؤجلة إلى ملف الترحيل قبل قراءته"""
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def _build_index(self) -> List[Tuple[int, int]]:
+        """بناء الفهرس المتباعد بقراءة ملف الترحيل مرة واحدة"""
+        index = []
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, "rb") as spill_file:
+                offset = 0
+                for line in spill_file:
+                    seq = json.loads(line)["seq"]
+                    if seq % self.INDEX_STRIDE == 0 or not index:
+                        index.append((seq, offset))
+                    offset += len(line)
+        return index
+
+    def _read_spilled(self, start: int, count: int) -> List[Dict[str, Any]]:
+        """قراءة عدد من الإدخالات المرحلة بدءًا من رقم تسلسلي محدد"""
+        self._flush_spill()
+        if self._index is None:
+            self._index = self._build_index()
+
+        offset = 0
+        for seq, seq_offset in self._index:
+            if seq > start:
+                break
+            offset = seq_offset
+
+        entries = []
+        with open(self.spill_path, "rb") as spill_file:
+            spill_file.seek(offset)
+            for line in spill_file:
+                entry = json.loads(line)
+                if entry["seq"] < start:
+                    continue
+                entries.append(entry)
+                if len(entries) >= count:
+                    break
+        return entries
+
+    def page(self, cursor: Optional[int] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """تصفح السجل بالترتيب الزمني بدءًا من المؤشر
+
+        تعيد الإدخالات والمؤشر التالي، أو None عند الوصول إلى نهاية السجل.
+        """
+        with self._lock:
+            start = self._oldest_seq if cursor is None else max(cursor, self._oldest_seq)
+            memory_start = self._entries[0]["seq"] if self._entries else self._next_seq
+
+            entries: List[Dict[str, Any]] = []
+            self._flush_spill()
+            if start < memory_start and self.spill_path and os.path.exists(self.spill_path):
+                entries = self._read_spilled(start, min(limit, memory_start - start))
+
+            remaining = limit - len(entries)
+            if remaining > 0:
+                first = max(0, start - memory_start)
+                entries.extend(list(self._entries)[first:first + remaining])
+
+            next_cursor = None
+            if entries and entries[-1]["seq"] + 1 < self._next_seq:
+                next_cursor = entries[-1]["seq"] + 1
+            return entries, next_cursor
+
+    @property
+    def total(self) -> int:
+        """عدد الإدخالات المتاحة للتصفح (في الذاكرة وفي ملف الترحيل)"""
+        with self._lock:
+            return self._next_seq - self._oldest_seq
+
+    def close(self) -> None:
+        """إفراغ ملف الترحيل وإغلاقه؛ يُعاد فتحه تلقائيًا عند الترحيل التالي"""
+        with self._lock:
+            self._close_spill()
+
+    def _close_spill(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def discard(self) -> None:
+        """حذف ملف الترحيل وإفراغ السجل"""
+        with self._lock:
+            self._close_spill()
+            self._entries.clear()
+            self._oldest_seq = self._next_seq
+            self._index = None
+            if self.spill_path and os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل السجل إلى قاموس بحجم ثابت يحتوي الإدخالات الموجودة في الذاكرة فقط"""
+        with self._lock:
+            return {
+                "max_entries": self.max_entries,
+                "spill_path": self.spill_path,
+                "next_seq": self._next_seq,
+                "oldest_seq": self._oldest_seq,
+                "entries": list(self._entries)
+            }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]],
+        max_entries: int = 500,
+        spill_path: Optional[str] = None
+    ) -> 'AgentHistory':
+        """استعادة السجل من قاموس، أو من قائمة إدخالات بالتنسيق القديم"""
+        if isinstance(data, list):
+            history = cls(max_entries=max_entries, spill_path=spill_path)
+            for entry in data:
+                history.append(entry)
+            return history
+
+        history = cls(
+            max_entries=data.get("max_entries", max_entries),
+            spill_path=data.get("spill_path", spill_path)
+        )
+        history._next_seq = data.get("next_seq", 0)
+        history._oldest_seq = data.get("oldest_seq", 0)
+        history._entries.extend(data.get("entries", []))
+        return history
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+منسق تشغيل الوكلاء المتعددين باستخدام مجمع خيوط مشترك
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Deque, Dict, Any, Optional, Tuple
+
+from core.agent import Agent
+
+logger = logging.getLogger("autogpt")
+
+class AgentOrchestrator:
+    """يجدول تشغيل الوكلاء على مجمعات خيوط محدودة مع توزيع عادل بين المنشئين
+
+    - مجمع عمال عام مشترك تنفذ عليه جميع الوكلاء مهامها الفرعية
+    - مجمع استدعاءات مشترك لتشغيل أدوات المهمة الواحدة بالتوازي
+    - حد أقصى لعدد الوكلاء الذين يعملون في الوقت نفسه
+    - طابور لكل منشئ (creator_id)، ويُختار المنشئ صاحب أقل عدد من الوكلاء
+      العاملين حاليًا مع التناوب بين المتساوين
+    """
+
+    def __init__(self, max_workers: int = 16, max_concurrent_agents: int = 8):
+        if max_workers < 1 or max_concurrent_agents < 1:
+            raise ValueError("max_workers and max_concurrent_agents must be positive")
+
+        self.max_workers = max_workers
+        self.max_concurrent_agents = max_concurrent_agents
+        self.worker_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="autogpt-worker")
+        # مجمع مستقل للاستدعاءات المتوازية داخل المهمة الواحدة (مدخلات الأدوات وتشغيلها)
+        self.call_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="autogpt-call")
+        self._run_pool = ThreadPoolExecutor(max_workers=max_concurrent_agents, thread_name_prefix="autogpt-agent")
+        self._lock = threading.Lock()
+        self._queues: Dict[Optional[str], Deque[Tuple[Agent, Future]]] = {}
+        self._creator_order: Deque[Optional[str]] = deque()
+        self._running_by_creator: Dict[Optional[str], int] = {}
+        self._running = 0
+
+    def submit(self, agent: Agent) -> Future:
+        """إضافة وكيل إلى طابور التشغيل وإرجاع Future يكتمل بحالة الوكيل النهائية"""
+        future: Future = Future()
+        creator_id = agent.creator_id
+
+        with self._lock:
+            if creator_id not in self._queues:
+                self._queues[creator_id] = deque()
+                self._creator_order.append(creator_id)
+            self._queues[creator_id].append((agent, future))
+            self._dispatch_locked()
+
+        logger.info(f"Agent '{agent.name}' queued for execution (creator: {creator_id})")
+        return future
+
+    def cancel(self, agent_id: str) -> bool:
+        """إلغاء تشغيل وكيل ما زال في الطابور"""
+        with self._lock:
+            for queue in self._queues.values():
+                for entry in list(queue):
+                    agent, future = entry
+                    if agent.id == agent_id:
+                        queue.remove(entry)
+                        future.cancel()
+                        self._drop_empty_queues_locked()
+                        return True
+        return False
+
+    def _drop_empty_queues_locked(self) -> None:
+        """حذف طوابير المنشئين الفارغة"""
+        for creator_id in [creator_id for creator_id, queue in self._queues.items() if not queue]:
+            del self._queues[creator_id]
+            self._creator_order.remove(creator_id)
+
+    def _next_creator_locked(self) -> Optional[str]:
+        """اختيار المنشئ التالي وفق التوزيع العادل"""
+        # أقل عدد من الوكلاء العاملين أولاً، ثم ترتيب التناوب
+        chosen = min(self._creator_order, key=lambda creator_id: self._running_by_creator.get(creator_id, 0))
+        self._creator_order.remove(chosen)
+        self._creator_order.append(chosen)
+        return chosen
+
+    def _dispatch_locked(self) -> None:
+        """تشغيل الوكلاء المنتظرين ما دام الحد الأقصى يسمح بذلك"""
+        while self._running < self.max_concurrent_agents and self._creator_order:
+            creator_id = self._next_creator_locked()
+            agent, future = self._queues[creator_id].popleft()
+            if not self._queues[creator_id]:
+                del self._queues[creator_id]
+                self._creator_order.remove(creator_id)
+
+            self._running += 1
+            self._running_by_creator[creator_id] = self._running_by_creator.get(creator_id, 0) + 1
+            self._run_pool.submit(self._run_agent, agent, future)
+
+    def _run_agent(self, agent: Agent, future: Future) -> None:
+        """تشغيل وكيل واحد حتى النهاية ثم تحرير مكانه"""
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                agent.start()
+                future.set_result(agent.get_status())
+            except Exception as e:
+                logger.error(f"Error running agent '{agent.name}': {str(e)}", exc_info=True)
+                future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running -= 1
+                remaining = self._running_by_creator.get(agent.creator_id, 1) - 1
+                if remaining > 0:
+                    self._running_by_creator[agent.creator_id] = remaining
+                else:
+                    self._running_by_creator.pop(agent.creator_id, None)
+                self._dispatch_locked()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """الحصول على إحصائيات التشغيل الحالية"""
+        with self._lock:
+            return {
+                "running_agents": self._running,
+                "queued_agents": sum(len(queue) for queue in self._queues.values()),
+                "max_concurrent_agents": self.max_concurrent_agents,
+                "max_workers": self.max_workers,
+                "running_by_creator": dict(self._running_by_creator),
+                "queued_by_creator": {
+                    creator_id: len(queue) for creator_id, queue in self._queues.items()
+                }
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """إيقاف مجمعات الخيوط بعد إلغاء الوكلاء المنتظرين"""
+        with self._lock:
+            for queue in self._queues.values():
+                for _, future in queue:
+                    future.cancel()
+            self._queues.clear()
+            self._creator_order.clear()
+        self._run_pool.shutdown(wait=wait)
+        self.worker_pool.shutdown(wait=wait)
+        self.call_pool.shutdown(wait=wait)
\ No newline at end of file
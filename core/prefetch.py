@@ -0,0 +1,155 @@
+"""
+تحضير تخميني للمهام التالية في الطابور أثناء تنفيذ المهمة الحالية
+"""
+import json
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Dict, Any, Optional, Tuple
+
+from core.task import Task, TaskStatus
+from core.cancellation import CancellationToken, TaskCancelledError
+
+logger = logging.getLogger("autogpt")
+
+# أنواع التحضير المسبق
+PREFETCH_BREAKDOWN = "breakdown"
+PREFETCH_EXECUTION = "execution"
+
+class SpeculativePrefetcher:
+    """يصدر مسبقًا استعلام التقسيم أو تحضير نص التنفيذ لأعلى المهام المعلقة أولوية
+
+    عدد المهام المحضرة في الوقت نفسه محدود بنافذة. تُحفظ مع كل نتيجة بصمة
+    للمهمة وإعدادات الوكيل، فإذا تغيرت الخطة قبل استهلاكها تُلغى أو تُهمل
+    النتيجة وتُنفذ المهمة بالطريقة المعتادة، لذا لا تتغير النتائج.
+    """
+
+    def __init__(self, agent: 'Agent', window: int, executor: ThreadPoolExecutor):
+        self.agent = agent
+        self.window = window
+        self.executor = executor
+        self._entries: Dict[str, Tuple[str, Tuple, Future]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"issued": 0, "hits": 0, "discarded": 0}
+
+    def _fingerprint(self, task: Task) -> Tuple:
+        """بصمة لكل ما يؤثر في نتيجة التحضير"""
+        return (
+            task.name,
+            task.description,
+            json.dumps(task.metadata, sort_keys=True, ensure_ascii=False, default=str),
+            self.agent._get_tool_catalog()[1],
+            self.agent.fused_calls,
+            self.agent._get_budget_level()
+        )
+
+    def prefetch(self, tasks: Iterable[Task]) -> None:
+        """تحضير المهام التالية ضمن حدود النافذة"""
+        for task in tasks:
+            with self._lock:
+                if len(self._entries) >= self.window:
+                    return
+                if task.id in self._entries or task.status != TaskStatus.PENDING:
+                    continue
+
+            if self.agent._should_expand(task):
+                kind = PREFETCH_BREAKDOWN
+                future = self.executor.submit(self._prefetch_breakdown, task)
+            elif not task.subtasks:
+                kind = PREFETCH_EXECUTION
+                future = self.executor.submit(self.agent._prepare_execution, task)
+            else:
+                continue
+
+            with self._lock:
+                self._entries[task.id] = (kind, self._fingerprint(task), future)
+                self._stats["issued"] += 1
+
+    def _prefetch_breakdown(self, task: Task) -> str:
+        """إرسال استعلام التقسيم لمهمة مسبقًا"""
+        prompt, context = self.agent._build_breakdown_request(task)
+        # الاستدعاء يعمل أصلاً في مجمع الاستدعاءات، وتُطبق المهلة عند استهلاك النتيجة
+        return self.agent._query_llm_now(PREFETCH_BREAKDOWN, prompt, None, None, {"context": context})
+
+    def take(self, task: Task, kind: str, token: Optional[CancellationToken] = None) -> Optional[Any]:
+        """استهلاك نتيجة التحضير لمهمة إن كانت صالحة، وإلا None
+
+        يُنتظر التحضير الجاري ضمن مهلة الاستدعاءات ورمز إلغاء المهمة.
+        """
+        future = self._claim(task, kind)
+        if future is None:
+            return None
+
+        token = token or CancellationToken()
+        try:
+            result = token.wait_for(future, self.agent.llm_timeout)
+        except Exception as e:
+            return self._reject(task, kind, future, token, e)
+        return self._accept(result)
+
+    async def atake(self, task: Task, kind: str, token: Optional[CancellationToken] = None) -> Optional[Any]:
+        """نسخة غير متزامنة من take تنتظر التحضير الجاري دون حجب حلقة الأحداث"""
+        future = self._claim(task, kind)
+        if future is None:
+            return None
+
+        token = token or CancellationToken()
+        try:
+            result = await token.await_for(asyncio.wrap_future(future), self.agent.llm_timeout)
+        except Exception as e:
+            return self._reject(task, kind, future, token, e)
+        return self._accept(result)
+
+    def _claim(self, task: Task, kind: str) -> Optional[Future]:
+        """سحب تحضير المهمة إذا كان من النوع المطلوب وما زالت بصمته مطابقة"""
+        with self._lock:
+            entry = self._entries.pop(task.id, None)
+        if entry is None:
+            return None
+
+        entry_kind, fingerprint, future = entry
+        if entry_kind != kind or fingerprint != self._fingerprint(task):
+            self._discard_entry(future)
+            return None
+        return future
+
+    def _accept(self, result: Any) -> Any:
+        with self._lock:
+            self._stats["hits"] += 1
+        return result
+
+    def _reject(self, task: Task, kind: str, future: Future, token: CancellationToken, error: Exception) -> None:
+        """إهمال تحضير فشل أو انتهت مهلته؛ إلغاء المهمة نفسها يُعاد إطلاقه"""
+        self._discard_entry(future)
+        if isinstance(error, TaskCancelledError):
+            if token.interrupted:
+                raise error
+            logger.warning(f"Speculative {kind} for task '{task.name}' timed out")
+        else:
+            logger.warning(f"Speculative {kind} for task '{task.name}' failed: {str(error)}")
+        return None
+
+    def discard(self, task_id: Optional[str] = None) -> None:
+        """إلغاء التحضير لمهمة محددة أو لجميع المهام"""
+        with self._lock:
+            if task_id is None:
+                entries = list(self._entries.values())
+                self._entries.clear()
+            else:
+                entry = self._entries.pop(task_id, None)
+                entries = [entry] if entry else []
+
+        for _, _, future in entries:
+            self._discard_entry(future)
+
+    def _discard_entry(self, future: Future) -> None:
+        """إلغاء تحضير لم يبدأ بعد، أو إهمال نتيجته إذا كان قيد التنفيذ"""
+        future.cancel()
+        with self._lock:
+            self._stats["discarded"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """إحصائيات التحضير المسبق"""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._entries))
\ No newline at end of file
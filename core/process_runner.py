@@ -0,0 +1,58 @@
+"""
+تشغيل الوكلاء في عمليات منفصلة للاستفادة من جميع أنوية المعالج
+"""
+from typing import Dict, Any
+
+def run_agent_in_process(
+    agent_data: Dict[str, Any],
+    service_config: Dict[str, Any],
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """استعادة وكيل من قاموس وتشغيله داخل عملية فرعية ثم إعادة حالته كقاموس
+
+    تُنفذ هذه الدالة في عملية مستقلة، لذا تعيد إنشاء خدمة النموذج اللغوي
+    وأغلفتها (حدود المعدل والذاكرة المؤقتة والموجه) والأدوات محليًا من
+    service_config دون قاعدة بيانات؛ الحفظ يتم في العملية الأم بعد الدمج.
+    """
+    # الاستيراد داخل الدالة لتجنب الاستيراد الدائري ولتقليل كلفة بدء العملية
+    from core.autogpt import AutoGPT
+    from core.agent import Agent
+    from core.async_agent import AsyncAgent
+    from core.result_cache import ResultCache
+
+    config = dict(service_config)
+    result_cache_db = config.pop("result_cache_db", None)
+    result_cache_ttl = config.pop("result_cache_ttl", None)
+
+    system = AutoGPT(
+        db_provider="none",
+        max_workers=max_workers,
+        max_concurrent_agents=1,
+        **config
+    )
+
+    agent_class = AsyncAgent if agent_data.get("runtime") == "async" else Agent
+    agent = agent_class.from_dict(
+        agent_data,
+        system.llm_service,
+        None,
+        system.tool_registry,
+        system.learning_service,
+        executor=system.orchestrator.worker_pool,
+        call_executor=system.orchestrator.call_pool,
+        history_limit=system.history_limit,
+        history_dir=system.history_dir
+    )
+    if result_cache_db:
+        # الذاكرة المؤقتة لنتائج المهام مشتركة مع العملية الأم عبر ملف قاعدة البيانات نفسه
+        from database.sqlite_db import SQLiteDatabaseService
+        agent.result_cache = ResultCache(SQLiteDatabaseService(result_cache_db), result_cache_ttl)
+
+    try:
+        agent.start()
+    finally:
+        system.orchestrator.shutdown(wait=False)
+        # إفراغ ملف ترحيل السجل قبل أن تقرأه العملية الأم
+        agent.history.close()
+
+    return agent.to_dict()
\ No newline at end of file
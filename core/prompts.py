@@ -0,0 +1,179 @@
+"""
+قوالب النصوص التوجيهية المستخدمة من قبل الوكلاء
+"""
+import textwrap
+import threading
+from typing import Dict, Any
+
+from llm.tokens import BYTES_PER_TOKEN
+
+def _estimate_tokens(byte_count: int) -> int:
+    """تقدير تقريبي لعدد التوكنات المقابلة لعدد من البايتات"""
+    return byte_count // BYTES_PER_TOKEN
+
+class PromptTemplate:
+    """قالب نص توجيهي يُجمَّع مرة واحدة بعد إزالة المسافات البادئة والأسطر الفارغة"""
+
+    def __init__(self, kind: str, template: str):
+        self.kind = kind
+        self.raw = template
+        self.compiled = self._compile(template)
+        # الفرق ثابت لكل عملية عرض لأن القيم المُدرجة متطابقة في النسختين
+        self.saved_bytes_per_render = len(self.raw.encode("utf-8")) - len(self.compiled.encode("utf-8"))
+        self._lock = threading.Lock()
+        self._renders = 0
+        self._rendered_bytes = 0
+        self._saved_bytes = 0
+
+    @staticmethod
+    def _compile(template: str) -> str:
+        """إزالة الإزاحة والمسافات الزائدة والأسطر الفارغة من القالب"""
+        lines = textwrap.dedent(template).splitlines()
+        return "\n".join(line.strip() for line in lines if line.strip())
+
+    def render(self, extra_saved_bytes: int = 0, **values: Any) -> str:
+        """عرض القالب بالقيم المحددة مع تسجيل إحصائيات التوفير
+
+        extra_saved_bytes: بايتات إضافية تم توفيرها في القيم نفسها (مثل فهرس الأدوات المضغوط)
+        """
+        text = self.compiled.format(**values)
+        with self._lock:
+            self._renders += 1
+            self._rendered_bytes += len(text.encode("utf-8"))
+            self._saved_bytes += self.saved_bytes_per_render + extra_saved_bytes
+        return text
+
+    def get_stats(self) -> Dict[str, int]:
+        """إحصائيات العرض والتوفير لهذا القالب"""
+        with self._lock:
+            return {
+                "renders": self._renders,
+                "rendered_bytes": self._rendered_bytes,
+                "saved_bytes": self._saved_bytes,
+                "saved_tokens": _estimate_tokens(self._saved_bytes)
+            }
+
+BREAKDOWN = PromptTemplate("breakdown", """
+        أنت وكيل ذكاء اصطناعي مهمتك تقسيم المهام إلى خطوات أصغر وأكثر قابلية للتنفيذ.
+
+        هدفك العام: {goal}
+
+        المهمة التي تحتاج إلى تقسيمها:
+        اسم: {task_name}
+        وصف: {task_description}
+
+        الأدوات المتاحة لك:
+        {tool_catalog}
+
+        قم بتقسيم هذه المهمة إلى خطوات أصغر ({min_steps}-{max_steps} خطوات) تكون منطقية ومترابطة.
+
+        قدم الإجابة بتنسيق JSON كما يلي:
+        {{
+            "subtasks": [
+                {{
+                    "name": "اسم المهمة الفرعية 1",
+                    "description": "وصف تفصيلي للمهمة 1",
+                    "priority": 5,
+                    "tools": ["اسم_الأداة_1", "اسم_الأداة_2"],
+                    "depends_on": ["اسم مهمة فرعية سابقة يعتمد عليها التنفيذ"]
+                }},
+                ...
+            ]
+        }}
+
+        اترك "depends_on" فارغة للمهام التي يمكن تنفيذها بشكل مستقل.
+        """)
+
+BREAKDOWN_FALLBACK = PromptTemplate("breakdown_fallback", """
+            لم أتمكن من فهم استجابتك السابقة. من فضلك قم بتقسيم المهمة "{task_description}" إلى خطوات أصغر.
+
+            قدم الإجابة فقط بتنسيق JSON التالي:
+            {{
+                "subtasks": [
+                    {{
+                        "name": "اسم المهمة الفرعية",
+                        "description": "وصف تفصيلي"
+                    }},
+                    ...
+                ]
+            }}
+            """)
+
+EXECUTION = PromptTemplate("execution", """
+                أنت وكيل ذكاء اصطناعي مهمتك تنفيذ المهمة التالية بناءً على المعلومات المقدمة.
+
+                الهدف العام: {goal}
+
+                المهمة المطلوب تنفيذها:
+                اسم: {task_name}
+                وصف: {task_description}
+
+                الأدوات المتاحة لك:
+                {tool_catalog}
+
+                قم بتنفيذ المهمة وتقديم نتيجة مفصلة وشاملة.
+                """)
+
+FUSED_EXECUTION = PromptTemplate("fused_execution", """
+                أنت وكيل ذكاء اصطناعي مهمتك تنفيذ المهمة التالية وتحديد مدخلات الأدوات المقترحة في استجابة واحدة.
+
+                الهدف العام: {goal}
+
+                المهمة المطلوب تنفيذها:
+                اسم: {task_name}
+                وصف: {task_description}
+
+                الأدوات المقترحة لهذه المهمة:
+                {tool_catalog}
+
+                قدم مسودة نتيجة مفصلة للمهمة، ومدخلات دقيقة لكل أداة مقترحة، فقط بتنسيق JSON التالي:
+                {{
+                    "draft": "مسودة النتيجة",
+                    "tool_inputs": {{
+                        "اسم_الأداة": "مدخلات الأداة"
+                    }}
+                }}
+                """)
+
+TOOL_INSTRUCTIONS = PromptTemplate("tool_instructions", """
+                        أنا بحاجة إلى استخدام أداة "{tool_name}" لتنفيذ مهمة:
+                        {task_description}
+
+                        وصف الأداة: {tool_description}
+
+                        كيف يمكنني استخدام هذه الأداة بشكل فعال لتنفيذ المهمة؟ قدم مدخلات دقيقة وتفصيلية لاستخدام الأداة.
+                        """)
+
+INTEGRATION = PromptTemplate("integration", """
+                        لقد قمت بتنفيذ المهمة:
+                        {task_description}
+
+                        وتوصلت إلى النتيجة التالية:
+                        {result}
+
+                        كما استخدمت الأدوات التالية:
+                        {tools_output}
+
+                        قم بدمج نتائج الأدوات مع النتيجة الرئيسية لتقديم إجابة شاملة ومتكاملة.
+                        """)
+
+SUMMARY = PromptTemplate("summary", """
+                أنت وكيل ذكاء اصطناعي تقوم بتلخيص وتجميع نتائج المهام الفرعية في نتيجة واحدة شاملة.
+
+                المهمة الرئيسية: {task_name}
+                وصف المهمة: {task_description}
+
+                نتائج المهام الفرعية:
+                {results_text}
+
+                قم بتلخيص هذه النتائج في إجابة شاملة ومتماسكة. قدم تحليلاً للنتائج واستنتاجات نهائية.
+                """)
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {
+    template.kind: template
+    for template in (BREAKDOWN, BREAKDOWN_FALLBACK, EXECUTION, FUSED_EXECUTION, TOOL_INSTRUCTIONS, INTEGRATION, SUMMARY)
+}
+
+def get_prompt_stats() -> Dict[str, Dict[str, int]]:
+    """الحصول على إحصائيات التوفير لكل نوع من النصوص التوجيهية"""
+    return {kind: template.get_stats() for kind, template in PROMPT_TEMPLATES.items()}
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+ذاكرة مؤقتة لنتائج المهام مشتركة بين جميع الوكلاء ومخزنة في طبقة قاعدة البيانات
+"""
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Set
+
+logger = logging.getLogger("autogpt")
+
+def normalize_text(text: Optional[str]) -> str:
+    """توحيد النص قبل حساب المفتاح: مسافات موحدة وأحرف صغيرة"""
+    return " ".join((text or "").split()).lower()
+
+class ResultCache:
+    """ذاكرة مؤقتة لنتائج المهام المباشرة معنونة بالمحتوى
+
+    المفتاح هو تجزئة SHA-256 لوصف المهمة والهدف بعد توحيدهما ومجموعة الأدوات
+    ومعاملات النموذج (المزود والنموذج وإعدادات التوليد مثل temperature)، لذا
+    يستفيد منها الوكلاء المختلفون الذين تتولد لديهم المهام نفسها. تنتهي صلاحية
+    الإدخالات بعد مدة محددة، ويمكن لأي منشئ (creator_id) إلغاء الاشتراك فلا
+    تُقرأ نتائجه ولا تُخزن؛ يُحفظ إلغاء الاشتراك في قاعدة البيانات مع النتائج.
+    """
+
+    def __init__(self, db_service: 'DatabaseService', ttl_seconds: float = 86400.0):
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.db_service = db_service
+        self.ttl_seconds = ttl_seconds
+        self._opted_out: Set[str] = set(self._load_opt_outs())
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    def _load_opt_outs(self) -> List[str]:
+        """تحميل المنشئين الملغى اشتراكهم من قاعدة البيانات"""
+        try:
+            return self.db_service.get_result_cache_opt_outs()
+        except Exception as e:
+            logger.warning(f"Loading result cache opt-outs failed: {str(e)}")
+            return []
+
+    @staticmethod
+    def make_key(
+        description: str,
+        goal: str,
+        tool_names: List[str],
+        model_params: Dict[str, Any]
+    ) -> str:
+        """حساب مفتاح المحتوى لنتيجة مهمة"""
+        payload = json.dumps(
+            {
+                "description": normalize_text(description),
+                "goal": normalize_text(goal),
+                "tools": sorted(name.lower() for name in tool_names),
+                "model": model_params
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def set_opt_out(self, creator_id: str, opted_out: bool = True) -> None:
+        """إلغاء اشتراك منشئ في الذاكرة المؤقتة أو إعادته"""
+        try:
+            self.db_service.save_result_cache_opt_out(creator_id, opted_out)
+        except Exception as e:
+            # يبقى التغيير ساريًا في هذه العملية حتى لو تعذر حفظه
+            logger.warning(f"Saving result cache opt-out failed: {str(e)}")
+        with self._lock:
+            if opted_out:
+                self._opted_out.add(creator_id)
+            else:
+                self._opted_out.discard(creator_id)
+
+    def is_enabled_for(self, creator_id: Optional[str]) -> bool:
+        """هل الذاكرة المؤقتة مفعلة لوكلاء هذا المنشئ"""
+        with self._lock:
+            return creator_id not in self._opted_out
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """استرجاع إدخال صالح بمفتاحه"""
+        try:
+            entry = self.db_service.get_cached_result(cache_key)
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {str(e)}")
+            entry = None
+
+        with self._lock:
+            self._stats["hits" if entry is not None else "misses"] += 1
+        return entry
+
+    def put(self, cache_key: str, result: str, **details: Any) -> None:
+        """تخزين نتيجة مهمة مع مدة الصلاحية الافتراضية"""
+        now = time.time()
+        entry = dict(details, result=result, cached_at=now)
+        try:
+            self.db_service.save_cached_result(cache_key, entry, now + self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Result cache store failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._stats["stores"] += 1
+
+    def purge_expired(self) -> int:
+        """حذف الإدخالات المنتهية الصلاحية من قاعدة البيانات"""
+        return self.db_service.purge_expired_results()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """إحصائيات الذاكرة المؤقتة"""
+        with self._lock:
+            return dict(self._stats, ttl_seconds=self.ttl_seconds, opted_out=sorted(self._opted_out))
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+جدولة المهام الجاهزة للتنفيذ داخل الوكيل
+"""
+import heapq
+import itertools
+import threading
+from typing import List, Tuple, Optional
+from datetime import datetime
+
+from core.task import Task, TaskStatus
+
+class TaskScheduler:
+    """طابور أولويات للمهام المعلقة مع إيقاف مؤقت واستئناف مبنيين على الأحداث"""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, datetime, int, Task]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stopped = threading.Event()
+
+    def push(self, task: Task) -> None:
+        """إضافة مهمة إلى طابور الأولويات"""
+        with self._condition:
+            heapq.heappush(self._heap, (-task.priority, task.created_at, next(self._counter), task))
+            self._condition.notify()
+
+    def pop(self, block: bool = True) -> Optional[Task]:
+        """سحب المهمة المعلقة التالية الأعلى أولوية
+
+        تنتظر الدالة أثناء الإيقاف المؤقت دون استطلاع، وتعيد None عند الإيقاف
+        أو عند عدم وجود مهام معلقة.
+        """
+        with self._condition:
+            while True:
+                if self._stopped.is_set():
+                    return None
+
+                if not self._resumed.is_set():
+                    if not block:
+                        return None
+                    self._condition.wait()
+                    continue
+
+                # تجاهل المهام التي تغيرت حالتها منذ إضافتها
+                while self._heap and self._heap[0][-1].status != TaskStatus.PENDING:
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    return None
+
+                return heapq.heappop(self._heap)[-1]
+
+    def peek(self, count: int) -> List[Task]:
+        """إرجاع أعلى المهام المعلقة أولوية دون سحبها"""
+        if count <= 0:
+            return []
+        with self._condition:
+            pending = [entry for entry in self._heap if entry[-1].status == TaskStatus.PENDING]
+            return [entry[-1] for entry in heapq.nsmallest(count, pending)]
+
+    def pause(self) -> None:
+        """إيقاف تسليم المهام مؤقتًا"""
+        with self._condition:
+            self._resumed.clear()
+
+    def resume(self) -> None:
+        """استئناف تسليم المهام وإيقاظ المنتظرين فورًا"""
+        with self._condition:
+            self._resumed.set()
+            self._condition.notify_all()
+
+    def stop(self) -> None:
+        """إيقاف الجدولة وإيقاظ جميع المنتظرين"""
+        with self._condition:
+            self._stopped.set()
+            self._condition.notify_all()
+
+    def reset(self) -> None:
+        """إعادة تهيئة حالة الجدولة قبل تشغيل جديد"""
+        with self._condition:
+            self._stopped.clear()
+            self._resumed.set()
+
+    def clear(self) -> None:
+        """إفراغ طابور الأولويات"""
+        with self._condition:
+            self._heap.clear()
+
+    def wait_until_resumed(self, timeout: Optional[float] = None) -> bool:
+        """الانتظار حتى يتم الاستئناف"""
+        return self._resumed.wait(timeout)
+
+    @property
+    def is_paused(self) -> bool:
+        """هل الجدولة متوقفة مؤقتًا"""
+        return not self._resumed.is_set()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._heap)
\ No newline at end of file
@@ -1,22 +1,268 @@
-# مثال مبسط لفئة Task
-from enum import Enum
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-
-class TaskStatus(str, Enum):
-    PENDING = "pending"
-    IN_PROGRESS = "in_progress"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    CANCELED = "canceled"
-
-class Task:
-    def __init__(self, name, description, agent_id=None, status=TaskStatus.PENDING):
-        self.id = str(uuid.uuid4())
-        self.name = name
-        self.description = description
-        self.status = status
-        self.agent_id = agent_id
-        self.subtasks = []
-        self.result = None
-        self.created_at = datetime.now()
\ No newline at end of file
+"""
+تمثيل للمهام التي ينفذها الوكيل
+"""
+import uuid
+import threading
+from contextlib import contextmanager
+from enum import Enum
+from typing import List, Dict, Any, Optional, Iterator
+from datetime import datetime
+
+class TaskStatus(str, Enum):
+    """حالات المهمة المحتملة"""
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELED = "canceled"
+
+def _empty_counts() -> Dict[TaskStatus, int]:
+    return {status: 0 for status in TaskStatus}
+
+class TaskTreeStats:
+    """عدادات حالات مجمّعة لجميع المهام في أشجار مهام وكيل واحد
+
+    تُحدّث تدريجيًا عند كل تغيير في حالة مهمة، فتكون قراءتها O(1). قفلها
+    يصبح قفل جميع الأشجار المرتبطة بها، فلا تتنافس وكلاء مختلفة على قفل واحد.
+    """
+
+    def __init__(self):
+        self._counts = _empty_counts()
+        self.lock = threading.RLock()
+
+    def track(self, task: 'Task') -> None:
+        """ربط شجرة مهمة بهذه العدادات وإضافة حالات مهامها"""
+        with self.lock, task._tree_locked():
+            task._bind_stats(self, self.lock)
+            self._apply(task.rollup, 1)
+
+    def reset(self) -> None:
+        """تصفير العدادات"""
+        with self.lock:
+            self._counts = _empty_counts()
+
+    def _apply(self, counts: Dict[TaskStatus, int], sign: int) -> None:
+        for status, count in counts.items():
+            self._counts[status] += sign * count
+
+    def _on_status_change(self, old_status: TaskStatus, new_status: TaskStatus) -> None:
+        self._counts[old_status] -= 1
+        self._counts[new_status] += 1
+
+    def snapshot(self) -> Dict[TaskStatus, int]:
+        """نسخة من عدد المهام في كل حالة"""
+        with self.lock:
+            return dict(self._counts)
+
+class Task:
+    """تمثيل للمهمة التي سيتم تنفيذها بواسطة الوكيل"""
+    
+    def __init__(
+        self, 
+        name: str, 
+        description: str, 
+        agent_id: Optional[str] = None,
+        status: TaskStatus = TaskStatus.PENDING,
+        task_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        priority: int = 5,  # إضافة معلمة priority بقيمة افتراضية 5
+        tags: Optional[List[str]] = None  # إضافة معلمة tags
+    ):
+        self.id = task_id or str(uuid.uuid4())
+        self.name = name
+        self.description = description
+        self.status = status
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.completed_at = None
+        self.agent_id = agent_id
+        self.parent_id = parent_id
+        self.priority = priority  # تخزين الأولوية
+        self.tags = tags or []  # تخزين الوسوم
+        self.result = None
+        self.error_message = None
+        self.subtasks: List[Task] = []
+        self.feedback: Dict[str, Any] = {}
+        self.metadata: Dict[str, Any] = {}
+        # عدد المهام في كل حالة لهذه المهمة وجميع مهامها الفرعية
+        self.rollup = _empty_counts()
+        self.rollup[status] = 1
+        self._parent: Optional['Task'] = None
+        self._stats: Optional[TaskTreeStats] = None
+        # قفل العدادات التجميعية للشجرة: خاص بالمهمة الجذرية حتى تُربط بوكيل
+        self._lock = threading.RLock()
+        # رمز إلغاء العمل الجاري للمهمة أثناء تنفيذها فقط
+        self._cancel_token = None
+    
+    @property
+    def depth(self) -> int:
+        """عمق المهمة في الشجرة (المهمة الجذرية عمقها 0)"""
+        depth = 0
+        node = self._parent
+        while node is not None:
+            depth += 1
+            node = node._parent
+        return depth
+    
+    def _bind_stats(self, stats: Optional[TaskTreeStats], lock: threading.RLock) -> None:
+        """ربط هذه المهمة ومهامها الفرعية بعدادات الوكيل وقفل الشجرة"""
+        self._stats = stats
+        self._lock = lock
+        for subtask in self.subtasks:
+            subtask._bind_stats(stats, lock)
+    
+    @contextmanager
+    def _tree_locked(self) -> Iterator[None]:
+        """الحصول على قفل الشجرة الحالي، مع إعادة المحاولة إذا استُبدل أثناء الانتظار"""
+        while True:
+            lock = self._lock
+            lock.acquire()
+            if lock is self._lock:
+                break
+            lock.release()
+        try:
+            yield
+        finally:
+            lock.release()
+    
+    def attach_subtask(self, subtask: 'Task') -> 'Task':
+        """إلحاق مهمة فرعية موجودة وتحديث العدادات التجميعية للأسلاف"""
+        with self._tree_locked():
+            subtask._parent = self
+            self.subtasks.append(subtask)
+            node: Optional[Task] = self
+            while node is not None:
+                for status, count in subtask.rollup.items():
+                    node.rollup[status] += count
+                node = node._parent
+            subtask._bind_stats(self._stats, self._lock)
+            if self._stats is not None:
+                self._stats._apply(subtask.rollup, 1)
+        return subtask
+    
+    def add_subtask(self, name: str, description: str, priority: int = 5) -> 'Task':
+        """إضافة مهمة فرعية لهذه المهمة"""
+        subtask = Task(
+            name=name, 
+            description=description, 
+            agent_id=self.agent_id,
+            parent_id=self.id,
+            priority=priority
+        )
+        self.attach_subtask(subtask)
+        self.updated_at = datetime.now()
+        return subtask
+    
+    def update_status(self, status: TaskStatus) -> None:
+        """تحديث حالة المهمة"""
+        with self._tree_locked():
+            old_status = self.status
+            self.status = status
+            if old_status != status:
+                # تحديث العدادات التجميعية لهذه المهمة وأسلافها وعدادات الوكيل
+                node: Optional[Task] = self
+                while node is not None:
+                    node.rollup[old_status] -= 1
+                    node.rollup[status] += 1
+                    node = node._parent
+                if self._stats is not None:
+                    self._stats._on_status_change(old_status, status)
+        self.updated_at = datetime.now()
+        if status == TaskStatus.COMPLETED or status == TaskStatus.FAILED:
+            self.completed_at = self.updated_at
+    
+    def complete(self, result: Any) -> None:
+        """تحديث المهمة كمكتملة مع النتيجة"""
+        self.result = result
+        self.update_status(TaskStatus.COMPLETED)
+    
+    def append_result(self, chunk: str) -> None:
+        """إلحاق جزء من نتيجة ما زالت قيد التوليد بنتيجة المهمة"""
+        self.result = (self.result or "") + chunk
+        self.updated_at = datetime.now()
+    
+    def fail(self, error_message: str) -> None:
+        """تحديث المهمة كفاشلة مع سبب الفشل"""
+        self.error_message = error_message
+        self.update_status(TaskStatus.FAILED)
+    
+    def cancel(self) -> None:
+        """إلغاء المهمة وقطع العمل الجاري لها إن كانت قيد التنفيذ"""
+        self.update_status(TaskStatus.CANCELED)
+        token = self._cancel_token
+        if token is not None:
+            token.cancel(f"Task '{self.name}' canceled")
+    
+    def add_feedback(self, user_id: str, rating: int, comment: Optional[str] = None) -> None:
+        """إضافة تقييم المستخدم للمهمة"""
+        self.feedback[user_id] = {
+            "rating": rating,  # 1-5 نجوم
+            "comment": comment,
+            "timestamp": datetime.now().isoformat()
+        }
+        self.updated_at = datetime.now()
+    
+    def add_metadata(self, key: str, value: Any) -> None:
+        """إضافة بيانات وصفية إضافية للمهمة"""
+        self.metadata[key] = value
+        self.updated_at = datetime.now()
+    
+    def to_dict(self, include_subtasks: bool = True) -> Dict[str, Any]:
+        """تحويل المهمة إلى قاموس لعرضها أو تخزينها"""
+        result = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "agent_id": self.agent_id,
+            "parent_id": self.parent_id,
+            "priority": self.priority,
+            "tags": self.tags,
+            "result": self.result,
+            "error_message": self.error_message,
+            "feedback": self.feedback,
+            "metadata": self.metadata,
+            "subtree_status_counts": {status.value: count for status, count in self.rollup.items() if count},
+        }
+        
+        if include_subtasks:
+            result["subtasks"] = [subtask.to_dict(include_subtasks) for subtask in self.subtasks]
+            
+        return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Task':
+        """إنشاء مهمة من قاموس"""
+        task = cls(
+            name=data["name"],
+            description=data["description"],
+            agent_id=data.get("agent_id"),
+            status=TaskStatus(data["status"]),
+            task_id=data["id"],
+            parent_id=data.get("parent_id"),
+            priority=data.get("priority", 5),
+            tags=data.get("tags", [])
+        )
+        
+        # تحويل التواريخ من النص إلى كائنات datetime
+        if "created_at" in data:
+            task.created_at = datetime.fromisoformat(data["created_at"])
+        if "updated_at" in data:
+            task.updated_at = datetime.fromisoformat(data["updated_at"])
+        if "completed_at" in data and data["completed_at"]:
+            task.completed_at = datetime.fromisoformat(data["completed_at"])
+            
+        task.result = data.get("result")
+        task.error_message = data.get("error_message")
+        task.feedback = data.get("feedback", {})
+        task.metadata = data.get("metadata", {})
+        
+        # إضافة المهام الفرعية إذا كانت موجودة
+        if "subtasks" in data:
+            for subtask_data in data["subtasks"]:
+                task.attach_subtask(Task.from_dict(subtask_data))
+                
+        return task
\ No newline at end of file
@@ -1,55 +1,87 @@
-"""
-واجهة أساسية لخدمات قاعدة البيانات
-"""
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-
-from core.task import Task
-from core.agent import Agent
-
-class DatabaseService:
-    """واجهة أساسية لخدمات قاعدة البيانات"""
-    
-    def save_agent(self, agent: Agent) -> None:
-        """حفظ بيانات الوكيل"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
-        """استرجاع بيانات وكيل محدد"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def get_all_agents(self, creator_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """استرجاع بيانات جميع الوكلاء"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def delete_agent(self, agent_id: str) -> bool:
-        """حذف وكيل من قاعدة البيانات"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def save_task(self, task: Task) -> None:
-        """حفظ بيانات المهمة"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """استرجاع بيانات مهمة محددة"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def get_agent_tasks(self, agent_id: str) -> List[Dict[str, Any]]:
-        """استرجاع جميع مهام وكيل محدد"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def update_task(self, task: Task) -> None:
-        """تحديث بيانات مهمة"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def delete_task(self, task_id: str) -> bool:
-        """حذف مهمة من قاعدة البيانات"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def log_agent_action(self, agent_id: str, action_data: Dict[str, Any]) -> None:
-        """تسجيل إجراء وكيل في السجل"""
-        raise NotImplementedError("This method should be implemented by subclasses")
-    
-    def get_agent_logs(self, agent_id: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """استرجاع سجل إجراءات وكيل محدد"""
+"""
+واجهة أساسية لخدمات قاعدة البيانات
+"""
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+from core.task import Task
+from core.agent import Agent
+
+class DatabaseService:
+    """واجهة أساسية لخدمات قاعدة البيانات"""
+    
+    def save_agent(self, agent: Agent) -> None:
+        """حفظ بيانات الوكيل"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """استرجاع بيانات وكيل محدد"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_all_agents(self, creator_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """استرجاع بيانات جميع الوكلاء"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def delete_agent(self, agent_id: str) -> bool:
+        """حذف وكيل من قاعدة البيانات"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def save_task(self, task: Task) -> None:
+        """حفظ بيانات المهمة"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """استرجاع بيانات مهمة محددة"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_agent_tasks(self, agent_id: str) -> List[Dict[str, Any]]:
+        """استرجاع جميع مهام وكيل محدد"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def update_task(self, task: Task) -> None:
+        """تحديث بيانات مهمة"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def delete_task(self, task_id: str) -> bool:
+        """حذف مهمة من قاعدة البيانات"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def log_agent_action(self, agent_id: str, action_data: Dict[str, Any]) -> None:
+        """تسجيل إجراء وكيل في السجل"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_agent_logs(self, agent_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """استرجاع سجل إجراءات وكيل محدد"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def save_task_checkpoint(self, agent_id: str, task_data: Dict[str, Any]) -> None:
+        """حفظ نقطة استعادة لمهمة (سجل مسطح دون المهام الفرعية)"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_task_checkpoints(self, agent_id: str) -> List[Dict[str, Any]]:
+        """استرجاع آخر نقاط الاستعادة لجميع مهام وكيل محدد"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def clear_task_checkpoints(self, agent_id: str) -> None:
+        """حذف نقاط الاستعادة الخاصة بوكيل محدد"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """استرجاع نتيجة مهمة مخزنة مؤقتًا بمفتاحها، أو None إذا لم توجد أو انتهت صلاحيتها"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def save_cached_result(self, cache_key: str, entry: Dict[str, Any], expires_at: float) -> None:
+        """تخزين نتيجة مهمة مؤقتًا حتى وقت انتهاء الصلاحية (طابع زمني يونكس)"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def purge_expired_results(self) -> int:
+        """حذف النتائج المخزنة مؤقتًا المنتهية الصلاحية وإرجاع عددها"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def save_result_cache_opt_out(self, creator_id: str, opted_out: bool) -> None:
+        """حفظ إلغاء اشتراك منشئ في الذاكرة المؤقتة المشتركة للنتائج أو إعادته"""
+        raise NotImplementedError("This method should be implemented by subclasses")
+    
+    def get_result_cache_opt_outs(self) -> List[str]:
+        """استرجاع معرفات المنشئين الملغى اشتراكهم في الذاكرة المؤقتة المشتركة للنتائج"""
         raise NotImplementedError("This method should be implemented by subclasses")
\ No newline at end of file
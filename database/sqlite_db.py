@@ -1,42 +1,325 @@
-# مثال مبسط لخدمة SQLite
-import sqlite3
-from .db_service import DatabaseService
-
-class SQLiteDatabaseService(DatabaseService):
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self._init_db()
-        
-    def _init_db(self):
-        """إنشاء الجداول إذا لم تكن موجودة"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # إنشاء جدول الوكلاء
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS agents (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            goal TEXT,
-            description TEXT,
-            created_at TEXT,
-            data TEXT
-        )
-        ''')
-        
-        # إنشاء جدول المهام
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id TEXT PRIMARY KEY,
-            agent_id TEXT,
-            name TEXT,
-            description TEXT,
-            status TEXT,
-            created_at TEXT,
-            data TEXT,
-            FOREIGN KEY (agent_id) REFERENCES agents (id)
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
\ No newline at end of file
+# مثال مبسط لخدمة SQLite
+import sqlite3
+import json
+import time
+from .db_service import DatabaseService
+
+class SQLiteDatabaseService(DatabaseService):
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._init_db()
+        
+    def _init_db(self):
+        """إنشاء الجداول إذا لم تكن موجودة"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # إنشاء جدول الوكلاء
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS agents (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            goal TEXT,
+            description TEXT,
+            created_at TEXT,
+            data TEXT
+        )
+        ''')
+        
+        # إنشاء جدول المهام
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            agent_id TEXT,
+            name TEXT,
+            description TEXT,
+            status TEXT,
+            created_at TEXT,
+            data TEXT,
+            FOREIGN KEY (agent_id) REFERENCES agents (id)
+        )
+        ''')
+        
+        # إنشاء جدول سجل إجراءات الوكلاء
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS agent_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            agent_id TEXT,
+            data TEXT
+        )
+        ''')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_agent_logs_agent ON agent_logs (agent_id)'
+        )
+        
+        # إنشاء جدول نقاط استعادة المهام (آخر حالة لكل مهمة)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_checkpoints (
+            task_id TEXT PRIMARY KEY,
+            agent_id TEXT,
+            parent_id TEXT,
+            status TEXT,
+            created_at TEXT,
+            data TEXT
+        )
+        ''')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_task_checkpoints_agent ON task_checkpoints (agent_id)'
+        )
+        
+        # إنشاء جدول النتائج المخزنة مؤقتًا المشتركة بين الوكلاء
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS result_cache (
+            cache_key TEXT PRIMARY KEY,
+            expires_at REAL,
+            data TEXT
+        )
+        ''')
+        
+        # إنشاء جدول المنشئين الملغى اشتراكهم في الذاكرة المؤقتة المشتركة
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS result_cache_opt_outs (
+            creator_id TEXT PRIMARY KEY
+        )
+        ''')
+        
+        conn.commit()
+        conn.close()
+        
+    def save_agent(self, agent):
+        """حفظ بيانات الوكيل"""
+        agent_dict = agent.to_dict()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO agents VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    agent_dict["id"],
+                    agent_dict["name"],
+                    agent_dict["goal"],
+                    agent_dict.get("description"),
+                    agent_dict.get("created_at"),
+                    json.dumps(agent_dict, ensure_ascii=False, default=str)
+                )
+            )
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def get_agent(self, agent_id):
+        """استرجاع بيانات وكيل محدد"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('SELECT data FROM agents WHERE id = ?', (agent_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+        
+    def get_all_agents(self, creator_id=None):
+        """استرجاع بيانات جميع الوكلاء"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('SELECT data FROM agents ORDER BY created_at').fetchall()
+        finally:
+            conn.close()
+        agents = [json.loads(row[0]) for row in rows]
+        if creator_id:
+            agents = [agent_data for agent_data in agents if agent_data.get("creator_id") == creator_id]
+        return agents
+        
+    def delete_agent(self, agent_id):
+        """حذف وكيل من قاعدة البيانات مع مهامه وسجلاته ونقاط استعادته"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute('DELETE FROM tasks WHERE agent_id = ?', (agent_id,))
+            conn.execute('DELETE FROM agent_logs WHERE agent_id = ?', (agent_id,))
+            conn.execute('DELETE FROM task_checkpoints WHERE agent_id = ?', (agent_id,))
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+            
+    def save_task(self, task):
+        """حفظ بيانات المهمة"""
+        task_dict = task.to_dict()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    task_dict["id"],
+                    task_dict.get("agent_id"),
+                    task_dict["name"],
+                    task_dict.get("description"),
+                    task_dict.get("status"),
+                    task_dict.get("created_at"),
+                    json.dumps(task_dict, ensure_ascii=False, default=str)
+                )
+            )
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def get_task(self, task_id):
+        """استرجاع بيانات مهمة محددة"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('SELECT data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+        
+    def get_agent_tasks(self, agent_id):
+        """استرجاع جميع مهام وكيل محدد"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                'SELECT data FROM tasks WHERE agent_id = ? ORDER BY created_at',
+                (agent_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row[0]) for row in rows]
+        
+    def update_task(self, task):
+        """تحديث بيانات مهمة"""
+        self.save_task(task)
+        
+    def delete_task(self, task_id):
+        """حذف مهمة من قاعدة البيانات"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+            
+    def log_agent_action(self, agent_id, action_data):
+        """تسجيل إجراء وكيل في السجل"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                'INSERT INTO agent_logs (agent_id, data) VALUES (?, ?)',
+                (agent_id, json.dumps(action_data, ensure_ascii=False, default=str))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def get_agent_logs(self, agent_id, limit=100):
+        """استرجاع سجل إجراءات وكيل محدد"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if limit > 0:
+                rows = conn.execute(
+                    'SELECT data FROM agent_logs WHERE agent_id = ? ORDER BY id DESC LIMIT ?',
+                    (agent_id, limit)
+                ).fetchall()
+                rows.reverse()
+            else:
+                rows = conn.execute(
+                    'SELECT data FROM agent_logs WHERE agent_id = ? ORDER BY id',
+                    (agent_id,)
+                ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row[0]) for row in rows]
+        
+    def save_task_checkpoint(self, agent_id, task_data):
+        """حفظ نقطة استعادة لمهمة (سجل مسطح دون المهام الفرعية)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO task_checkpoints VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    task_data["id"],
+                    agent_id,
+                    task_data.get("parent_id"),
+                    str(task_data.get("status")),
+                    task_data.get("created_at"),
+                    json.dumps(task_data, ensure_ascii=False, default=str)
+                )
+            )
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def get_task_checkpoints(self, agent_id):
+        """استرجاع آخر نقاط الاستعادة لجميع مهام وكيل محدد"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                'SELECT data FROM task_checkpoints WHERE agent_id = ? ORDER BY created_at',
+                (agent_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row[0]) for row in rows]
+        
+    def clear_task_checkpoints(self, agent_id):
+        """حذف نقاط الاستعادة الخاصة بوكيل محدد"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('DELETE FROM task_checkpoints WHERE agent_id = ?', (agent_id,))
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def get_cached_result(self, cache_key):
+        """استرجاع نتيجة مهمة مخزنة مؤقتًا بمفتاحها، أو None إذا لم توجد أو انتهت صلاحيتها"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                'SELECT data FROM result_cache WHERE cache_key = ? AND expires_at > ?',
+                (cache_key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+        
+    def save_cached_result(self, cache_key, entry, expires_at):
+        """تخزين نتيجة مهمة مؤقتًا حتى وقت انتهاء الصلاحية (طابع زمني يونكس)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?)',
+                (cache_key, expires_at, json.dumps(entry, ensure_ascii=False, default=str))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def purge_expired_results(self):
+        """حذف النتائج المخزنة مؤقتًا المنتهية الصلاحية وإرجاع عددها"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('DELETE FROM result_cache WHERE expires_at <= ?', (time.time(),))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+            
+    def save_result_cache_opt_out(self, creator_id, opted_out):
+        """حفظ إلغاء اشتراك منشئ في الذاكرة المؤقتة المشتركة للنتائج أو إعادته"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if opted_out:
+                conn.execute('INSERT OR IGNORE INTO result_cache_opt_outs VALUES (?)', (creator_id,))
+            else:
+                conn.execute('DELETE FROM result_cache_opt_outs WHERE creator_id = ?', (creator_id,))
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def get_result_cache_opt_outs(self):
+        """استرجاع معرفات المنشئين الملغى اشتراكهم في الذاكرة المؤقتة المشتركة للنتائج"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('SELECT creator_id FROM result_cache_opt_outs').fetchall()
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
\ No newline at end of file
@@ -1,9 +1,9 @@
-"""
-وحدة التعلم (LEARNING)
-================
-توفر هذه الوحدة آليات تمكن الوكلاء من التعلم من تجاربهم.
-"""
-
-from .learning_service import LearningService
-
+"""
+وحدة التعلم (LEARNING)
+================
+توفر هذه الوحدة آليات تمكن الوكلاء من التعلم من تجاربهم.
+"""
+
+from .learning_service import LearningService
+
 __all__ = ['LearningService']
\ No newline at end of file
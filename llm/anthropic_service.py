@@ -1,78 +1,179 @@
-"""
-خدمة للتفاعل مع نماذج Claude من Anthropic
-"""
-from typing import List, Dict, Any, Optional
-import json
-import requests
-from .llm_service import LLMService
-
-class AnthropicService(LLMService):
-    """واجهة للتفاعل مع نماذج Claude من Anthropic"""
-    
-    def __init__(self, api_key: Optional[str] = None):
-        super().__init__(api_key)
-        self.base_url = "https://api.anthropic.com/v1"
-        self.default_model = "claude-3-opus-20240229"
-        self.context_window = 100000  # حجم نافذة السياق المتاحة
-        self.max_tokens = 4000  # عدد التوكنات الافتراضية للإخراج
-    
-    def query(self, prompt: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> str:
-        """إرسال استعلام إلى Claude واسترجاع الاستجابة"""
-        if not self.api_key:
-            raise ValueError("مفتاح API لـ Anthropic مطلوب. قم بتحديده عند إنشاء الخدمة أو ضبطه في متغيرات البيئة.")
-        
-        # تجهيز المعلمات
-        model = kwargs.get("model", self.default_model)
-        max_tokens = kwargs.get("max_tokens", self.max_tokens)
-        temperature = kwargs.get("temperature", 0.7)
-        
-        # إضافة معلومات السياق إلى النص التوجيهي إذا كانت متوفرة
-        if context:
-            context_str = json.dumps(context, ensure_ascii=False, indent=2)
-            prompt = f"معلومات السياق:\n{context_str}\n\nالاستعلام: {prompt}"
-        
-        # في تطبيق حقيقي، استخدم مكتبة Anthropic الرسمية
-        # لأغراض العرض التوضيحي، نستخدم طلبات HTTP مباشرة
-        try:
-            headers = {
-                "x-api-key": self.api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            }
-            
-            data = {
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": temperature
-            }
-            
-            # في تطبيق حقيقي، سنستدعي API Anthropic فعلياً
-            # لكن هنا سنمثل استجابة محاكاة حتى لا نحتاج إلى مفتاح API حقيقي
-            # response = requests.post(f"{self.base_url}/messages", headers=headers, json=data)
-            # response.raise_for_status()
-            # return response.json()["content"][0]["text"]
-            
-            # محاكاة الاستجابة للعرض التوضيحي
-            print(f"[AnthropicService] إرسال استعلام إلى Claude ({model})")
-            return f"استجابة محاكاة من Claude لاستعلام: {prompt[:50]}..."
-            
-        except Exception as e:
-            raise Exception(f"فشل في الاتصال بـ Anthropic API: {str(e)}")
-    
-    def get_embedding(self, text: str) -> List[float]:
-        """الحصول على تمثيل شعاعي للنص
-        
-        ملاحظة: حالياً Claude لا يقدم واجهة برمجة للتمثيلات الشعاعية،
-        لذا هذه وظيفة محاكاة.
-        """
-        # إنشاء تمثيل شعاعي وهمي
-        import hashlib
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        seed = int(text_hash, 16) % (2**32)
-        
-        import random
-        random.seed(seed)
-        
-        # إنشاء متجه 1536-بُعد (مشابه لـ OpenAI embeddings)
-        return [random.uniform(-1, 1) for _ in range(1536)]
\ No newline at end of file
+"""
+خدمة للتفاعل مع نماذج Claude من Anthropic
+"""
+from typing import List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator
+import json
+import logging
+import numpy as np
+from .llm_service import LLMService, split_into_chunks
+from .http import PooledHTTPClient, get_default_client
+from .embeddings import hash_embeddings
+from .tokens import estimate_tokens
+from .context_packer import ContextPacker
+
+logger = logging.getLogger("autogpt")
+
+class AnthropicService(LLMService):
+    """واجهة للتفاعل مع نماذج Claude من Anthropic"""
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[PooledHTTPClient] = None,
+        simulate: bool = True
+    ):
+        super().__init__(api_key)
+        self.base_url = (base_url or "https://api.anthropic.com/v1").rstrip("/")
+        # عميل HTTP بمجمع اتصالات دائمة مشترك بين الاستدعاءات
+        self.http = http_client or get_default_client()
+        # عند التفعيل تُعاد استجابات محاكاة دون إرسال أي طلب
+        self.simulate = simulate
+        self.default_model = "claude-3-opus-20240229"
+        self.economy_model = "claude-3-haiku-20240307"
+        self.context_window = 100000  # حجم نافذة السياق المتاحة
+        self.max_tokens = 4000  # عدد التوكنات الافتراضية للإخراج
+        self.context_packer = ContextPacker()
+    
+    def _build_request(self, prompt: str, context: Optional[Dict[str, Any]], **kwargs) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """تجهيز النموذج والترويسات وجسم الطلب لـ Claude"""
+        if not self.api_key:
+            raise ValueError("مفتاح API لـ Anthropic مطلوب. قم بتحديده عند إنشاء الخدمة أو ضبطه في متغيرات البيئة.")
+        
+        # تجهيز المعلمات
+        model = kwargs.get("model", self.default_model)
+        max_tokens = kwargs.get("max_tokens", self.max_tokens)
+        temperature = kwargs.get("temperature", self.default_temperature)
+        
+        # إضافة معلومات السياق بصيغة مضغوطة ضمن ما يتبقى من نافذة السياق
+        # (أو ضمن max_context_tokens إن حُددت للاستدعاء)
+        if context:
+            budget = kwargs.get("max_context_tokens") or self.context_window - max_tokens - estimate_tokens(prompt)
+            context_str, packed = self.context_packer.pack_context(context, budget)
+            if not packed.complete:
+                logger.warning(
+                    f"Context for {model} packed into {packed.tokens}/{budget} tokens "
+                    f"(truncated: {packed.truncated}, dropped: {packed.dropped})"
+                )
+            prompt = f"معلومات السياق:\n{context_str}\n\nالاستعلام: {prompt}"
+        
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        
+        data = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        
+        return model, headers, data
+    
+    def query(self, prompt: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        """إرسال استعلام إلى Claude واسترجاع الاستجابة"""
+        model, headers, data = self._build_request(prompt, context, **kwargs)
+        
+        try:
+            if not self.simulate:
+                response = self.http.post(f"{self.base_url}/messages", headers=headers, json=data)
+                return self._parse_response(response.json(), model)
+            
+            # محاكاة الاستجابة للعرض التوضيحي
+            print(f"[AnthropicService] إرسال استعلام إلى Claude ({model})")
+            return f"استجابة محاكاة من Claude لاستعلام: {data['messages'][0]['content'][:50]}..."
+            
+        except Exception as e:
+            raise Exception(f"فشل في الاتصال بـ Anthropic API: {str(e)}")
+    
+    async def aquery(self, prompt: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        """إرسال استعلام غير متزامن إلى Claude دون حجب حلقة الأحداث"""
+        if not self.simulate:
+            # الطلب الفعلي يمر بمجمع الاتصالات نفسه في خيط منفصل دون حجب حلقة الأحداث
+            return await super().aquery(prompt, context=context, **kwargs)
+        
+        model, headers, data = self._build_request(prompt, context, **kwargs)
+        
+        try:
+            # محاكاة الاستجابة للعرض التوضيحي
+            print(f"[AnthropicService] إرسال استعلام غير متزامن إلى Claude ({model})")
+            return f"استجابة محاكاة من Claude لاستعلام: {data['messages'][0]['content'][:50]}..."
+            
+        except Exception as e:
+            raise Exception(f"فشل في الاتصال بـ Anthropic API: {str(e)}")
+    
+    def query_stream(self, prompt: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> Iterator[str]:
+        """إرسال استعلام إلى Claude وإرجاع أجزاء الاستجابة فور وصولها (أحداث SSE)"""
+        model, headers, data = self._build_request(prompt, context, **kwargs)
+        
+        try:
+            if not self.simulate:
+                response = self.http.post(f"{self.base_url}/messages", headers=headers, json=dict(data, stream=True), stream=True)
+                with response:
+                    yield from self._iter_stream_events(response, model)
+                return
+            
+            # محاكاة البث للعرض التوضيحي
+            print(f"[AnthropicService] إرسال استعلام ببث الاستجابة إلى Claude ({model})")
+            yield from split_into_chunks(f"استجابة محاكاة من Claude لاستعلام: {data['messages'][0]['content'][:50]}...")
+            
+        except Exception as e:
+            raise Exception(f"فشل في الاتصال بـ Anthropic API: {str(e)}")
+    
+    async def aquery_stream(self, prompt: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> AsyncIterator[str]:
+        """نسخة غير متزامنة من query_stream"""
+        if not self.simulate:
+            # قراءة البث المتزامن جزءًا بجزء في خيط منفصل
+            async for chunk in self._aiter_in_thread(self.query_stream(prompt, context=context, **kwargs)):
+                yield chunk
+            return
+        
+        model, headers, data = self._build_request(prompt, context, **kwargs)
+        
+        try:
+            # محاكاة البث للعرض التوضيحي
+            print(f"[AnthropicService] إرسال استعلام غير متزامن ببث الاستجابة إلى Claude ({model})")
+            for chunk in split_into_chunks(f"استجابة محاكاة من Claude لاستعلام: {data['messages'][0]['content'][:50]}..."):
+                yield chunk
+            
+        except Exception as e:
+            raise Exception(f"فشل في الاتصال بـ Anthropic API: {str(e)}")
+    
+    def _parse_response(self, body: Dict[str, Any], model: str) -> str:
+        """استخراج نص الاستجابة وتسجيل أرقام الاستخدام من جسم استجابة Messages API"""
+        usage = body.get("usage") or {}
+        self._record_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0), body.get("model", model))
+        return "".join(block.get("text", "") for block in body.get("content", []) if block.get("type") == "text")
+    
+    def _iter_stream_events(self, response, model: str) -> Iterator[str]:
+        """قراءة أحداث SSE وإرجاع نصوص content_block_delta مع تسجيل الاستخدام عند انتهاء الرسالة"""
+        input_tokens = output_tokens = 0
+        for raw_line in response.iter_lines():
+            line = raw_line.decode("utf-8")
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            event_type = event.get("type")
+            if event_type == "content_block_delta":
+                text = event["delta"].get("text", "")
+                if text:
+                    yield text
+            elif event_type == "message_start":
+                input_tokens = event["message"].get("usage", {}).get("input_tokens", 0)
+            elif event_type == "message_delta":
+                output_tokens = event.get("usage", {}).get("output_tokens", output_tokens)
+        self._record_usage(input_tokens, output_tokens, model)
+    
+    def get_embedding(self, text: str) -> List[float]:
+        """الحصول على تمثيل شعاعي للنص
+        
+        ملاحظة: حالياً Claude لا يقدم واجهة برمجة للتمثيلات الشعاعية،
+        لذا هذه وظيفة محاكاة.
+        """
+        return self.get_embeddings([text])[0].tolist()
+    
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """تمثيلات شعاعية وهمية ثابتة لعدة نصوص دفعة واحدة (متجهات 1536-بُعد)"""
+        return hash_embeddings(texts)
\ No newline at end of file
@@ -0,0 +1,232 @@
+"""
+ذاكرة مؤقتة لاستجابات النماذج اللغوية بطبقتين: LRU في الذاكرة وSQLite على القرص
+"""
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Iterator, AsyncIterator
+
+from .wrapper import LLMServiceWrapper
+
+logger = logging.getLogger("autogpt")
+
+class CachedLLMService(LLMServiceWrapper):
+    """غلاف يخزن استجابات أي خدمة نموذج لغوي مؤقتًا
+
+    المفتاح تجزئة للمزود والنموذج ودرجة الحرارة والنص التوجيهي والسياق بصيغة
+    JSON قانونية وبقية المعاملات. الاستعلامات بدرجة حرارة أكبر من صفر لا
+    تُخزن (استجاباتها غير حتمية) إلا إذا فُعل cache_nonzero_temperature.
+    طبقة القرص اختيارية وتُقلّم حسب الحجم بحذف الأقدم استخدامًا.
+    """
+
+    def __init__(
+        self,
+        inner: 'LLMService',
+        max_entries: int = 1024,
+        db_path: Optional[str] = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        cache_nonzero_temperature: bool = False
+    ):
+        super().__init__(inner)
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "disk_evictions": 0}
+        self._disk_bytes = 0
+        if db_path:
+            self._init_db()
+
+    def _init_db(self) -> None:
+        """إنشاء جدول طبقة القرص إذا لم يكن موجودًا وقراءة حجمه الحالي"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT,
+                size INTEGER,
+                last_access REAL
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)')
+            conn.commit()
+            self._disk_bytes = conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        finally:
+            conn.close()
+
+    def _make_key(self, prompt: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        """حساب مفتاح الاستعلام، أو None إذا كان يجب تجاوز الذاكرة المؤقتة"""
+        temperature = kwargs.get("temperature", self.default_temperature)
+        if temperature and temperature > 0 and not self.cache_nonzero_temperature:
+            return None
+
+        return self.request_key(prompt, kwargs)
+
+    def _get(self, key: str) -> Optional[str]:
+        """البحث في طبقة الذاكرة ثم طبقة القرص، مع نقل نتيجة القرص إلى الذاكرة"""
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return response
+
+        response = self._get_from_disk(key) if self.db_path else None
+        with self._lock:
+            if response is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+        self._put_in_memory(key, response)
+        return response
+
+    def _get_from_disk(self, key: str) -> Optional[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('SELECT response FROM llm_cache WHERE cache_key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE llm_cache SET last_access = ? WHERE cache_key = ?', (time.time(), key))
+            conn.commit()
+            return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM disk cache lookup failed: {str(e)}")
+            return None
+        finally:
+            conn.close()
+
+    def _put_in_memory(self, key: str, response: str) -> None:
+        with self._lock:
+            self._memory[key] = response
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _put(self, key: str, response: str) -> None:
+        """تخزين استجابة في الطبقتين"""
+        self._put_in_memory(key, response)
+        if self.db_path:
+            self._put_on_disk(key, response)
+
+    def _put_on_disk(self, key: str, response: str) -> None:
+        """تخزين استجابة على القرص وحذف الأقدم استخدامًا عند تجاوز الحجم الأقصى"""
+        size = len(response.encode("utf-8"))
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with self._lock:
+                previous = conn.execute('SELECT size FROM llm_cache WHERE cache_key = ?', (key,)).fetchone()
+                conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)',
+                    (key, response, size, time.time())
+                )
+                self._disk_bytes += size - (previous[0] if previous else 0)
+
+                while self._disk_bytes > self.max_disk_bytes:
+                    oldest = conn.execute(
+                        'SELECT cache_key, size FROM llm_cache ORDER BY last_access LIMIT 64'
+                    ).fetchall()
+                    if not oldest:
+                        break
+                    for old_key, old_size in oldest:
+                        if self._disk_bytes <= self.max_disk_bytes:
+                            break
+                        conn.execute('DELETE FROM llm_cache WHERE cache_key = ?', (old_key,))
+                        self._disk_bytes -= old_size
+                        self._stats["disk_evictions"] += 1
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM disk cache store failed: {str(e)}")
+        finally:
+            conn.close()
+
+    def _lookup(self, prompt: str, kwargs: Dict[str, Any]):
+        """إرجاع (المفتاح، الاستجابة المخزنة أو None)، مع تسجيل الاستخدام الصفري عند الإصابة"""
+        key = self._make_key(prompt, kwargs)
+        if key is None:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return None, None
+
+        response = self._get(key)
+        if response is not None:
+            # لم يُرسل أي استدعاء إلى المزود، فلا تُخصم توكنات من الميزانيات
+            self._record_usage(0, 0, "cache")
+        return key, response
+
+    def query(self, prompt: str, **kwargs) -> str:
+        key, response = self._lookup(prompt, kwargs)
+        if response is not None:
+            return response
+
+        response = self.inner.query(prompt, **kwargs)
+        if key is not None:
+            self._put(key, response)
+        return response
+
+    async def aquery(self, prompt: str, **kwargs) -> str:
+        key, response = self._lookup(prompt, kwargs)
+        if response is not None:
+            return response
+
+        response = await self.inner.aquery(prompt, **kwargs)
+        if key is not None:
+            self._put(key, response)
+        return response
+
+    def query_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """بث الاستجابة المخزنة كجزء واحد، أو بث استجابة المزود وتخزينها عند اكتمالها"""
+        key, response = self._lookup(prompt, kwargs)
+        if response is not None:
+            yield response
+            return
+
+        parts = []
+        for chunk in self.inner.query_stream(prompt, **kwargs):
+            parts.append(chunk)
+            yield chunk
+        if key is not None:
+            self._put(key, "".join(parts))
+
+    async def aquery_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        key, response = self._lookup(prompt, kwargs)
+        if response is not None:
+            yield response
+            return
+
+        parts = []
+        async for chunk in self.inner.aquery_stream(prompt, **kwargs):
+            parts.append(chunk)
+            yield chunk
+        if key is not None:
+            self._put(key, "".join(parts))
+
+    def clear(self) -> None:
+        """إفراغ الطبقتين"""
+        with self._lock:
+            self._memory.clear()
+            if self.db_path:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    conn.execute('DELETE FROM llm_cache')
+                    conn.commit()
+                finally:
+                    conn.close()
+                self._disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """إحصائيات الإصابة والإخفاق وحجم الطبقتين"""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return dict(
+                self._stats,
+                hits=hits,
+                hit_rate=round(hits / lookups, 3) if lookups else 0.0,
+                memory_entries=len(self._memory),
+                disk_bytes=self._disk_bytes
+            )
\ No newline at end of file
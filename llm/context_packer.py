@@ -0,0 +1,133 @@
+"""
+تعبئة السياق ونتائج المهام ضمن ميزانية توكنات لكل استدعاء
+"""
+import json
+from typing import List, Dict, Any, Optional, Tuple
+
+from .tokens import estimate_tokens, truncate_to_tokens
+
+# علامة تُلحق بالأقسام المقصوصة
+TRUNCATION_MARKER = " …[مقتطع]"
+
+def compact_json(value: Any) -> str:
+    """تسلسل JSON مضغوط بلا مسافات أو إزاحة"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+class Section:
+    """قسم نصي قابل للتعبئة بأولوية (الأعلى يُعبأ أولاً)"""
+
+    def __init__(self, name: str, text: str, priority: int = 0):
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.tokens = estimate_tokens(text)
+
+class PackedContext:
+    """ناتج التعبئة: الأقسام المضمنة بترتيبها الأصلي وتقرير بما قُص أو أُسقط"""
+
+    def __init__(self, sections: List[Tuple[str, str]], truncated: List[str], dropped: List[str], tokens: int, budget: int):
+        self.sections = sections
+        self.truncated = truncated
+        self.dropped = dropped
+        self.tokens = tokens
+        self.budget = budget
+
+    @property
+    def complete(self) -> bool:
+        """هل ضُمنت جميع الأقسام كاملة"""
+        return not self.truncated and not self.dropped
+
+    def join(self, separator: str = "\n") -> str:
+        return separator.join(text for _, text in self.sections)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "truncated": self.truncated,
+            "dropped": self.dropped
+        }
+
+class ContextPacker:
+    """يضمّن الأقسام حسب الأولوية ضمن ميزانية توكنات
+
+    الأقسام ذات الأولوية الأعلى تُعبأ أولاً. داخل الأولوية الواحدة توزع
+    الميزانية المتبقية بالتساوي: الأقسام الأصغر من حصتها تُضمن كاملة ويُقسم
+    الفائض على الأكبر، فلا يستهلك قسم ضخم واحد الميزانية كلها. القسم الذي
+    لا تتسع له حصة دنيا يُسقط، ويُذكر في التقرير.
+    """
+
+    def __init__(self, min_section_tokens: int = 32, marker: str = TRUNCATION_MARKER):
+        self.min_section_tokens = min_section_tokens
+        self.marker = marker
+
+    def pack(self, sections: List[Section], budget: int) -> PackedContext:
+        """تعبئة الأقسام ضمن الميزانية مع الحفاظ على ترتيبها الأصلي في الناتج"""
+        remaining = max(0, budget)
+        allotted: Dict[int, int] = {}
+
+        for priority in sorted({section.priority for section in sections}, reverse=True):
+            tier = [index for index, section in enumerate(sections) if section.priority == priority]
+            # إسقاط آخر الأقسام إذا لم تتسع الميزانية لحصة دنيا لكل قسم
+            while tier and remaining // len(tier) < self.min_section_tokens:
+                if sum(sections[index].tokens for index in tier) <= remaining:
+                    break
+                tier.pop()
+            # توزيع متساوٍ يبدأ بالأقسام الأصغر فيعود فائضها إلى الأكبر
+            for position, index in enumerate(sorted(tier, key=lambda i: sections[i].tokens)):
+                share = remaining // (len(tier) - position)
+                allotted[index] = min(sections[index].tokens, share)
+                remaining -= allotted[index]
+
+        packed, truncated, dropped, used = [], [], [], 0
+        for index, section in enumerate(sections):
+            if index not in allotted or (allotted[index] == 0 and section.tokens):
+                dropped.append(section.name)
+                continue
+            text = section.text
+            if allotted[index] < section.tokens:
+                text = truncate_to_tokens(text, allotted[index], self.marker)
+                truncated.append(section.name)
+            packed.append((section.name, text))
+            used += estimate_tokens(text)
+
+        return PackedContext(packed, truncated, dropped, used, budget)
+
+    def pack_context(
+        self,
+        context: Dict[str, Any],
+        budget: int,
+        priorities: Optional[Dict[str, int]] = None
+    ) -> Tuple[str, PackedContext]:
+        """تسلسل قاموس سياق بصيغة JSON مضغوطة ضمن الميزانية
+
+        كل مفتاح أعلى قسم مستقل. القيم المقصوصة تصبح نصوصًا، والمفاتيح
+        المسقطة تُحذف من الناتج.
+        """
+        priorities = priorities or {}
+        sections = [
+            Section(key, value if isinstance(value, str) else compact_json(value), priorities.get(key, 0))
+            for key, value in context.items()
+        ]
+        # ما يضيفه كل مفتاح إلى الكائن: الاسم وعلامات الاقتباس والنقطتان والفاصلة
+        overhead = sum(estimate_tokens(compact_json(key)) + 1 for key in context) + 1
+
+        # تهريب القيم المقصوصة كنصوص JSON قد يزيد حجمها، فتُعاد التعبئة مرة بالفائض
+        target = budget - overhead
+        for _ in range(2):
+            result = self.pack(sections, target)
+            included = dict(result.sections)
+            packed = {
+                key: included[key] if key in result.truncated or isinstance(value, str) else value
+                for key, value in context.items()
+                if key in included
+            }
+            text = compact_json(packed)
+            excess = estimate_tokens(text) - budget
+            if excess <= 0:
+                break
+            target -= excess
+
+        result.tokens = estimate_tokens(text)
+        result.budget = budget
+        return text, result
\ No newline at end of file
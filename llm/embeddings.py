@@ -0,0 +1,113 @@
+"""
+تمثيلات شعاعية دفعية بمصفوفات NumPy مع ذاكرة مؤقتة معنونة بالمحتوى
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from .wrapper import LLMServiceWrapper
+
+# أبعاد التمثيل الافتراضية (مشابهة لـ OpenAI embeddings)
+EMBEDDING_DIM = 1536
+
+def _text_seed(text: str) -> int:
+    """بذرة ثابتة للنص من تجزئته"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+def hash_embeddings(texts: Sequence[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """توليد تمثيلات وهمية ثابتة لكل نص كمصفوفة float32 متصلة بأبعاد (عدد النصوص، dim)
+
+    لكل نص مولد خاص ببذرة من تجزئته، فلا يُمس مولد random العام للعملية
+    وتبقى الدالة آمنة بين الخيوط.
+    """
+    matrix = np.empty((len(texts), dim), dtype=np.float32)
+    for row, text in zip(matrix, texts):
+        np.random.default_rng(_text_seed(text)).random(dtype=np.float32, out=row)
+    matrix *= 2
+    matrix -= 1
+    return matrix
+
+class EmbeddingCache:
+    """ذاكرة LRU للتمثيلات الشعاعية مفتاحها تجزئة المزود والنموذج والنص"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """إرجاع التمثيلات الموجودة من بين المفاتيح المطلوبة"""
+        found = {}
+        hits = 0
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                    hits += 1
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(keys) - hits
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                vector = np.array(vector, dtype=np.float32)
+                # النسخ المخزنة للقراءة فقط حتى لا يعدلها المستدعون
+                vector.flags.writeable = False
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+class CachedEmbeddingService(LLMServiceWrapper):
+    """غلاف يضع ذاكرة التمثيلات الشعاعية أمام get_embeddings لأي خدمة
+
+    تُطلب النصوص غير الموجودة في الذاكرة دفعة واحدة من المزود، وتُكرر
+    النصوص المتطابقة في الدفعة مرة واحدة فقط.
+    """
+
+    def __init__(self, inner: 'LLMService', cache: Optional[EmbeddingCache] = None):
+        super().__init__(inner)
+        self.cache = cache or EmbeddingCache()
+
+    def _namespace(self) -> str:
+        return f"{self.provider_name}:{getattr(self.inner, 'embedding_model', None)}"
+
+    def get_embeddings(self, texts: Sequence[str]) -> np.ndarray:
+        namespace = self._namespace()
+        keys = [self.cache.make_key(namespace, text) for text in texts]
+        found = self.cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.inner.get_embeddings(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(computed)
+            found.update(computed)
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embeddings([text])[0].tolist()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+عميل HTTP مشترك لمزودي النماذج: اتصالات مجمعة دائمة مع إعادة المحاولة والتراجع
+"""
+import time
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("autogpt")
+
+# رموز الحالة التي تستحق إعادة المحاولة (تجاوز المعدل وأخطاء الخادم المؤقتة)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+
+# حدود الاستدعاء الجاري في هذا السياق: موعد انتهائه (time.monotonic) وحدث يُضبط عند إلغائه
+_call_bounds = contextvars.ContextVar("http_call_bounds", default=None)
+
+class CallAbortedError(Exception):
+    """استثناء عند إلغاء الاستدعاء أو انتهاء مهلته قبل اكتمال طلبه"""
+    pass
+
+@contextmanager
+def call_bounds(deadline: Optional[float] = None, cancelled: Optional[threading.Event] = None) -> Iterator[None]:
+    """تقييد طلبات HTTP داخل الكتلة بموعد انتهاء وحدث إلغاء
+
+    تقصر مهلة كل طلب وانتظار إعادة المحاولة على الوقت المتبقي، ويتوقف العميل
+    فور ضبط الحدث، فلا يبقى خيط الاستدعاء معلقًا بعد تخلي المستدعي عنه.
+    """
+    reset = _call_bounds.set((deadline, cancelled))
+    try:
+        yield
+    finally:
+        _call_bounds.reset(reset)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """تحويل ترويسة Retry-After (ثوانٍ أو تاريخ HTTP) إلى مدة انتظار بالثواني"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class PooledHTTPClient:
+    """جلسة requests بمجمع اتصالات محدود الحجم تُشارك بين استدعاءات المزود
+
+    تبقى الاتصالات مفتوحة بين الاستدعاءات فلا يتكرر مصافحة TCP وTLS. عند
+    الاستجابة 429 أو 5xx أو فشل الاتصال يُعاد الطلب بتراجع أسي عشوائي
+    (full jitter)، وتُحترم ترويسة Retry-After إن أرسلها الخادم.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: Optional[float] = 60.0
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        # إعادة المحاولة تُدار هنا لا في المحول، لاحترام Retry-After وتسجيل المحاولات
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        """مدة التراجع الأسي العشوائي للمحاولة المعطاة (تبدأ من 0)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _bounded(self, timeout: Optional[float]) -> Optional[float]:
+        """قصر المدة على حدود الاستدعاء الجاري، وإطلاق CallAbortedError إذا أُلغي أو انتهت مهلته"""
+        bounds = _call_bounds.get()
+        if bounds is None:
+            return timeout
+        deadline, cancelled = bounds
+        if cancelled is not None and cancelled.is_set():
+            raise CallAbortedError("Call cancelled")
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CallAbortedError("Call deadline exceeded")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _pause(self, delay: float) -> None:
+        """الانتظار قبل إعادة المحاولة دون تجاوز موعد انتهاء الاستدعاء، مع الاستيقاظ فور إلغائه"""
+        deadline, cancelled = _call_bounds.get() or (None, None)
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        if cancelled is not None:
+            cancelled.wait(delay)
+        else:
+            time.sleep(delay)
+
+    def post(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        timeout: Optional[float] = None
+    ) -> requests.Response:
+        """إرسال طلب POST مع إعادة المحاولة، وإطلاق HTTPError عند الفشل النهائي"""
+        timeout = timeout if timeout is not None else self.timeout
+        attempt = 0
+        while True:
+            try:
+                request_timeout = self._bounded(timeout)
+            except CallAbortedError:
+                with self._lock:
+                    self._stats["failures"] += 1
+                raise
+            with self._lock:
+                self._stats["requests"] += 1
+            try:
+                response = self.session.post(url, headers=headers, json=json, stream=stream, timeout=request_timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"HTTP request to {url} failed ({str(e)}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    if not response.ok:
+                        with self._lock:
+                            self._stats["failures"] += 1
+                        response.raise_for_status()
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = min(retry_after, self.backoff_max) if retry_after is not None else self._backoff(attempt)
+                logger.warning(f"HTTP {response.status_code} from {url}, retrying in {delay:.2f}s")
+                # إعادة الاتصال إلى المجمع قبل الانتظار
+                response.close()
+
+            with self._lock:
+                self._stats["retries"] += 1
+            attempt += 1
+            self._pause(delay)
+
+    def close(self) -> None:
+        """إغلاق جميع الاتصالات المفتوحة في المجمع"""
+        self.session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """إحصائيات الطلبات وإعادة المحاولة"""
+        with self._lock:
+            return dict(self._stats, pool_size=self.pool_size)
+
+_default_client: Optional[PooledHTTPClient] = None
+_default_lock = threading.Lock()
+
+def get_default_client() -> PooledHTTPClient:
+    """العميل المشترك على مستوى العملية للخدمات التي لا يُمرر لها عميل"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = PooledHTTPClient()
+        return _default_client
\ No newline at end of file
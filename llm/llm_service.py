@@ -1,8 +1,100 @@
-# مثال مبسط لفئة LLMService
-class LLMService:
-    def __init__(self, api_key=None):
-        self.api_key = api_key
-        
-    def query(self, prompt, **kwargs):
-        """إرسال استعلام إلى النموذج اللغوي"""
-        raise NotImplementedError("يجب تنفيذ هذه الدالة في الفئة الفرعية")
\ No newline at end of file
+# مثال مبسط لفئة LLMService
+import re
+import asyncio
+import contextvars
+import numpy as np
+
+# استخدام آخر استدعاء في السياق الحالي (خيط أو مهمة asyncio)
+_last_usage = contextvars.ContextVar("llm_last_usage", default=None)
+
+def split_into_chunks(text, words_per_chunk=3):
+    """تقسيم نص إلى أجزاء من بضع كلمات مع الحفاظ على المسافات، لمحاكاة البث"""
+    words = re.findall(r"\s*\S+\s*", text)
+    return ["".join(words[i:i + words_per_chunk]) for i in range(0, len(words), words_per_chunk)] or [text]
+
+class LLMService:
+    # نموذج أرخص يُستخدم عند اقتراب نفاد ميزانية التوكنات (None = غير متاح)
+    economy_model = None
+    # درجة الحرارة المستخدمة عند عدم تحديدها في الاستعلام
+    default_temperature = 0.7
+    # هل تعيد الخدمة استجابات محاكاة دون استدعاء مزود فعلي
+    simulate = False
+    
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        
+    @property
+    def provider_name(self):
+        """اسم المزود المستخدم في المفاتيح والإحصائيات"""
+        return type(self).__name__
+        
+    def query(self, prompt, **kwargs):
+        """إرسال استعلام إلى النموذج اللغوي"""
+        raise NotImplementedError("يجب تنفيذ هذه الدالة في الفئة الفرعية")
+        
+    async def aquery(self, prompt, **kwargs):
+        """إرسال استعلام غير متزامن إلى النموذج اللغوي
+        
+        التنفيذ الافتراضي يشغّل query في خيط منفصل؛ يجب على الخدمات التي تدعم
+        الإدخال والإخراج غير المتزامن إعادة تعريف هذه الدالة.
+        """
+        def run():
+            # نقل الاستخدام المسجل داخل الخيط إلى سياق المستدعي
+            return self.query(prompt, **kwargs), self.pop_last_usage()
+            
+        response, usage = await asyncio.to_thread(run)
+        if usage is not None:
+            _last_usage.set(usage)
+        return response
+        
+    def query_stream(self, prompt, **kwargs):
+        """إرسال استعلام وإرجاع الاستجابة كأجزاء متتالية فور توليدها
+        
+        التنفيذ الافتراضي يعيد الاستجابة الكاملة كجزء واحد؛ يجب على الخدمات التي
+        يدعم مزودها البث إعادة تعريف هذه الدالة.
+        """
+        yield self.query(prompt, **kwargs)
+        
+    async def aquery_stream(self, prompt, **kwargs):
+        """نسخة غير متزامنة من query_stream"""
+        yield await self.aquery(prompt, **kwargs)
+        
+    async def _aiter_in_thread(self, chunks):
+        """قراءة مولد بث متزامن جزءًا بجزء في خيط منفصل دون حجب حلقة الأحداث
+        
+        الاستخدام يُسجل في سياق الخيط عند انتهاء البث، فيُنقل إلى سياق المستدعي.
+        """
+        def step():
+            chunk = next(chunks, None)
+            return chunk, self.pop_last_usage() if chunk is None else None
+            
+        while True:
+            chunk, usage = await asyncio.to_thread(step)
+            if chunk is None:
+                if usage is not None:
+                    _last_usage.set(usage)
+                return
+            yield chunk
+        
+    def get_embeddings(self, texts):
+        """الحصول على تمثيلات شعاعية لعدة نصوص كمصفوفة float32 متصلة (صف لكل نص)
+        
+        التنفيذ الافتراضي يستدعي get_embedding لكل نص؛ يجب على الخدمات التي
+        يدعم مزودها الطلبات الدفعية إعادة تعريف هذه الدالة.
+        """
+        return np.ascontiguousarray([self.get_embedding(text) for text in texts], dtype=np.float32)
+        
+    def _record_usage(self, prompt_tokens, completion_tokens, model=None):
+        """تسجيل أرقام الاستخدام الفعلية التي أعادها المزود لآخر استدعاء"""
+        _last_usage.set({
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "model": model
+        })
+        
+    def pop_last_usage(self):
+        """إرجاع استخدام آخر استدعاء في السياق الحالي ومسحه، أو None إذا لم يسجله المزود"""
+        usage = _last_usage.get()
+        _last_usage.set(None)
+        return usage
\ No newline at end of file
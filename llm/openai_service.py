@@ -1,18 +1,103 @@
-# مثال مبسط لخدمة OpenAI
-import openai
-from .llm_service import LLMService
-
-class OpenAIService(LLMService):
-    def __init__(self, api_key):
-        super().__init__(api_key)
-        openai.api_key = api_key
-        
-    def query(self, prompt, **kwargs):
-        """إرسال استعلام إلى OpenAI"""
-        model = kwargs.get("model", "gpt-4")
-        response = openai.ChatCompletion.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=kwargs.get("temperature", 0.7)
-        )
-        return response.choices[0].message.content
\ No newline at end of file
+# مثال مبسط لخدمة OpenAI
+import json
+import numpy as np
+from .llm_service import LLMService
+from .http import get_default_client
+
+class OpenAIService(LLMService):
+    default_model = "gpt-4"
+    economy_model = "gpt-3.5-turbo"
+    embedding_model = "text-embedding-ada-002"
+    # أقصى عدد نصوص في طلب تمثيلات واحد
+    embedding_batch_size = 2048
+    
+    def __init__(self, api_key, base_url=None, http_client=None):
+        super().__init__(api_key)
+        self.base_url = (base_url or "https://api.openai.com/v1").rstrip("/")
+        # الطلبات تمر بعميل HTTP الخاص بهذه الخدمة (اتصالات مجمعة مع إعادة المحاولة
+        # واحترام Retry-After) دون تعديل أي حالة عامة في مكتبة openai
+        self.http = http_client or get_default_client()
+        
+    def _headers(self):
+        if not self.api_key:
+            raise ValueError("مفتاح API لـ OpenAI مطلوب. قم بتحديده عند إنشاء الخدمة أو ضبطه في متغيرات البيئة.")
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+    def _chat_request(self, prompt, kwargs):
+        """تجهيز النموذج وجسم طلب Chat Completions"""
+        model = kwargs.get("model", self.default_model)
+        data = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": kwargs.get("temperature", self.default_temperature)
+        }
+        if kwargs.get("max_tokens"):
+            data["max_tokens"] = kwargs["max_tokens"]
+        return model, data
+        
+    def query(self, prompt, **kwargs):
+        """إرسال استعلام إلى OpenAI"""
+        model, data = self._chat_request(prompt, kwargs)
+        response = self.http.post(f"{self.base_url}/chat/completions", headers=self._headers(), json=data)
+        body = response.json()
+        self._record_response_usage(body.get("usage"), body.get("model", model))
+        return body["choices"][0]["message"]["content"]
+        
+    def query_stream(self, prompt, **kwargs):
+        """إرسال استعلام إلى OpenAI وإرجاع أجزاء الاستجابة فور وصولها (أحداث SSE)"""
+        model, data = self._chat_request(prompt, kwargs)
+        data.update(stream=True, stream_options={"include_usage": True})
+        response = self.http.post(
+            f"{self.base_url}/chat/completions", headers=self._headers(), json=data, stream=True
+        )
+        with response:
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8")
+                if not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload == "[DONE]":
+                    break
+                chunk = json.loads(payload)
+                # الجزء الأخير يحمل أرقام الاستخدام دون أي خيارات
+                if chunk.get("usage"):
+                    self._record_response_usage(chunk["usage"], chunk.get("model", model))
+                for choice in chunk.get("choices", []):
+                    content = choice.get("delta", {}).get("content")
+                    if content:
+                        yield content
+        
+    async def aquery_stream(self, prompt, **kwargs):
+        """نسخة غير متزامنة من query_stream تقرأ البث جزءًا بجزء في خيط منفصل"""
+        async for chunk in self._aiter_in_thread(self.query_stream(prompt, **kwargs)):
+            yield chunk
+        
+    def _record_response_usage(self, usage, model):
+        """تسجيل أرقام الاستخدام المرفقة باستجابة OpenAI إن وجدت"""
+        if usage:
+            self._record_usage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), model)
+        
+    def get_embedding(self, text):
+        """الحصول على تمثيل شعاعي لنص واحد"""
+        return self.get_embeddings([text])[0].tolist()
+        
+    def get_embeddings(self, texts):
+        """الحصول على تمثيلات شعاعية لعدة نصوص بطلبات دفعية"""
+        texts = list(texts)
+        matrix = None
+        for start in range(0, len(texts), self.embedding_batch_size):
+            batch = texts[start:start + self.embedding_batch_size]
+            response = self.http.post(
+                f"{self.base_url}/embeddings",
+                headers=self._headers(),
+                json={"model": self.embedding_model, "input": batch}
+            )
+            for item in response.json()["data"]:
+                vector = item["embedding"]
+                if matrix is None:
+                    matrix = np.empty((len(texts), len(vector)), dtype=np.float32)
+                matrix[start + item["index"]] = vector
+        return matrix if matrix is not None else np.empty((0, 0), dtype=np.float32)
\ No newline at end of file
@@ -0,0 +1,337 @@
+"""
+محدد معدل لاستدعاءات النماذج اللغوية حسب المزود والنموذج (طلبات وتوكنات في الدقيقة)
+"""
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, Iterator, AsyncIterator, Deque
+
+from .llm_service import _last_usage
+from .tokens import estimate_tokens, estimate_prompt_tokens
+from .wrapper import LLMServiceWrapper
+
+logger = logging.getLogger("autogpt")
+
+class TokenBucket:
+    """دلو توكنات بحجز مسبق: يحجز كل مستدع حصته فورًا ويُعطى مدة انتظاره
+
+    يُسمح للرصيد بأن يصبح سالبًا، فينتظر كل مستدع حتى يُسدد الدين الذي
+    سبقه. لذا تُخدم الطلبات بترتيب حجزها ويبقى المعدل ثابتًا عند الحد بدل
+    التذبذب بين الاندفاع والتوقف. السعة الافتراضية حصة بضع ثوانٍ حتى لا
+    يتجاوز الاستهلاك الحصة في أول دقيقة بعد الخمول، والطلب الأكبر من السعة
+    يُقبل فورًا إذا كان الدلو ممتلئًا ويسدد من بعده دينه.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 5.0):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """حجز كمية وإرجاع مدة الانتظار بالثواني قبل استخدامها"""
+        self._refill(now)
+        full = self.tokens >= self.capacity
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 or full else -self.tokens / self.rate
+
+    def adjust(self, delta: float, now: float) -> None:
+        """تصحيح الحجز بعد معرفة الاستهلاك الفعلي (موجب = استهلاك إضافي)"""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+class _SlotWaiter:
+    """تذكرة منتظر في طابور أماكن الاستدعاء: حدث لخيط أو Future لحلقة أحداث"""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+class ConcurrencySlots:
+    """عدد محدود من أماكن الاستدعاء المتزامن تُمنح بترتيب الطلب (FIFO)
+
+    يُسلم release المكان مباشرة إلى أقدم منتظر، خيطًا كان أو مهمة asyncio،
+    فلا يسبق مستدع جديد من ينتظر قبله. المهمة الملغاة أثناء الانتظار تُزال
+    من الطابور، أو تمرر المكان إلى التالي إن كان قد مُنح لها.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        self.limit = limit
+        self._available = limit
+        self._waiters: Deque[_SlotWaiter] = deque()
+        self._lock = threading.Lock()
+
+    def _enqueue(self, loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_SlotWaiter]:
+        """حجز مكان فورًا إن أمكن، وإلا إضافة تذكرة إلى آخر الطابور"""
+        with self._lock:
+            if self._available > 0 and not self._waiters:
+                self._available -= 1
+                return None
+            waiter = _SlotWaiter(loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def acquire(self) -> None:
+        waiter = self._enqueue(None)
+        if waiter is not None:
+            waiter.event.wait()
+
+    async def aacquire(self) -> None:
+        waiter = self._enqueue(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                if self._available >= self.limit:
+                    raise ValueError("ConcurrencySlots released too many times")
+                self._available += 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.wake()
+
+class RateLimiter:
+    """حدود الطلبات والتوكنات في الدقيقة لكل (مزود، نموذج)
+
+    تُطبق نسبة هامش (headroom) على الحدود حتى يستقر الإنتاج تحت الحصة
+    مباشرة. المستدعون لا يفشلون عند بلوغ الحد بل ينتظرون دورهم، ويُسجل زمن
+    الانتظار في الإحصائيات. يمكن أيضًا تحديد عدد الاستدعاءات المتزامنة.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        headroom: float = 0.95,
+        burst_seconds: float = 5.0,
+        max_concurrent: Optional[int] = None
+    ):
+        if not 0 < headroom <= 1:
+            raise ValueError("headroom must be in (0, 1]")
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.headroom = headroom
+        self.burst_seconds = burst_seconds
+        self.max_concurrent = max_concurrent
+        self._overrides: Dict[Tuple[str, Optional[str]], Tuple[Optional[float], Optional[float]]] = {}
+        self._buckets: Dict[Tuple[str, Optional[str]], Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._slots: Dict[Tuple[str, Optional[str]], ConcurrencySlots] = {}
+        self._stats: Dict[Tuple[str, Optional[str]], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def set_limits(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None
+    ) -> None:
+        """تحديد حدود خاصة لمزود أو نموذج بعينه بدل الحدود الافتراضية"""
+        with self._lock:
+            self._overrides[(provider, model)] = (requests_per_minute, tokens_per_minute)
+            self._buckets.pop((provider, model), None)
+
+    def _get_buckets(self, key: Tuple[str, Optional[str]]) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            rpm, tpm = self._overrides.get(
+                key,
+                self._overrides.get((key[0], None), (self.requests_per_minute, self.tokens_per_minute))
+            )
+            buckets = (
+                TokenBucket(rpm * self.headroom, self.burst_seconds) if rpm else None,
+                TokenBucket(tpm * self.headroom, self.burst_seconds) if tpm else None
+            )
+            self._buckets[key] = buckets
+            self._stats[key] = {"requests": 0, "waited": 0, "total_wait": 0.0, "max_wait": 0.0, "tokens": 0}
+        return buckets
+
+    def reserve(self, provider: str, model: Optional[str], tokens: int) -> float:
+        """حجز طلب وعدد توكنات تقديري، وإرجاع مدة الانتظار اللازمة"""
+        key = (provider, model)
+        with self._lock:
+            request_bucket, token_bucket = self._get_buckets(key)
+            now = time.monotonic()
+            wait = 0.0
+            if request_bucket:
+                wait = max(wait, request_bucket.reserve(1, now))
+            if token_bucket:
+                wait = max(wait, token_bucket.reserve(tokens, now))
+
+            stats = self._stats[key]
+            stats["requests"] += 1
+            stats["tokens"] += tokens
+            if wait > 0:
+                stats["waited"] += 1
+                stats["total_wait"] += wait
+                stats["max_wait"] = max(stats["max_wait"], wait)
+        if wait > 1.0:
+            logger.info(f"Rate limit reached for {provider}/{model}, waiting {wait:.2f}s")
+        return wait
+
+    def settle(self, provider: str, model: Optional[str], reserved: int, actual: int) -> None:
+        """تصحيح حجز التوكنات بالاستهلاك الفعلي بعد انتهاء الاستدعاء"""
+        key = (provider, model)
+        with self._lock:
+            _, token_bucket = self._get_buckets(key)
+            self._stats[key]["tokens"] += actual - reserved
+            if token_bucket:
+                token_bucket.adjust(actual - reserved, time.monotonic())
+
+    def _get_slot(self, key: Tuple[str, Optional[str]]) -> Optional[ConcurrencySlots]:
+        if not self.max_concurrent:
+            return None
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = ConcurrencySlots(self.max_concurrent)
+            return slot
+
+    def acquire(self, provider: str, model: Optional[str], tokens: int) -> Optional[ConcurrencySlots]:
+        """انتظار الدور وحجز مكان استدعاء متزامن؛ يجب تمرير الناتج إلى release"""
+        wait = self.reserve(provider, model, tokens)
+        if wait > 0:
+            time.sleep(wait)
+        slot = self._get_slot((provider, model))
+        if slot:
+            slot.acquire()
+        return slot
+
+    async def aacquire(self, provider: str, model: Optional[str], tokens: int) -> Optional[ConcurrencySlots]:
+        """نسخة غير متزامنة من acquire لا تحجب حلقة الأحداث ولا تشغل خيطًا أثناء الانتظار
+
+        إذا أُلغيت المهمة أثناء الانتظار لا يبقى أي مكان محجوزًا ويُعاد حجز التوكنات.
+        """
+        wait = self.reserve(provider, model, tokens)
+        slot = self._get_slot((provider, model))
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if slot:
+                await slot.aacquire()
+        except asyncio.CancelledError:
+            self.settle(provider, model, tokens, 0)
+            raise
+        return slot
+
+    @staticmethod
+    def release(slot: Optional[ConcurrencySlots]) -> None:
+        if slot:
+            slot.release()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """إحصائيات الطلبات وزمن الانتظار لكل مزود ونموذج"""
+        with self._lock:
+            return {
+                f"{provider}/{model}": dict(
+                    stats,
+                    total_wait=round(stats["total_wait"], 3),
+                    max_wait=round(stats["max_wait"], 3),
+                    avg_wait=round(stats["total_wait"] / stats["requests"], 3) if stats["requests"] else 0.0
+                )
+                for (provider, model), stats in self._stats.items()
+            }
+
+class RateLimitedLLMService(LLMServiceWrapper):
+    """غلاف يمرر استدعاءات أي خدمة نموذج لغوي عبر محدد المعدل
+
+    تُحجز توكنات الإدخال التقديرية قبل الاستدعاء، ثم يُصحح الحجز بالاستخدام
+    الفعلي الذي سجله المزود (أو بتقدير الاستجابة إن لم يسجله).
+    """
+
+    def __init__(self, inner: 'LLMService', limiter: RateLimiter):
+        super().__init__(inner)
+        self.limiter = limiter
+
+    def _reservation(self, prompt: str, kwargs: Dict[str, Any]) -> Tuple[Tuple[str, Optional[str]], int]:
+        """مفتاح الحدود وعدد توكنات الإدخال التقديري للاستدعاء"""
+        # مسح أي استخدام سابق حتى لا يُنسب إلى هذا الاستدعاء إن لم يسجل المزود استخدامه
+        _last_usage.set(None)
+        key = (self.provider_name, kwargs.get("model", self.default_model))
+        return key, estimate_prompt_tokens(prompt, kwargs.get("context"))
+
+    def _settle(self, key: Tuple[str, Optional[str]], reserved: int, response: str) -> None:
+        # قراءة الاستخدام دون مسحه، فالوكيل يستهلكه بعد عودة الاستدعاء
+        usage = _last_usage.get()
+        actual = usage["total_tokens"] if usage else reserved + estimate_tokens(response)
+        self.limiter.settle(*key, reserved, actual)
+
+    def query(self, prompt: str, **kwargs) -> str:
+        key, reserved = self._reservation(prompt, kwargs)
+        slot = self.limiter.acquire(*key, reserved)
+        try:
+            response = self.inner.query(prompt, **kwargs)
+        finally:
+            self.limiter.release(slot)
+        self._settle(key, reserved, response)
+        return response
+
+    async def aquery(self, prompt: str, **kwargs) -> str:
+        key, reserved = self._reservation(prompt, kwargs)
+        slot = await self.limiter.aacquire(*key, reserved)
+        try:
+            response = await self.inner.aquery(prompt, **kwargs)
+        finally:
+            self.limiter.release(slot)
+        self._settle(key, reserved, response)
+        return response
+
+    def query_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        key, reserved = self._reservation(prompt, kwargs)
+        slot = self.limiter.acquire(*key, reserved)
+        parts = []
+        try:
+            for chunk in self.inner.query_stream(prompt, **kwargs):
+                parts.append(chunk)
+                yield chunk
+        finally:
+            self.limiter.release(slot)
+        self._settle(key, reserved, "".join(parts))
+
+    async def aquery_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        key, reserved = self._reservation(prompt, kwargs)
+        slot = await self.limiter.aacquire(*key, reserved)
+        parts = []
+        try:
+            async for chunk in self.inner.aquery_stream(prompt, **kwargs):
+                parts.append(chunk)
+                yield chunk
+        finally:
+            self.limiter.release(slot)
+        self._settle(key, reserved, "".join(parts))
\ No newline at end of file
@@ -0,0 +1,366 @@
+"""
+موجه بين عدة مزودي نماذج حسب زمن الاستجابة والأخطاء مع طلبات تحوطية
+"""
+import time
+import asyncio
+import contextvars
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator
+
+import numpy as np
+
+from .llm_service import LLMService, _last_usage
+
+logger = logging.getLogger("autogpt")
+
+# قيمة النموذج الاقتصادي للموجه، تُستبدل بالنموذج الاقتصادي لكل خلفية عند الإرسال
+ECONOMY_MODEL = "economy"
+
+class Backend:
+    """خلفية واحدة للموجه مع نافذة متحركة لأزمنة الاستجابة ونتائج الاستدعاءات"""
+
+    def __init__(self, name: str, service: LLMService, weight: float = 1.0, window: int = 100):
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        self.name = name
+        self.service = service
+        self.weight = weight
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges_won = 0
+        self.last_failure = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self._outcomes.append(ok)
+            if ok:
+                self._latencies.append(latency)
+            else:
+                self.last_failure = time.monotonic()
+
+    def percentile(self, q: float) -> Optional[float]:
+        """المئين q لأزمنة الاستجابة الناجحة في النافذة، أو None بلا عينات"""
+        with self._lock:
+            if not self._latencies:
+                return None
+            return float(np.percentile(np.fromiter(self._latencies, dtype=np.float64), q))
+
+    @property
+    def samples(self) -> int:
+        """عدد أزمنة الاستجابة الناجحة في النافذة"""
+        with self._lock:
+            return len(self._latencies)
+
+    @property
+    def attempts(self) -> int:
+        """عدد الاستدعاءات الناجحة والفاشلة في النافذة"""
+        with self._lock:
+            return len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def prepare_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """تحويل النموذج الاقتصادي للموجه إلى النموذج الاقتصادي لهذه الخلفية"""
+        if kwargs.get("model") != ECONOMY_MODEL:
+            return kwargs
+        kwargs = dict(kwargs)
+        economy_model = getattr(self.service, "economy_model", None)
+        if economy_model:
+            kwargs["model"] = economy_model
+        else:
+            del kwargs["model"]
+        return kwargs
+
+    def get_stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "weight": self.weight,
+            "requests": self.requests,
+            "p50": round(p50, 4) if p50 is not None else None,
+            "p95": round(p95, 4) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "hedges_won": self.hedges_won
+        }
+
+class RouterLLMService(LLMService):
+    """خدمة توجه كل استدعاء إلى أسرع خلفية سليمة
+
+    ترتيب الخلفيات حسب زمن p50 المتحرك مقسومًا على الوزن، وتُجرب الخلفيات
+    التي لم تُستدع بعد أولاً. الخلفية التي فشلت دون أي استجابة ناجحة تأتي
+    بعد الخلفيات المقاسة حتى تنقضي recovery_seconds من آخر فشل فتُجرب مجددًا،
+    والخلفية التي يتجاوز معدل أخطائها max_error_rate تُستبعد ما دامت توجد
+    خلفية سليمة. عند فشل استدعاء يُعاد على الخلفية التالية.
+
+    في وضع التحوط، إذا لم تُجب الخلفية الأولى خلال زمن p95 المرصود لها
+    يُرسل الطلب نفسه إلى الخلفية التالية وتُعتمد أول استجابة ناجحة. يُحتسب
+    استخدام الطلب الفائز فقط. مهلة التحوط تبدأ من بدء الطلب الأول فعليًا،
+    ويتسع مجمع الطلبات المتزامنة لطلبين لكل استدعاء من max_concurrent_calls
+    (عادة حجم مجمع استدعاءات المنسق). التمثيلات الشعاعية تُطلب دائمًا من الخلفية
+    الأولى لأن فضاءات التمثيل تختلف بين المزودين.
+    """
+
+    economy_model = ECONOMY_MODEL
+    default_model = None
+
+    def __init__(
+        self,
+        backends: List[Tuple[str, LLMService, float]],
+        hedging: bool = False,
+        max_error_rate: float = 0.5,
+        min_samples: int = 5,
+        window: int = 100,
+        recovery_seconds: float = 30.0,
+        max_concurrent_calls: int = 16
+    ):
+        if not backends:
+            raise ValueError("RouterLLMService needs at least one backend")
+        super().__init__()
+        self.backends = [Backend(name, service, weight, window) for name, service, weight in backends]
+        self.hedging = hedging and len(self.backends) > 1
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.recovery_seconds = recovery_seconds
+        self.max_concurrent_calls = max(1, max_concurrent_calls)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._hedges = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "router:" + ",".join(backend.name for backend in self.backends)
+
+    @property
+    def default_temperature(self) -> float:
+        return getattr(self.backends[0].service, "default_temperature", LLMService.default_temperature)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # طلب أول وطلب تحوطي لكل استدعاء متزامن
+                self._executor = ThreadPoolExecutor(
+                    max_workers=2 * self.max_concurrent_calls, thread_name_prefix="autogpt-router"
+                )
+            return self._executor
+
+    def _ranked(self) -> List[Backend]:
+        """الخلفيات السليمة مرتبة من الأسرع، تليها غير السليمة كملاذ أخير"""
+        def recovered(backend: Backend) -> bool:
+            return time.monotonic() - backend.last_failure >= self.recovery_seconds
+
+        def score(backend: Backend) -> Tuple[int, float]:
+            p50 = backend.percentile(50)
+            if p50 is not None:
+                return 1, p50 / backend.weight
+            # الخلفية التي لم تُجرب، أو فشلت دون نجاح وانقضت مهلة تعافيها، تُجرب أولاً مرة واحدة؛
+            # وقبل انقضاء المهلة تأتي بعد الخلفيات ذات الأزمنة المقاسة
+            if backend.attempts == 0 or recovered(backend):
+                return 0, 0.0
+            return 2, backend.error_rate
+
+        def is_healthy(backend: Backend) -> bool:
+            if backend.attempts < self.min_samples or backend.error_rate <= self.max_error_rate:
+                return True
+            # تجربة الخلفية مجددًا بعد مهلة من آخر فشل حتى تتمكن من التعافي
+            return recovered(backend)
+
+        healthy = [b for b in self.backends if is_healthy(b)]
+        unhealthy = [b for b in self.backends if b not in healthy]
+        return sorted(healthy, key=score) + sorted(unhealthy, key=lambda b: b.error_rate)
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        """مدة انتظار الخلفية الأولى قبل التحوط، أو None إذا لم تكفِ العينات"""
+        if backend.samples < self.min_samples:
+            return None
+        return backend.percentile(95)
+
+    def _call(
+        self,
+        backend: Backend,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        running: Optional[threading.Event] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """استدعاء خلفية وقياس زمنها؛ يعيد الاستجابة مع استخدامها المسجل
+
+        يُضبط الحدث running عند بدء الاستدعاء فعليًا (بعد انتظاره في المجمع).
+        """
+        if running is not None:
+            running.set()
+        started = time.monotonic()
+        try:
+            response = backend.service.query(prompt, **backend.prepare_kwargs(kwargs))
+        except Exception:
+            backend.record(time.monotonic() - started, False)
+            raise
+        backend.record(time.monotonic() - started, True)
+        return response, backend.service.pop_last_usage()
+
+    def _finish(self, response: str, usage: Optional[Dict[str, Any]]) -> str:
+        _last_usage.set(usage)
+        return response
+
+    def query(self, prompt: str, **kwargs) -> str:
+        ranked = self._ranked()
+        last_error: Optional[Exception] = None
+        index = 0
+        while index < len(ranked):
+            primary = ranked[index]
+            hedge_delay = self._hedge_delay(primary) if self.hedging and index + 1 < len(ranked) else None
+            if hedge_delay is None:
+                try:
+                    return self._finish(*self._call(primary, prompt, kwargs))
+                except Exception as e:
+                    logger.warning(f"Router backend '{primary.name}' failed: {str(e)}")
+                    last_error = e
+                    index += 1
+                    continue
+
+            executor = self._get_executor()
+            running = threading.Event()
+            # نسخة من سياق المستدعي تنقل حدود الاستدعاء (مهلته وإلغاءه) إلى خيط المجمع
+            futures = {executor.submit(contextvars.copy_context().run, self._call, primary, prompt, kwargs, running): primary}
+            # الانتظار في طابور المجمع لا يُحتسب من مهلة التحوط
+            running.wait()
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                secondary = ranked[index + 1]
+                self._hedges += 1
+                logger.debug(f"Hedging request from '{primary.name}' to '{secondary.name}' after {hedge_delay:.3f}s")
+                futures[executor.submit(contextvars.copy_context().run, self._call, secondary, prompt, kwargs)] = secondary
+                index += 1
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        response, usage = future.result()
+                    except Exception as e:
+                        logger.warning(f"Router backend '{futures[future].name}' failed: {str(e)}")
+                        last_error = e
+                        continue
+                    for other in pending:
+                        other.cancel()
+                    if len(futures) > 1:
+                        futures[future].hedges_won += 1
+                    return self._finish(response, usage)
+            index += 1
+
+        raise Exception(f"All router backends failed: {str(last_error)}")
+
+    async def _acall(self, backend: Backend, prompt: str, kwargs: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        started = time.monotonic()
+        try:
+            response = await backend.service.aquery(prompt, **backend.prepare_kwargs(kwargs))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            backend.record(time.monotonic() - started, False)
+            raise
+        backend.record(time.monotonic() - started, True)
+        return response, backend.service.pop_last_usage()
+
+    async def aquery(self, prompt: str, **kwargs) -> str:
+        ranked = self._ranked()
+        last_error: Optional[Exception] = None
+        index = 0
+        while index < len(ranked):
+            primary = ranked[index]
+            hedge_delay = self._hedge_delay(primary) if self.hedging and index + 1 < len(ranked) else None
+            tasks = {asyncio.ensure_future(self._acall(primary, prompt, kwargs)): primary}
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done:
+                    secondary = ranked[index + 1]
+                    self._hedges += 1
+                    tasks[asyncio.ensure_future(self._acall(secondary, prompt, kwargs))] = secondary
+                    index += 1
+
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.cancelled():
+                            continue
+                        error = task.exception()
+                        if error is not None:
+                            logger.warning(f"Router backend '{tasks[task].name}' failed: {str(error)}")
+                            last_error = error
+                            continue
+                        if len(tasks) > 1:
+                            tasks[task].hedges_won += 1
+                        return self._finish(*task.result())
+            finally:
+                # الطلب الخاسر في التحوط (أو الجاري عند إلغاء المستدعي) يُلغى فورًا
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+            index += 1
+
+        raise Exception(f"All router backends failed: {str(last_error)}")
+
+    def query_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """بث من أسرع خلفية سليمة، مع الانتقال إلى التالية إذا فشلت قبل أول جزء"""
+        last_error: Optional[Exception] = None
+        for backend in self._ranked():
+            started = time.monotonic()
+            received = False
+            try:
+                for chunk in backend.service.query_stream(prompt, **backend.prepare_kwargs(kwargs)):
+                    received = True
+                    yield chunk
+            except Exception as e:
+                backend.record(time.monotonic() - started, False)
+                if received:
+                    raise
+                logger.warning(f"Router backend '{backend.name}' failed: {str(e)}")
+                last_error = e
+                continue
+            backend.record(time.monotonic() - started, True)
+            return
+        raise Exception(f"All router backends failed: {str(last_error)}")
+
+    async def aquery_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        last_error: Optional[Exception] = None
+        for backend in self._ranked():
+            started = time.monotonic()
+            received = False
+            try:
+                async for chunk in backend.service.aquery_stream(prompt, **backend.prepare_kwargs(kwargs)):
+                    received = True
+                    yield chunk
+            except Exception as e:
+                backend.record(time.monotonic() - started, False)
+                if received:
+                    raise
+                logger.warning(f"Router backend '{backend.name}' failed: {str(e)}")
+                last_error = e
+                continue
+            backend.record(time.monotonic() - started, True)
+            return
+        raise Exception(f"All router backends failed: {str(last_error)}")
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.backends[0].service.get_embedding(text)
+
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        return self.backends[0].service.get_embeddings(texts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """زمن p50/p95 ومعدل الأخطاء لكل خلفية وعدد الطلبات التحوطية"""
+        return {
+            "hedging": self.hedging,
+            "hedges": self._hedges,
+            "backends": {backend.name: backend.get_stats() for backend in self.backends}
+        }
\ No newline at end of file
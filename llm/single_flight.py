@@ -0,0 +1,138 @@
+"""
+دمج الاستعلامات المتطابقة الجارية في وقت واحد في طلب واحد إلى المزود
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Tuple, Callable
+
+from .llm_service import _last_usage
+from .wrapper import LLMServiceWrapper
+
+class _Flight:
+    """طلب جارٍ إلى المزود مع عدد المستدعين المنتظرين لنتيجته"""
+
+    def __init__(self):
+        self.waiter: Any = None
+        self.refs = 1
+        self.usage: Optional[Dict[str, Any]] = None
+        self.usage_claimed = False
+
+    def claim_usage(self) -> Optional[Dict[str, Any]]:
+        """أول مستدع يستلم النتيجة يُحتسب عليه الاستخدام، والبقية بلا استخدام"""
+        if self.usage_claimed:
+            return None
+        self.usage_claimed = True
+        return self.usage
+
+class SingleFlightLLMService(LLMServiceWrapper):
+    """غلاف يجعل المستدعين المتزامنين بالمفتاح نفسه ينتظرون طلبًا واحدًا ويتشاركون استجابته
+
+    يكمل الذاكرة المؤقتة للاستجابات: يزيل التدافع على المزود قبل وصول أول
+    استجابة. الإلغاء في المسار غير المتزامن يُعد بالمراجع، فلا يُلغى الطلب
+    المشترك إلا بعد إلغاء جميع المنتظرين له. في المسار المتزامن ينفذ أول
+    مستدع الطلب في خيطه، ويُحتسب الاستخدام مرة واحدة فقط.
+    """
+
+    def __init__(self, inner: 'LLMService'):
+        super().__init__(inner)
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[Tuple[int, str], _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"upstream": 0, "coalesced": 0, "cancelled_upstream": 0}
+
+    def _join(self, flights: Dict, key: Any, start: Callable[[_Flight], Any]) -> Tuple[_Flight, bool]:
+        """الانضمام إلى طلب جارٍ بالمفتاح نفسه أو بدء طلب جديد؛ يعيد (الطلب، هل هو جديد)
+
+        يُنشأ منتظر الطلب الجديد داخل القفل حتى يجده كل من ينضم بعده.
+        """
+        with self._lock:
+            flight = flights.get(key)
+            if flight is not None:
+                flight.refs += 1
+                self._stats["coalesced"] += 1
+                return flight, False
+            flight = flights[key] = _Flight()
+            flight.waiter = start(flight)
+            self._stats["upstream"] += 1
+            return flight, True
+
+    def _set_usage(self, flight: _Flight) -> None:
+        with self._lock:
+            usage = flight.claim_usage()
+        if usage is not None:
+            _last_usage.set(usage)
+        else:
+            # الاستجابة مشتركة، فلا تُخصم توكنات من ميزانية هذا المستدعي
+            self._record_usage(0, 0, "single_flight")
+
+    def query(self, prompt: str, **kwargs) -> str:
+        key = self.request_key(prompt, kwargs)
+        flight, leader = self._join(self._flights, key, lambda _: Future())
+        future: Future = flight.waiter
+
+        if leader:
+            try:
+                _last_usage.set(None)
+                response = self.inner.query(prompt, **kwargs)
+                flight.usage = _last_usage.get()
+                future.set_result(response)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+
+        try:
+            response = future.result()
+        finally:
+            with self._lock:
+                flight.refs -= 1
+        self._set_usage(flight)
+        return response
+
+    async def _upstream(self, prompt: str, kwargs: Dict[str, Any], flight: _Flight) -> str:
+        # تعمل في مهمة مستقلة، لذا يُنقل الاستخدام عبر الطلب لا عبر متغير السياق
+        _last_usage.set(None)
+        response = await self.inner.aquery(prompt, **kwargs)
+        flight.usage = _last_usage.get()
+        return response
+
+    async def aquery(self, prompt: str, **kwargs) -> str:
+        # مهام asyncio مرتبطة بحلقتها، لذا لا تُدمج الطلبات إلا داخل الحلقة نفسها
+        key = (id(asyncio.get_running_loop()), self.request_key(prompt, kwargs))
+
+        def start(flight: _Flight) -> asyncio.Task:
+            upstream = asyncio.ensure_future(self._upstream(prompt, kwargs, flight))
+            upstream.add_done_callback(lambda _: self._finish_async(key, flight))
+            return upstream
+
+        flight, _ = self._join(self._async_flights, key, start)
+        try:
+            response = await asyncio.shield(flight.waiter)
+        except asyncio.CancelledError:
+            with self._lock:
+                flight.refs -= 1
+                abandoned = flight.refs == 0 and not flight.waiter.done()
+                if abandoned:
+                    self._stats["cancelled_upstream"] += 1
+                    # لا ينضم أي مستدع جديد إلى طلب قيد الإلغاء
+                    if self._async_flights.get(key) is flight:
+                        del self._async_flights[key]
+            if abandoned:
+                flight.waiter.cancel()
+            raise
+        with self._lock:
+            flight.refs -= 1
+        self._set_usage(flight)
+        return response
+
+    def _finish_async(self, key: Tuple[int, str], flight: _Flight) -> None:
+        with self._lock:
+            if self._async_flights.get(key) is flight:
+                del self._async_flights[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """إحصائيات الطلبات المرسلة والمدمجة والملغاة"""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._flights) + len(self._async_flights))
\ No newline at end of file
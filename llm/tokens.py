@@ -0,0 +1,70 @@
+"""
+تقدير عدد التوكنات عندما لا يوفر مزود النموذج أرقام الاستخدام الفعلية
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# متوسط تقريبي لعدد البايتات (UTF-8) في التوكن الواحد
+BYTES_PER_TOKEN = 4
+# النصوص الأقصر من هذا تُقدّر مباشرة لأن حسابها أرخص من البحث في الذاكرة المؤقتة
+_CACHE_MIN_LENGTH = 256
+# الحد الأقصى لعدد التقديرات المحفوظة
+_CACHE_MAX_ENTRIES = 4096
+
+# المفتاح (تجزئة النص، طوله) لا النص نفسه، فلا تبقى النصوص الطويلة محجوزة في الذاكرة
+_counts: 'OrderedDict[Tuple[int, int], int]' = OrderedDict()
+_counts_lock = threading.Lock()
+_counts_stats = {"hits": 0, "misses": 0}
+
+def _count_tokens(text: str) -> int:
+    # تجزئة النص تُحسب مرة واحدة وتُحفظ في كائن النص نفسه
+    key = (hash(text), len(text))
+    with _counts_lock:
+        count = _counts.get(key)
+        if count is not None:
+            _counts.move_to_end(key)
+            _counts_stats["hits"] += 1
+            return count
+        _counts_stats["misses"] += 1
+
+    count = (len(text.encode("utf-8")) + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+    with _counts_lock:
+        _counts[key] = count
+        if len(_counts) > _CACHE_MAX_ENTRIES:
+            _counts.popitem(last=False)
+    return count
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """تقدير عدد التوكنات في نص
+
+    تقديرات النصوص الطويلة تُحفظ مؤقتًا، فالنص نفسه (السياق والنتائج ونصوص
+    التوجيه) يُقدّر عدة مرات في الاستدعاء الواحد: عند التعبئة وتحديد المعدل
+    واحتساب الميزانية.
+    """
+    if not text:
+        return 0
+    if len(text) < _CACHE_MIN_LENGTH:
+        return (len(text.encode("utf-8")) + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+    return _count_tokens(text)
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "") -> str:
+    """قص نص ليبقى تقديره ضمن عدد توكنات محدد مع إضافة علامة القص"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_bytes = max(0, max_tokens * BYTES_PER_TOKEN - len(marker.encode("utf-8")))
+    # القص على حدود البايتات قد يقطع حرفًا متعدد البايتات، فيُهمل الجزء الناقص
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", "ignore") + marker
+
+def get_estimator_stats() -> Dict[str, int]:
+    """إحصائيات الذاكرة المؤقتة لمقدر التوكنات"""
+    with _counts_lock:
+        return dict(_counts_stats, entries=len(_counts))
+
+def estimate_prompt_tokens(prompt: str, context: Optional[Dict[str, Any]] = None) -> int:
+    """تقدير توكنات الإدخال لاستعلام مع سياقه"""
+    tokens = estimate_tokens(prompt)
+    if context:
+        tokens += estimate_tokens(json.dumps(context, ensure_ascii=False, default=str))
+    return tokens
\ No newline at end of file
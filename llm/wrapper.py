@@ -0,0 +1,80 @@
+"""
+أساس للخدمات التي تغلف خدمة نموذج لغوي أخرى وتضيف سلوكًا حولها
+"""
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+from .llm_service import LLMService
+
+class LLMServiceWrapper(LLMService):
+    """خدمة تمرر جميع الاستدعاءات إلى الخدمة المغلفة
+
+    تعيد الفئات الفرعية تعريف ما تحتاجه فقط، وتبقى خصائص الخدمة الأصلية
+    (النموذج الافتراضي والنموذج الاقتصادي ودرجة الحرارة) مرئية للوكيل.
+    أرقام الاستخدام تُسجل في متغير سياق مشترك، لذا تعمل pop_last_usage
+    كما هي عبر الأغلفة.
+    """
+
+    def __init__(self, inner: LLMService):
+        super().__init__(getattr(inner, "api_key", None))
+        self.inner = inner
+
+    @property
+    def economy_model(self) -> Optional[str]:
+        return getattr(self.inner, "economy_model", None)
+
+    @property
+    def default_temperature(self) -> float:
+        return getattr(self.inner, "default_temperature", LLMService.default_temperature)
+
+    @property
+    def default_model(self) -> Optional[str]:
+        return getattr(self.inner, "default_model", None)
+
+    @property
+    def provider_name(self) -> str:
+        """اسم المزود الأصلي بعد تجاوز جميع الأغلفة"""
+        return self.inner.provider_name
+
+    def request_key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+        """تجزئة تعرّف الاستدعاء: المزود والنموذج ودرجة الحرارة والنص والسياق بصيغة JSON قانونية وبقية المعاملات"""
+        params = {name: value for name, value in kwargs.items() if name not in ("model", "temperature", "context")}
+        payload = json.dumps(
+            {
+                "provider": self.provider_name,
+                "model": kwargs.get("model", self.default_model),
+                "temperature": kwargs.get("temperature", self.default_temperature),
+                "prompt": prompt,
+                "context": kwargs.get("context"),
+                "params": params
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def query(self, prompt: str, **kwargs) -> str:
+        return self.inner.query(prompt, **kwargs)
+
+    async def aquery(self, prompt: str, **kwargs) -> str:
+        return await self.inner.aquery(prompt, **kwargs)
+
+    def query_stream(self, prompt: str, **kwargs):
+        return self.inner.query_stream(prompt, **kwargs)
+
+    def aquery_stream(self, prompt: str, **kwargs):
+        return self.inner.aquery_stream(prompt, **kwargs)
+
+    def get_embedding(self, text: str):
+        return self.inner.get_embedding(text)
+
+    def get_embeddings(self, texts):
+        return self.inner.get_embeddings(texts)
+
+    def __getattr__(self, name: str) -> Any:
+        # يُستدعى فقط للسمات غير الموجودة في الغلاف
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+إعداد مشترك للاختبارات: إضافة جذر المشروع إلى مسار الاستيراد
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+اختبارات نقاط استعادة المهام واستئناف التشغيل المنقطع
+"""
+from core.agent import Agent
+from core.autogpt import AutoGPT
+from core.task import TaskStatus
+from database.memory_db import MemoryDatabaseService
+from llm.mock_service import MockLLMService
+
+def interrupted_agent(db, agent=None):
+    """وكيل قسّم مهمته الرئيسية وأكمل مهمة فرعية ثم انقطع أثناء تنفيذ الثانية"""
+    agent = agent or Agent("worker", "write a report about bees", MockLLMService(), db_service=db)
+    main = agent.add_task("Main Goal", agent.goal, priority=10, tags=["main", "auto-generated"])
+    agent._break_down_task(main)
+    main.update_status(TaskStatus.IN_PROGRESS)
+    agent._checkpoint(main)
+
+    done, running = sorted(main.subtasks, key=lambda subtask: -subtask.priority)[:2]
+    done.complete("saved result")
+    agent._checkpoint(done)
+    running.update_status(TaskStatus.IN_PROGRESS)
+    agent._checkpoint(running)
+    return agent, main, done, running
+
+def restarted(agent, db):
+    """نسخة جديدة من الوكيل كما تُنشأ بعد إعادة تشغيل العملية"""
+    return Agent(agent.name, agent.goal, MockLLMService(), db_service=db, agent_id=agent.id)
+
+def test_restore_rebuilds_tree_and_resets_interrupted_tasks():
+    db = MemoryDatabaseService()
+    agent, main, done, running = interrupted_agent(db)
+
+    resumed = restarted(agent, db)
+    assert resumed.restore_checkpoint() == 2
+
+    [root] = resumed.tasks
+    assert root.id == main.id
+    subtasks = {subtask.id: subtask for subtask in root.subtasks}
+    assert len(subtasks) == len(main.subtasks)
+    assert subtasks[done.id].status == TaskStatus.COMPLETED
+    assert subtasks[done.id].result == "saved result"
+    assert subtasks[running.id].status == TaskStatus.PENDING
+    assert root.status == TaskStatus.PENDING
+    assert resumed.task_stats.snapshot()[TaskStatus.COMPLETED] == 1
+
+def test_resume_skips_completed_work():
+    db = MemoryDatabaseService()
+    agent, main, done, _ = interrupted_agent(db)
+
+    resumed = restarted(agent, db)
+    resumed.resume_from_checkpoint()
+
+    [root] = resumed.tasks
+    assert root.status == TaskStatus.COMPLETED
+    assert all(subtask.status == TaskStatus.COMPLETED for subtask in root.subtasks)
+    counts = resumed.get_llm_call_counts()
+    # لا يعاد التقسيم ولا تنفيذ المهمة المكتملة
+    assert "breakdown" not in counts
+    assert counts["execution"] == len(root.subtasks) - 1
+    assert next(subtask for subtask in root.subtasks if subtask.id == done.id).result == "saved result"
+
+def test_restore_without_checkpoints_keeps_existing_tasks():
+    agent = Agent("fresh", "goal", MockLLMService(), db_service=MemoryDatabaseService())
+    task = agent.add_task("only", "single task")
+    agent.db_service.clear_task_checkpoints(agent.id)
+
+    assert agent.restore_checkpoint() == 0
+    assert agent.tasks == [task]
+
+def test_agent_settings_survive_serialization():
+    agent = Agent(
+        "settings", "goal", MockLLMService(),
+        lazy_decomposition=True, max_depth=3, max_fanout=4, expansion_min_words=30, summary_token_budget=500
+    )
+    restored = Agent.from_dict(agent.to_dict(), MockLLMService())
+
+    assert (restored.max_depth, restored.max_fanout, restored.expansion_min_words) == (3, 4, 30)
+    assert restored.lazy_decomposition and restored.summary_token_budget == 500
+
+def test_new_system_on_same_sqlite_file_resumes_agent(tmp_path):
+    path = str(tmp_path / "agents.db")
+    system = AutoGPT(llm_provider="mock", db_provider="sqlite", db_connection_string=path)
+    agent = system.create_agent("worker", "write a report about bees")
+    _, main, done, running = interrupted_agent(system.db_service, agent)
+
+    restarted_system = AutoGPT(llm_provider="mock", db_provider="sqlite", db_connection_string=path)
+    assert agent.id in restarted_system.agents
+
+    futures = restarted_system.resume_interrupted_agents()
+    assert set(futures) == {agent.id}
+    futures[agent.id].result(timeout=30)
+
+    resumed = restarted_system.get_agent(agent.id)
+    [root] = resumed.tasks
+    assert root.id == main.id and root.status == TaskStatus.COMPLETED
+    assert next(subtask for subtask in root.subtasks if subtask.id == done.id).result == "saved result"
+    assert resumed.get_llm_call_counts()["execution"] == len(root.subtasks) - 1
+    assert restarted_system.db_service.get_agent_tasks(agent.id)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+اختبارات سجل الوكيل المحدود وترحيل الإدخالات القديمة إلى ملف
+"""
+import os
+
+from core.autogpt import AutoGPT
+from core.history import AgentHistory
+
+def fill(history, count, start=0):
+    for index in range(start, start + count):
+        history.append({"index": index})
+
+def indexes(entries):
+    return [entry["index"] for entry in entries]
+
+def test_memory_is_bounded_and_oldest_entries_are_spilled(tmp_path):
+    path = str(tmp_path / "agent.history.jsonl")
+    history = AgentHistory(max_entries=10, spill_path=path)
+    fill(history, 250)
+
+    assert len(history) == 10
+    assert history.total == 250
+    assert indexes(history) == list(range(240, 250))
+    history.close()
+    with open(path, encoding="utf-8") as spill_file:
+        assert sum(1 for _ in spill_file) == 240
+
+def test_paging_reads_across_spill_and_memory(tmp_path):
+    history = AgentHistory(max_entries=10, spill_path=str(tmp_path / "h.jsonl"))
+    fill(history, 250)
+
+    entries, cursor = history.page(None, 5)
+    assert indexes(entries) == [0, 1, 2, 3, 4] and cursor == 5
+
+    entries, cursor = history.page(235, 10)
+    assert indexes(entries) == list(range(235, 245)) and cursor == 245
+
+    entries, cursor = history.page(245, 50)
+    assert indexes(entries) == list(range(245, 250)) and cursor is None
+
+def test_full_walk_returns_every_entry_once(tmp_path):
+    history = AgentHistory(max_entries=7, spill_path=str(tmp_path / "h.jsonl"))
+    fill(history, 333)
+
+    seen, cursor = [], None
+    while True:
+        entries, cursor = history.page(cursor, 40)
+        seen.extend(indexes(entries))
+        if cursor is None:
+            break
+    assert seen == list(range(333))
+
+def test_appends_after_reads_remain_visible(tmp_path):
+    history = AgentHistory(max_entries=5, spill_path=str(tmp_path / "h.jsonl"))
+    fill(history, 150)
+    history.page(120, 3)
+    fill(history, 100, start=150)
+
+    entries, _ = history.page(180, 3)
+    assert indexes(entries) == [180, 181, 182]
+
+def test_reload_from_dict_reads_existing_spill(tmp_path):
+    history = AgentHistory(max_entries=10, spill_path=str(tmp_path / "h.jsonl"))
+    fill(history, 120)
+    history.close()
+
+    restored = AgentHistory.from_dict(history.to_dict())
+    assert restored.total == 120
+    entries, _ = restored.page(50, 2)
+    assert indexes(entries) == [50, 51]
+
+def test_without_spill_path_old_entries_are_dropped():
+    history = AgentHistory(max_entries=3)
+    fill(history, 10)
+
+    entries, cursor = history.page(None, 10)
+    assert indexes(entries) == [7, 8, 9] and cursor is None
+    assert history.total == 3
+
+def test_discard_removes_the_spill_file(tmp_path):
+    path = str(tmp_path / "h.jsonl")
+    history = AgentHistory(max_entries=2, spill_path=path)
+    fill(history, 5)
+    history.discard()
+
+    assert not os.path.exists(path)
+    assert len(history) == 0 and history.total == 0
+
+def test_paging_after_a_process_mode_run(tmp_path):
+    system = AutoGPT(
+        llm_provider="mock", process_pool_workers=1, history_dir=str(tmp_path), history_limit=5
+    )
+    agent = system.create_agent("worker", "write a report about bees")
+    # إدخالات مرحلة في العملية الأم قبل أن تلحق العملية الفرعية بالملف نفسه
+    fill(agent.history, 20)
+
+    system.run_agent_in_process(agent.id).result(timeout=60)
+    merged = system.get_agent(agent.id)
+
+    entries, cursor = [], None
+    while True:
+        page, cursor = merged.history.page(cursor, 7)
+        entries.extend(page)
+        if cursor is None:
+            break
+    assert [entry["seq"] for entry in entries] == list(range(merged.history.total))
+    assert merged.history.total > 20
\ No newline at end of file
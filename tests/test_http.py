@@ -0,0 +1,148 @@
+"""
+اختبارات عميل HTTP المجمع وخدمة OpenAI أمام خادم محلي بديل
+"""
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from core.agent import Agent
+from core.cancellation import DeadlineExceededError
+from llm.http import PooledHTTPClient, CallAbortedError, call_bounds
+from llm.openai_service import OpenAIService
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """يرد بالاستجابات المجهزة في قائمة الخادم بالترتيب ويسجل الطلبات
+
+    الاستجابة قد تحمل عنصرًا رابعًا هو مدة تأخير قبل الرد لمحاكاة مزود معلق.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, dict(self.headers), body))
+        status, headers, payload, *delay = self.server.responses.pop(0)
+        if delay:
+            time.sleep(delay[0])
+        data = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.requests, httpd.responses = [], []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def completion(text, prompt_tokens=7, completion_tokens=3):
+    return {
+        "model": "gpt-4",
+        "choices": [{"message": {"role": "assistant", "content": text}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+    }
+
+def test_openai_retries_after_429_and_honours_retry_after(server):
+    server.responses += [
+        (429, {"Retry-After": "0.3"}, {"error": {"message": "rate limited"}}),
+        (200, {}, completion("hello"))
+    ]
+    client = PooledHTTPClient(max_retries=2, backoff_base=0.0)
+    service = OpenAIService("sk-test", base_url=base_url(server), http_client=client)
+
+    started = time.monotonic()
+    assert service.query("hi", temperature=0.0) == "hello"
+    assert time.monotonic() - started >= 0.3
+
+    assert client.get_stats()["retries"] == 1
+    assert service.pop_last_usage()["total_tokens"] == 10
+    path, headers, body = server.requests[-1]
+    assert path == "/v1/chat/completions"
+    assert headers["Authorization"] == "Bearer sk-test"
+    assert body["temperature"] == 0.0 and body["messages"][0]["content"] == "hi"
+
+def test_openai_gives_up_after_max_retries(server):
+    server.responses += [(503, {"Retry-After": "0"}, {})] * 2
+    client = PooledHTTPClient(max_retries=1)
+    service = OpenAIService("sk-test", base_url=base_url(server), http_client=client)
+
+    with pytest.raises(Exception):
+        service.query("hi")
+    assert len(server.requests) == 2 and client.get_stats()["failures"] == 1
+
+def test_openai_instances_keep_their_own_clients(server):
+    first = OpenAIService("sk-a", base_url=base_url(server), http_client=PooledHTTPClient())
+    second = OpenAIService("sk-b", base_url=base_url(server), http_client=PooledHTTPClient())
+    server.responses += [(200, {}, completion("a")), (200, {}, completion("b"))]
+
+    assert first.query("x") == "a" and second.query("x") == "b"
+    assert first.http is not second.http
+    assert first.http.get_stats()["requests"] == second.http.get_stats()["requests"] == 1
+
+def test_openai_async_stream_reports_usage(server):
+    events = [
+        {"choices": [{"delta": {"content": "hel"}}]},
+        {"choices": [{"delta": {"content": "lo"}}]},
+        {"choices": [], "usage": {"prompt_tokens": 4, "completion_tokens": 2}}
+    ]
+    sse = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+    server.responses.append((200, {"Content-Type": "text/event-stream"}, sse))
+    service = OpenAIService("sk-test", base_url=base_url(server), http_client=PooledHTTPClient())
+
+    async def main():
+        chunks = [chunk async for chunk in service.aquery_stream("hi")]
+        return chunks, service.pop_last_usage()
+
+    chunks, usage = asyncio.run(main())
+    assert chunks == ["hel", "lo"]
+    assert usage["total_tokens"] == 6
+    assert server.requests[0][2]["stream"] is True
+
+def test_call_bounds_cap_request_timeout_and_stop_retries(server):
+    server.responses += [(200, {}, completion("late"), 2.0)] * 3
+    client = PooledHTTPClient(max_retries=3, backoff_base=0.0)
+
+    started = time.monotonic()
+    with call_bounds(deadline=time.monotonic() + 0.3):
+        with pytest.raises(CallAbortedError):
+            client.post(f"{base_url(server)}/chat/completions", json={})
+    assert time.monotonic() - started < 1.0
+
+def test_call_bounds_cancel_interrupts_retry_wait(server):
+    server.responses.append((429, {"Retry-After": "5"}, {}))
+    client = PooledHTTPClient(max_retries=1)
+    cancelled = threading.Event()
+    threading.Timer(0.2, cancelled.set).start()
+
+    started = time.monotonic()
+    with call_bounds(cancelled=cancelled):
+        with pytest.raises(CallAbortedError):
+            client.post(f"{base_url(server)}/chat/completions", json={})
+    assert time.monotonic() - started < 1.0 and len(server.requests) == 1
+
+def test_agent_call_timeout_frees_the_call_pool_thread(server):
+    server.responses += [(200, {}, completion("late"), 2.0), (200, {}, completion("on time"))]
+    service = OpenAIService("sk-test", base_url=base_url(server), http_client=PooledHTTPClient(backoff_base=0.0))
+    agent = Agent("bounded", "goal", service, llm_timeout=0.5, call_executor=ThreadPoolExecutor(max_workers=1))
+
+    with pytest.raises(DeadlineExceededError):
+        agent._query_llm("execution", "hang")
+    # الخيط الوحيد في مجمع الاستدعاءات تحرر بانتهاء المهلة لا بعد رد الخادم المعلق
+    assert agent._query_llm("execution", "hi") == "on time"
\ No newline at end of file
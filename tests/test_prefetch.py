@@ -0,0 +1,39 @@
+"""
+اختبارات التحضير التخميني للمهام التالية
+"""
+import asyncio
+
+import pytest
+
+from core.agent import Agent
+from core.async_agent import AsyncAgent
+from core.task import TaskStatus
+from llm.mock_service import MockLLMService
+
+def run(agent):
+    if isinstance(agent, AsyncAgent):
+        asyncio.run(agent.arun())
+    else:
+        agent.start()
+
+@pytest.mark.parametrize("agent_class", [Agent, AsyncAgent])
+def test_queued_tasks_are_prefetched_and_consumed(agent_class):
+    agent = agent_class("prefetch", "goal", MockLLMService(), prefetch_window=2)
+    for index in range(4):
+        agent.add_task(f"leaf {index}", f"collect facts {index}", tags=["leaf"])
+    agent.add_task("report", "write a short report about bees")
+
+    run(agent)
+
+    stats = agent.prefetcher.get_stats()
+    assert stats["issued"] > 0 and stats["hits"] > 0
+    assert all(task.status == TaskStatus.COMPLETED for task in agent.tasks)
+
+def test_async_agent_without_window_does_not_prefetch():
+    agent = AsyncAgent("plain", "goal", MockLLMService())
+    agent.add_task("leaf", "collect facts", tags=["leaf"])
+
+    run(agent)
+
+    assert agent.prefetcher is None
+    assert agent.tasks[0].status == TaskStatus.COMPLETED
\ No newline at end of file
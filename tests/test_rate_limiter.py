@@ -0,0 +1,178 @@
+"""
+اختبارات دلو التوكنات ومحدد معدل استدعاءات النماذج اللغوية
+"""
+import time
+import asyncio
+import threading
+
+import pytest
+
+from llm.llm_service import LLMService
+from llm.rate_limiter import TokenBucket, RateLimiter, RateLimitedLLMService
+
+def test_bucket_burst_is_a_few_seconds_of_quota():
+    bucket = TokenBucket(per_minute=6000)
+    now = time.monotonic()
+
+    assert bucket.capacity == 500
+    assert bucket.reserve(400, now) == 0.0
+    # الرصيد المتبقي 100، فيُنتظر سداد 100 توكن بمعدل 100 في الثانية
+    assert bucket.reserve(200, now) == pytest.approx(1.0)
+
+def test_oversized_request_is_admitted_when_idle_and_followers_repay_it():
+    bucket = TokenBucket(per_minute=6000)
+    now = time.monotonic()
+
+    assert bucket.reserve(1500, now) == 0.0
+    assert bucket.reserve(100, now) == pytest.approx(11.0)
+
+def test_first_minute_after_idle_stays_near_quota():
+    bucket = TokenBucket(per_minute=600)
+    start = time.monotonic()
+    admitted, now = 0, start
+    # مستدعون متتالون يطلبون 10 توكنات ويبدؤون بعد انتهاء انتظارهم
+    while now - start < 60.0:
+        now += bucket.reserve(10, now)
+        if now - start < 60.0:
+            admitted += 10
+
+    assert admitted <= 600 * 1.1
+
+def test_bucket_refills_at_the_configured_rate():
+    bucket = TokenBucket(per_minute=600, burst_seconds=60.0)
+    start = time.monotonic()
+    bucket.reserve(600, start)
+
+    assert bucket.reserve(10, start + 1.0) == 0.0
+    assert bucket.reserve(20, start + 1.0) == pytest.approx(2.0)
+
+def test_bucket_adjust_refunds_unused_reservation():
+    bucket = TokenBucket(per_minute=600, burst_seconds=60.0)
+    now = time.monotonic()
+    bucket.reserve(600, now)
+    bucket.adjust(-300, now)
+
+    assert bucket.reserve(300, now) == 0.0
+
+def test_limiter_applies_headroom_and_tracks_waits():
+    limiter = RateLimiter(requests_per_minute=60, headroom=0.5, burst_seconds=60.0)
+
+    waits = [limiter.reserve("p", "m", 0) for _ in range(31)]
+
+    assert waits[:30] == [0.0] * 30
+    assert waits[30] == pytest.approx(2.0, abs=0.05)
+    stats = limiter.get_stats()["p/m"]
+    assert stats["requests"] == 31 and stats["waited"] == 1
+
+def test_limiter_overrides_limits_per_provider():
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.set_limits("slow", requests_per_minute=1)
+
+    assert limiter.reserve("slow", None, 0) == 0.0
+    assert limiter.reserve("slow", None, 0) > 0
+    assert limiter.reserve("fast", None, 0) == 0.0
+
+def test_settle_corrects_token_reservation():
+    limiter = RateLimiter(tokens_per_minute=1000, headroom=1.0, burst_seconds=60.0)
+    limiter.reserve("p", None, 1000)
+    limiter.settle("p", None, 1000, 100)
+
+    assert limiter.reserve("p", None, 900) == 0.0
+    assert limiter.get_stats()["p/None"]["tokens"] == 1000
+
+def test_async_acquire_limits_concurrency():
+    limiter = RateLimiter(max_concurrent=2)
+    active = peak = 0
+
+    async def call():
+        nonlocal active, peak
+        slot = await limiter.aacquire("p", None, 1)
+        try:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+        finally:
+            active -= 1
+            limiter.release(slot)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(20)))
+
+    asyncio.run(main())
+    assert peak == 2
+
+def test_cancelled_async_waiter_does_not_leak_a_slot():
+    limiter = RateLimiter(max_concurrent=1, tokens_per_minute=600)
+
+    async def main():
+        holder = await limiter.aacquire("p", None, 10)
+        waiters = [asyncio.ensure_future(limiter.aacquire("p", None, 10)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        limiter.release(holder)
+        return await asyncio.wait_for(limiter.aacquire("p", None, 10), timeout=1.0)
+
+    slot = asyncio.run(main())
+    limiter.release(slot)
+    # حجوزات المنتظرين الملغين أُعيدت
+    assert limiter.get_stats()["p/None"]["tokens"] == 20
+
+def test_async_waiters_get_slots_in_arrival_order():
+    limiter = RateLimiter(max_concurrent=1)
+    order = []
+
+    async def call(index):
+        slot = await limiter.aacquire("p", None, 1)
+        order.append(index)
+        await asyncio.sleep(0.001)
+        limiter.release(slot)
+
+    async def main():
+        holder = await limiter.aacquire("p", None, 1)
+        waiters = []
+        for index in range(5):
+            waiters.append(asyncio.ensure_future(call(index)))
+            await asyncio.sleep(0.001)
+        limiter.release(holder)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(main())
+    assert order == list(range(5))
+
+def test_thread_waiters_get_slots_in_arrival_order():
+    limiter = RateLimiter(max_concurrent=1)
+    holder = limiter.acquire("p", None, 1)
+    order = []
+
+    def call(index):
+        slot = limiter.acquire("p", None, 1)
+        order.append(index)
+        limiter.release(slot)
+
+    threads = []
+    for index in range(5):
+        thread = threading.Thread(target=call, args=(index,))
+        thread.start()
+        threads.append(thread)
+        # انتظار دخول الخيط إلى الطابور قبل بدء التالي
+        while len(holder._waiters) <= index:
+            time.sleep(0.001)
+    limiter.release(holder)
+    for thread in threads:
+        thread.join()
+
+    assert order == list(range(5))
+
+class UsageService(LLMService):
+    def query(self, prompt, **kwargs):
+        self._record_usage(40, 60, "m")
+        return "ok"
+
+def test_wrapper_settles_with_provider_usage():
+    limiter = RateLimiter(tokens_per_minute=10000)
+    service = RateLimitedLLMService(UsageService(), limiter)
+
+    assert service.query("x" * 400) == "ok"
+    assert limiter.get_stats()["UsageService/None"]["tokens"] == 100
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+اختبارات الذاكرة المؤقتة المشتركة لنتائج المهام
+"""
+import asyncio
+import time
+
+import pytest
+
+from core.result_cache import ResultCache
+from core.agent import Agent
+from core.async_agent import AsyncAgent
+from database.memory_db import MemoryDatabaseService
+from database.sqlite_db import SQLiteDatabaseService
+from llm.mock_service import MockLLMService
+from tools.web_search import WebSearchTool
+
+MODEL = {"service": "mock", "model": None, "temperature": 0.0}
+
+def test_key_normalizes_text_and_tool_order():
+    first = ResultCache.make_key("Write  a Report", "Bees", ["B", "a"], MODEL)
+    second = ResultCache.make_key("write a report", " bees ", ["A", "b"], MODEL)
+
+    assert first == second
+
+def test_key_depends_on_generation_settings():
+    cold = ResultCache.make_key("task", "goal", [], MODEL)
+    warm = ResultCache.make_key("task", "goal", [], dict(MODEL, temperature=0.9))
+
+    assert cold != warm
+
+def test_put_get_and_expiry():
+    cache = ResultCache(MemoryDatabaseService(), ttl_seconds=0.05)
+    cache.put("key", "result", task_name="t")
+
+    assert cache.get("key")["result"] == "result"
+    time.sleep(0.06)
+    assert cache.get("key") is None
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+
+def test_invalid_ttl_is_rejected():
+    with pytest.raises(ValueError):
+        ResultCache(MemoryDatabaseService(), ttl_seconds=0)
+
+@pytest.mark.parametrize("make_db", [
+    lambda tmp_path: MemoryDatabaseService(),
+    lambda tmp_path: SQLiteDatabaseService(str(tmp_path / "cache.db"))
+])
+def test_opt_out_survives_a_new_cache_instance(tmp_path, make_db):
+    db = make_db(tmp_path)
+    ResultCache(db).set_opt_out("tenant-a")
+    ResultCache(db).set_opt_out("tenant-b")
+    ResultCache(db).set_opt_out("tenant-b", False)
+
+    reloaded = ResultCache(db)
+    assert not reloaded.is_enabled_for("tenant-a")
+    assert reloaded.is_enabled_for("tenant-b")
+
+def test_agents_share_results_unless_creator_opted_out():
+    db = MemoryDatabaseService()
+    cache = ResultCache(db)
+    first = Agent("first", "goal", MockLLMService(), creator_id="a", result_cache=cache)
+    second = Agent("second", "goal", MockLLMService(), creator_id="b", result_cache=cache)
+    private = Agent("private", "goal", MockLLMService(), creator_id="c", result_cache=cache)
+    cache.set_opt_out("c")
+
+    first._execute_task(first.add_task("leaf", "collect facts", tags=["leaf"]))
+    shared = second.add_task("leaf", "collect facts", tags=["leaf"])
+    second._execute_task(shared)
+    own = private.add_task("leaf", "collect facts", tags=["leaf"])
+    private._execute_task(own)
+
+    assert shared.metadata.get("served_from_cache") is True
+    assert shared.result == first.tasks[0].result
+    assert "served_from_cache" not in own.metadata
+    assert cache.get_stats()["stores"] == 1
+
+def test_async_fused_and_plain_runs_use_separate_keys():
+    cache = ResultCache(MemoryDatabaseService())
+    tasks = []
+    for fused in (True, False):
+        agent = AsyncAgent(
+            "async", "goal", MockLLMService(), tools=[WebSearchTool()], fused_calls=fused, result_cache=cache
+        )
+        task = agent.add_task("leaf", "collect facts", tags=["leaf"])
+        task.metadata["suggested_tools"] = ["WebSearchTool"]
+        asyncio.run(agent._aexecute_task(task))
+        tasks.append(task)
+
+    assert all(task.result for task in tasks)
+    assert "served_from_cache" not in tasks[1].metadata
+    assert cache.get_stats()["stores"] == 2
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+اختبارات الموجه بين مزودي النماذج: الترتيب حسب الزمن والانتقال عند الفشل والتحوط
+"""
+import time
+import asyncio
+import threading
+
+import pytest
+
+from llm.llm_service import LLMService
+from llm.router import RouterLLMService, ECONOMY_MODEL
+
+class FakeService(LLMService):
+    """خلفية وهمية بزمن استجابة ثابت ونسبة فشل محددة"""
+
+    def __init__(self, name, delay=0.0, fail=False, economy_model=None):
+        super().__init__()
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.economy_model = economy_model
+        self.calls = []
+
+    def query(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self._record_usage(1, len(self.name), self.name)
+        return self.name
+
+    async def aquery(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self._record_usage(1, len(self.name), self.name)
+        return self.name
+
+def seed(router, name, latency, count=10, ok=True):
+    backend = next(backend for backend in router.backends if backend.name == name)
+    for _ in range(count):
+        backend.record(latency, ok)
+    return backend
+
+def test_untried_backends_are_sampled_first_then_fastest_wins():
+    router = RouterLLMService([("slow", FakeService("slow"), 1.0), ("fast", FakeService("fast"), 1.0)])
+    seed(router, "slow", 0.3)
+
+    assert router.query("x") == "fast"
+    seed(router, "fast", 0.1)
+    assert [backend.name for backend in router._ranked()] == ["fast", "slow"]
+
+def test_weight_scales_latency_score():
+    router = RouterLLMService([("a", FakeService("a"), 4.0), ("b", FakeService("b"), 1.0)])
+    seed(router, "a", 0.2)
+    seed(router, "b", 0.1)
+
+    assert router._ranked()[0].name == "a"
+
+def test_failover_to_next_backend_and_usage_of_winner():
+    broken = FakeService("broken", fail=True)
+    router = RouterLLMService([("broken", broken, 1.0), ("ok", FakeService("ok"), 1.0)])
+
+    assert router.query("x") == "ok"
+    assert len(broken.calls) == 1
+    assert router.pop_last_usage()["model"] == "ok"
+
+def test_all_backends_failing_raises():
+    router = RouterLLMService([("a", FakeService("a", fail=True), 1.0), ("b", FakeService("b", fail=True), 1.0)])
+
+    with pytest.raises(Exception, match="All router backends failed"):
+        router.query("x")
+
+def test_unhealthy_backend_is_skipped_until_recovery():
+    flaky = FakeService("flaky")
+    router = RouterLLMService(
+        [("flaky", flaky, 1.0), ("steady", FakeService("steady"), 1.0)],
+        min_samples=5,
+        recovery_seconds=60.0
+    )
+    seed(router, "flaky", 0.01, count=5, ok=False)
+    seed(router, "steady", 0.5)
+
+    assert router.query("x") == "steady"
+    assert flaky.calls == []
+
+    # بعد انقضاء مهلة التعافي تعود الخلفية إلى الترتيب
+    router.recovery_seconds = 0.0
+    assert router._ranked()[0].name == "flaky"
+
+def test_backend_with_only_failures_ranks_after_measured_ones():
+    router = RouterLLMService(
+        [("failing", FakeService("failing"), 1.0), ("fast", FakeService("fast"), 1.0)],
+        min_samples=5,
+        recovery_seconds=60.0
+    )
+    seed(router, "failing", 0.01, count=4, ok=False)
+    seed(router, "fast", 0.1)
+
+    assert [backend.name for backend in router._ranked()] == ["fast", "failing"]
+    router.recovery_seconds = 0.0
+    assert router._ranked()[0].name == "failing"
+
+def test_pool_queueing_does_not_trigger_hedges():
+    router = RouterLLMService(
+        [("primary", FakeService("primary", delay=0.02), 2.0), ("other", FakeService("other"), 1.0)],
+        hedging=True,
+        min_samples=5,
+        max_concurrent_calls=1
+    )
+    seed(router, "primary", 0.1)
+    seed(router, "other", 0.1)
+
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(router.query("x"))) for _ in range(64)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert results == ["primary"] * 64
+    assert router.get_stats()["hedges"] == 0
+
+def test_hedged_request_returns_first_response():
+    router = RouterLLMService(
+        [("tail", FakeService("tail", delay=0.5), 2.0), ("steady", FakeService("steady"), 1.0)],
+        hedging=True,
+        min_samples=5
+    )
+    seed(router, "tail", 0.01)
+    seed(router, "steady", 0.05)
+
+    started = time.monotonic()
+    assert router.query("x") == "steady"
+    assert time.monotonic() - started < 0.4
+    stats = router.get_stats()
+    assert stats["hedges"] == 1
+    assert stats["backends"]["steady"]["hedges_won"] == 1
+    assert router.pop_last_usage()["model"] == "steady"
+
+def test_async_hedge_cancels_the_slower_request():
+    tail = FakeService("tail", delay=5.0)
+    router = RouterLLMService([("tail", tail, 2.0), ("steady", FakeService("steady"), 1.0)], hedging=True, min_samples=5)
+    seed(router, "tail", 0.01)
+    seed(router, "steady", 0.05)
+
+    async def main():
+        started = time.monotonic()
+        result = await router.aquery("x")
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(main())
+    assert result == "steady"
+    assert elapsed < 1.0
+    assert router.get_stats()["hedges"] == 1
+
+def test_async_cancelled_hedge_is_skipped():
+    router = RouterLLMService(
+        [("tail", FakeService("tail", delay=0.3), 2.0), ("steady", FakeService("steady", delay=0.3), 1.0)],
+        hedging=True,
+        min_samples=5
+    )
+    seed(router, "tail", 0.01)
+    seed(router, "steady", 0.05)
+
+    async def main():
+        query = asyncio.ensure_future(router.aquery("x"))
+        await asyncio.sleep(0.1)
+        # إلغاء الطلب التحوطي من خارج الموجه يجب ألا يُفشل الاستدعاء
+        for task in asyncio.all_tasks():
+            if task is not query and task is not asyncio.current_task():
+                task.cancel()
+                break
+        return await query
+
+    assert asyncio.run(main()) in ("tail", "steady")
+
+def test_economy_model_maps_to_each_backend():
+    cheap = FakeService("cheap", economy_model="cheap-small")
+    plain = FakeService("plain", fail=True)
+    router = RouterLLMService([("plain", plain, 1.0), ("cheap", cheap, 1.0)])
+
+    router.query("x", model=ECONOMY_MODEL)
+
+    assert "model" not in plain.calls[0]
+    assert cheap.calls[0]["model"] == "cheap-small"
+
+def test_stream_fails_over_before_first_chunk():
+    router = RouterLLMService([("broken", FakeService("broken", fail=True), 1.0), ("ok", FakeService("ok"), 1.0)])
+
+    assert "".join(router.query_stream("x")) == "ok"
+    assert router.get_stats()["backends"]["broken"]["error_rate"] == 1.0
\ No newline at end of file
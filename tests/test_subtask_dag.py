@@ -0,0 +1,139 @@
+"""
+اختبارات تنفيذ المهام الفرعية كمخطط اعتماديات بالتوازي
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.agent import Agent
+from core.task import TaskStatus
+from llm.mock_service import MockLLMService
+
+@pytest.fixture
+def agent():
+    executor = ThreadPoolExecutor(max_workers=4)
+    agent = Agent("dag", "goal", MockLLMService(), parallel_subtasks=True, executor=executor)
+    yield agent
+    executor.shutdown(wait=True)
+
+def add_subtasks(agent, dependencies):
+    parent = agent.add_task("parent", "parent task")
+    subtasks = {}
+    for name, depends_on in dependencies.items():
+        subtask = parent.add_subtask(name, f"subtask {name}")
+        subtask.metadata["depends_on"] = depends_on
+        subtasks[name] = subtask
+    return parent, subtasks
+
+def record_leaves(agent, delay=0.05, failing=()):
+    """استبدال تنفيذ المهام الورقية بتسجيل أوقات البدء والانتهاء"""
+    events = []
+    lock = threading.Lock()
+
+    def execute(subtask, token=None):
+        with lock:
+            events.append(("start", subtask.name, time.monotonic()))
+        time.sleep(delay)
+        if subtask.name in failing:
+            subtask.fail("boom")
+        else:
+            subtask.complete(f"result {subtask.name}")
+        with lock:
+            events.append(("end", subtask.name, time.monotonic()))
+
+    agent._execute_task = execute
+    return events
+
+def times(events, kind):
+    return {name: at for event, name, at in events if event == kind}
+
+def test_dependencies_run_in_order_and_independent_siblings_overlap(agent):
+    parent, subtasks = add_subtasks(agent, {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]})
+    events = record_leaves(agent)
+
+    agent._execute_subtasks_parallel(parent)
+
+    started, ended = times(events, "start"), times(events, "end")
+    assert all(subtask.status == TaskStatus.COMPLETED for subtask in subtasks.values())
+    assert started["b"] >= ended["a"] and started["c"] >= ended["a"]
+    assert started["d"] >= max(ended["b"], ended["c"])
+    # b و c مستقلتان فتعملان في الوقت نفسه
+    assert started["c"] < ended["b"] and started["b"] < ended["c"]
+
+def test_dependency_names_are_case_insensitive(agent):
+    parent, subtasks = add_subtasks(agent, {"First": [], "second": ["FIRST"]})
+    events = record_leaves(agent, delay=0.01)
+
+    agent._execute_subtasks_parallel(parent)
+
+    assert times(events, "start")["second"] >= times(events, "end")["First"]
+
+def test_failed_dependency_fails_dependents_without_running_them(agent):
+    parent, subtasks = add_subtasks(agent, {"a": [], "b": ["a"], "c": ["b"], "free": []})
+    events = record_leaves(agent, delay=0.01, failing={"a"})
+
+    agent._execute_subtasks_parallel(parent)
+
+    assert subtasks["a"].status == TaskStatus.FAILED
+    assert subtasks["b"].status == TaskStatus.FAILED
+    assert subtasks["c"].status == TaskStatus.FAILED
+    assert "Dependency failed" in subtasks["b"].error_message
+    assert subtasks["free"].status == TaskStatus.COMPLETED
+    assert set(times(events, "start")) == {"a", "free"}
+
+def test_circular_dependencies_fail_instead_of_hanging(agent):
+    parent, subtasks = add_subtasks(agent, {"x": ["y"], "y": ["x"], "z": []})
+    record_leaves(agent, delay=0.01)
+
+    agent._execute_subtasks_parallel(parent)
+
+    assert subtasks["z"].status == TaskStatus.COMPLETED
+    for name in ("x", "y"):
+        assert subtasks[name].status == TaskStatus.FAILED
+        assert subtasks[name].error_message == "Unresolvable subtask dependencies"
+
+def test_leaf_exception_marks_subtask_failed(agent):
+    parent, subtasks = add_subtasks(agent, {"a": [], "b": ["a"]})
+
+    def execute(subtask, token=None):
+        raise RuntimeError("worker crashed")
+
+    agent._execute_task = execute
+    agent._execute_subtasks_parallel(parent)
+
+    assert subtasks["a"].status == TaskStatus.FAILED
+    assert subtasks["a"].error_message == "worker crashed"
+    assert subtasks["b"].status == TaskStatus.FAILED
+
+def test_nested_composites_run_as_continuations_on_a_small_pool(monkeypatch):
+    executor, call_executor = ThreadPoolExecutor(max_workers=2), ThreadPoolExecutor(max_workers=2)
+    agent = Agent(
+        "nested", "goal", MockLLMService(),
+        parallel_subtasks=True, executor=executor, call_executor=call_executor
+    )
+    parent = agent.add_task("parent", "parent task")
+    composites = [parent.add_subtask(f"group {index}", f"group {index}") for index in range(4)]
+    for composite in composites:
+        for index in range(3):
+            composite.add_subtask(f"{composite.name} leaf {index}", f"leaf {index} of {composite.name}")
+
+    started = []
+    original_start = threading.Thread.start
+
+    def recording_start(thread):
+        started.append(thread.name)
+        original_start(thread)
+
+    monkeypatch.setattr(threading.Thread, "start", recording_start)
+    try:
+        agent._execute_subtasks_parallel(parent)
+    finally:
+        executor.shutdown(wait=True)
+        call_executor.shutdown(wait=True)
+
+    assert all(composite.status == TaskStatus.COMPLETED for composite in composites)
+    assert all(leaf.status == TaskStatus.COMPLETED for composite in composites for leaf in composite.subtasks)
+    # لا خيوط خارج المجمعين المحدودين
+    assert len(started) <= 4
\ No newline at end of file
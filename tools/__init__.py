@@ -1,34 +1,30 @@
-"""
-وحدة الأدوات (TOOLS)
-===============
-توفر هذه الوحدة مجموعة من الأدوات المساعدة للوكلاء.
-"""
-
-from tools.tool import Tool
-
-# قائمة بجميع الأدوات المتاحة
-__all__ = ['Tool']
-
-# محاولة استيراد الأدوات المتاحة وتصديرها إذا كانت موجودة
-tool_classes = [
-    'WebSearchTool',
-    'WebScrapingTool',
-    'FileOperationsTool',
-    'DataAnalysisTool',
-    'ContentGeneratorTool'
-]
-
-# استيراد الأدوات المتاحة ديناميكياً
-for tool_name in tool_classes:
-    try:
-        module_name = tool_name.lower()
-        if module_name.endswith('tool'):
-            module_name = module_name[:-4]
-        module_path = f"tools.{module_name}"
-        module = __import__(module_path, globals(), locals(), [tool_name], 0)
-        tool_class = getattr(module, tool_name)
-        globals()[tool_name] = tool_class
-        __all__.append(tool_name)
-    except (ImportError, AttributeError) as e:
-        # تجاهل الأدوات غير الموجودة
-        pass
\ No newline at end of file
+"""
+وحدة الأدوات (TOOLS)
+===============
+توفر هذه الوحدة مجموعة من الأدوات المساعدة للوكلاء.
+"""
+
+import importlib
+
+from tools.tool import Tool
+from tools.registry import ToolRegistry, ToolView, DEFAULT_TOOL_ENTRY_POINTS
+
+# قائمة بجميع الأدوات المتاحة
+__all__ = ['Tool', 'ToolRegistry', 'ToolView']
+
+# فئات الأدوات تُستورد عند أول وصول إليها فقط بدلاً من استيرادها جميعًا عند التحميل
+_lazy_tool_classes = {
+    name: (module_path, class_name)
+    for name, module_path, class_name, _ in DEFAULT_TOOL_ENTRY_POINTS
+}
+
+def __getattr__(name):
+    if name in _lazy_tool_classes:
+        module_path, class_name = _lazy_tool_classes[name]
+        try:
+            tool_class = getattr(importlib.import_module(module_path), class_name)
+        except (ImportError, AttributeError) as e:
+            raise AttributeError(f"module 'tools' has no attribute '{name}'") from e
+        globals()[name] = tool_class
+        return tool_class
+    raise AttributeError(f"module 'tools' has no attribute '{name}'")
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+سجل الأدوات مع فهرسة غير حساسة لحالة الأحرف وتحميل كسول من نقاط الدخول
+"""
+import logging
+import importlib
+import importlib.util
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+logger = logging.getLogger("autogpt")
+
+# نقاط الدخول المعلنة للأدوات الافتراضية: (الاسم، مسار الوحدة، اسم الفئة، الوصف)
+DEFAULT_TOOL_ENTRY_POINTS: List[Tuple[str, str, str, Optional[str]]] = [
+    ("WebSearchTool", "tools.web_search", "WebSearchTool", "أداة للبحث عن المعلومات على الإنترنت"),
+    ("WebScrapingTool", "tools.web_scraping", "WebScrapingTool", None),
+    ("FileOperationsTool", "tools.file_operations", "FileOperationsTool", None),
+    ("DataAnalysisTool", "tools.data_analysis", "DataAnalysisTool", None),
+    ("ContentGeneratorTool", "tools.content_generator", "ContentGeneratorTool", "أداة لإنشاء محتوى متنوع مثل النصوص والمقالات والتقارير")
+]
+
+class ToolRegistry:
+    """سجل مركزي للأدوات يحمّل فئات الأدوات عند أول استخدام فقط"""
+
+    def __init__(self):
+        self._tools: Dict[str, 'Tool'] = {}
+        self._entry_points: Dict[str, Tuple[str, str, str, Optional[str]]] = {}
+        self._lock = threading.RLock()
+
+    def register(self, tool: 'Tool') -> None:
+        """تسجيل نسخة أداة جاهزة"""
+        with self._lock:
+            key = tool.name.lower()
+            self._tools[key] = tool
+            self._entry_points.pop(key, None)
+
+    def declare(self, name: str, module_path: str, class_name: str, description: Optional[str] = None) -> bool:
+        """إعلان نقطة دخول لأداة دون استيراد وحدتها
+
+        يتم التحقق فقط من وجود الوحدة، وتعيد False إذا لم تكن موجودة.
+        """
+        try:
+            if importlib.util.find_spec(module_path) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+
+        with self._lock:
+            key = name.lower()
+            if key not in self._tools:
+                self._entry_points[key] = (name, module_path, class_name, description)
+        return True
+
+    def get(self, name: str) -> Optional['Tool']:
+        """الحصول على أداة بالاسم، مع تحميلها عند أول طلب"""
+        key = name.lower()
+        tool = self._tools.get(key)
+        if tool is not None:
+            return tool
+
+        with self._lock:
+            # التحقق مرة أخرى بعد الحصول على القفل
+            tool = self._tools.get(key)
+            if tool is not None or key not in self._entry_points:
+                return tool
+
+            tool_name, module_path, class_name, _ = self._entry_points.pop(key)
+            try:
+                module = importlib.import_module(module_path)
+                tool = getattr(module, class_name)()
+            except (ImportError, AttributeError) as e:
+                logger.warning(f"Could not load tool {tool_name}: {e}")
+                return None
+
+            self._tools[key] = tool
+            logger.info(f"Tool loaded: {tool.name}")
+            return tool
+
+    def is_loaded(self, name: str) -> bool:
+        """هل تم إنشاء نسخة الأداة بالفعل"""
+        return name.lower() in self._tools
+
+    def names(self) -> List[str]:
+        """أسماء جميع الأدوات المسجلة أو المعلنة"""
+        with self._lock:
+            return [tool.name for tool in self._tools.values()] + [
+                entry[0] for entry in self._entry_points.values()
+            ]
+
+    def describe(self, names: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """وصف الأدوات دون تحميل الأدوات المعلنة إذا كان وصفها معروفًا"""
+        descriptions = []
+        for name in (names if names is not None else self.names()):
+            key = name.lower()
+            tool = self._tools.get(key)
+            entry = self._entry_points.get(key)
+            if tool is None and entry is not None and entry[3] is not None:
+                descriptions.append({"name": entry[0], "description": entry[3]})
+                continue
+
+            tool = tool or self.get(name)
+            if tool is not None:
+                descriptions.append({"name": tool.name, "description": tool.description})
+        return descriptions
+
+    def view(self, names: Optional[List[str]] = None) -> 'ToolView':
+        """إنشاء عرض خاص بوكيل يشارك نسخ الأدوات مع هذا السجل"""
+        return ToolView(registry=self, names=[name for name in (names or []) if name in self])
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        key = name.lower()
+        return key in self._tools or key in self._entry_points
+
+    def __getitem__(self, name: str) -> 'Tool':
+        tool = self.get(name)
+        if tool is None:
+            raise KeyError(name)
+        return tool
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tools) + len(self._entry_points)
+
+class ToolView:
+    """مجموعة الأدوات المتاحة لوكيل واحد
+
+    تحتفظ بأسماء الأدوات فقط وتحلها عبر السجل المشترك، مع فهرس غير حساس
+    لحالة الأحرف للأدوات المضافة محليًا.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ToolRegistry] = None,
+        names: Optional[List[str]] = None,
+        tools: Optional[List['Tool']] = None
+    ):
+        self._registry = registry
+        self._names: List[str] = []
+        self._keys = set()
+        self._local: Dict[str, 'Tool'] = {}
+
+        for name in names or []:
+            self._add_name(name)
+        for tool in tools or []:
+            self.append(tool)
+
+    def _add_name(self, name: str) -> None:
+        key = name.lower()
+        if key not in self._keys:
+            self._keys.add(key)
+            self._names.append(name)
+
+    def append(self, tool: 'Tool') -> None:
+        """إضافة أداة لهذا الوكيل فقط"""
+        self._local[tool.name.lower()] = tool
+        self._add_name(tool.name)
+
+    def find(self, name: str) -> Optional['Tool']:
+        """البحث عن أداة بالاسم دون اعتبار لحالة الأحرف"""
+        key = name.lower()
+        if key not in self._keys:
+            return None
+        tool = self._local.get(key)
+        if tool is None and self._registry is not None:
+            tool = self._registry.get(name)
+        return tool
+
+    def describe(self) -> List[Dict[str, str]]:
+        """وصف أدوات هذا العرض دون تحميل الأدوات المعلنة"""
+        descriptions = []
+        for name in self._names:
+            tool = self._local.get(name.lower())
+            if tool is not None:
+                descriptions.append({"name": tool.name, "description": tool.description})
+            elif self._registry is not None:
+                descriptions.extend(self._registry.describe([name]))
+        return descriptions
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """تسلسل الأدوات للتخزين دون فرض تحميل الأدوات غير المحملة"""
+        entries = []
+        for name in self._names:
+            key = name.lower()
+            tool = self._local.get(key)
+            if tool is None and self._registry is not None and self._registry.is_loaded(name):
+                tool = self._registry.get(name)
+            if tool is not None:
+                entries.append(tool.to_dict())
+            elif self._registry is not None:
+                entries.extend(self._registry.describe([name]))
+        return entries
+
+    def __iter__(self) -> Iterator['Tool']:
+        for name in list(self._names):
+            tool = self.find(name)
+            if tool is not None:
+                yield tool
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __bool__(self) -> bool:
+        return bool(self._names)
\ No newline at end of file
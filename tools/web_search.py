@@ -1,78 +1,78 @@
-"""
-أداة للبحث عن المعلومات على الإنترنت
-"""
-import json
-from typing import List, Dict, Any, Optional
-from .tool import Tool
-
-class WebSearchTool(Tool):
-    """أداة للبحث عن المعلومات على الإنترنت"""
-    
-    def __init__(self):
-        super().__init__(
-            name="WebSearchTool",
-            description="أداة للبحث عن المعلومات على الإنترنت"
-        )
-        self.api_key = None  # يمكن إضافة مفتاح API للخدمة المستخدمة
-    
-    def run(self, query: str, params: Optional[str] = None) -> str:
-        """تنفيذ عملية البحث"""
-        # في تطبيق حقيقي، نتصل بواجهة برمجية للبحث مثل Google أو Bing
-        # لأغراض العرض التوضيحي، سنعيد نتائج محاكاة
-        
-        try:
-            if params:
-                search_params = json.loads(params)
-                limit = search_params.get("limit", 5)
-                source = search_params.get("source", "general")
-            else:
-                limit = 5
-                source = "general"
-                
-            return self._simulate_search(query, limit, source)
-        
-        except Exception as e:
-            return f"خطأ في البحث: {str(e)}"
-    
-    def _simulate_search(self, query: str, limit: int, source: str) -> str:
-        """محاكاة نتائج البحث"""
-        results = [
-            {
-                "title": f"نتيجة بحث 1 عن: {query}",
-                "url": "https://example.com/result1",
-                "snippet": f"هذه هي معلومات مهمة تتعلق بـ {query}. تتضمن النتيجة بيانات وتحليلات."
-            },
-            {
-                "title": f"نتيجة بحث 2 عن: {query}",
-                "url": "https://example.com/result2",
-                "snippet": f"معلومات إضافية متعلقة بـ {query} من مصادر موثوقة. أظهرت الدراسات الحديثة..."
-            },
-            {
-                "title": f"نتيجة بحث 3 عن: {query}",
-                "url": "https://example.com/result3",
-                "snippet": f"تحليل شامل لموضوع {query} وتأثيره على المجالات المختلفة."
-            }
-        ]
-        
-        if source == "academic":
-            results.append({
-                "title": f"دراسة أكاديمية عن {query}",
-                "url": "https://academic-journal.example.com/paper123",
-                "snippet": f"نشرت هذه الدراسة في مجلة محكمة وتناقش {query} من منظور علمي."
-            })
-        elif source == "news":
-            results.append({
-                "title": f"آخر الأخبار عن {query}",
-                "url": "https://news.example.com/latest",
-                "snippet": f"تطورات جديدة في موضوع {query} خلال الأسبوع الماضي."
-            })
-            
-        # تشكيل النتائج النهائية
-        formatted_results = "\n\n".join([
-            f"**{res['title']}**\n{res['url']}\n{res['snippet']}"
-            for res in results[:limit]
-        ])
-        
-        summary = f"تم العثور على {len(results[:limit])} نتائج لاستعلام البحث: '{query}'\n\n"
-        
+"""
+أداة للبحث عن المعلومات على الإنترنت
+"""
+import json
+from typing import List, Dict, Any, Optional
+from .tool import Tool
+
+class WebSearchTool(Tool):
+    """أداة للبحث عن المعلومات على الإنترنت"""
+    
+    def __init__(self):
+        super().__init__(
+            name="WebSearchTool",
+            description="أداة للبحث عن المعلومات على الإنترنت"
+        )
+        self.api_key = None  # يمكن إضافة مفتاح API للخدمة المستخدمة
+    
+    def run(self, query: str, params: Optional[str] = None) -> str:
+        """تنفيذ عملية البحث"""
+        # في تطبيق حقيقي، نتصل بواجهة برمجية للبحث مثل Google أو Bing
+        # لأغراض العرض التوضيحي، سنعيد نتائج محاكاة
+        
+        try:
+            if params:
+                search_params = json.loads(params)
+                limit = search_params.get("limit", 5)
+                source = search_params.get("source", "general")
+            else:
+                limit = 5
+                source = "general"
+                
+            return self._simulate_search(query, limit, source)
+        
+        except Exception as e:
+            return f"خطأ في البحث: {str(e)}"
+    
+    def _simulate_search(self, query: str, limit: int, source: str) -> str:
+        """محاكاة نتائج البحث"""
+        results = [
+            {
+                "title": f"نتيجة بحث 1 عن: {query}",
+                "url": "https://example.com/result1",
+                "snippet": f"هذه هي معلومات مهمة تتعلق بـ {query}. تتضمن النتيجة بيانات وتحليلات."
+            },
+            {
+                "title": f"نتيجة بحث 2 عن: {query}",
+                "url": "https://example.com/result2",
+                "snippet": f"معلومات إضافية متعلقة بـ {query} من مصادر موثوقة. أظهرت الدراسات الحديثة..."
+            },
+            {
+                "title": f"نتيجة بحث 3 عن: {query}",
+                "url": "https://example.com/result3",
+                "snippet": f"تحليل شامل لموضوع {query} وتأثيره على المجالات المختلفة."
+            }
+        ]
+        
+        if source == "academic":
+            results.append({
+                "title": f"دراسة أكاديمية عن {query}",
+                "url": "https://academic-journal.example.com/paper123",
+                "snippet": f"نشرت هذه الدراسة في مجلة محكمة وتناقش {query} من منظور علمي."
+            })
+        elif source == "news":
+            results.append({
+                "title": f"آخر الأخبار عن {query}",
+                "url": "https://news.example.com/latest",
+                "snippet": f"تطورات جديدة في موضوع {query} خلال الأسبوع الماضي."
+            })
+            
+        # تشكيل النتائج النهائية
+        formatted_results = "\n\n".join([
+            f"**{res['title']}**\n{res['url']}\n{res['snippet']}"
+            for res in results[:limit]
+        ])
+        
+        summary = f"تم العثور على {len(results[:limit])} نتائج لاستعلام البحث: '{query}'\n\n"
+        
         return summary + formatted_results
\ No newline at end of file
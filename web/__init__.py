@@ -1,9 +1,9 @@
-"""
-وحدة واجهة المستخدم (WEB)
-==================
-توفر هذه الوحدة واجهة ويب للتفاعل مع نظام AutoGPT.
-"""
-
-from .server import WebServer
-
+"""
+وحدة واجهة المستخدم (WEB)
+==================
+توفر هذه الوحدة واجهة ويب للتفاعل مع نظام AutoGPT.
+"""
+
+from .server import WebServer
+
 __all__ = ['WebServer']
\ No newline at end of file